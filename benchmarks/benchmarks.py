@@ -2,6 +2,13 @@
 
 from __future__ import annotations
 
+import time
+import types
+from typing import Any, ClassVar
+
+from octave_kernel._completion import PrefixTrie
+from octave_kernel._output import OutputCoalescer
+from octave_kernel._pool import OctaveEnginePool
 from octave_kernel.kernel import OctaveEngine
 
 
@@ -13,6 +20,47 @@ class TimeEngineStartup:
         engine._cleanup()
 
 
+class TimeStartupCommands:
+    """Time the startup command sequence on an already spawned process."""
+
+    number = 1
+    repeat = 10
+
+    def setup(self):
+        self.engine = OctaveEngine(defer_startup=True)
+
+    def teardown(self):
+        self.engine._cleanup()
+
+    def time_startup_commands(self):
+        self.engine._startup()
+
+
+class TrackStartupRoundTrips:
+    """Track the number of prompt round trips made by the startup sequence."""
+
+    def setup(self):
+        self.engine = OctaveEngine(defer_startup=True)
+
+    def teardown(self):
+        self.engine._cleanup()
+
+    def track_startup_round_trips(self):
+        repl = self.engine.repl
+        run_command = repl.run_command
+        calls = []
+
+        def counting_run_command(*args, **kwargs):
+            calls.append(args)
+            return run_command(*args, **kwargs)
+
+        repl.run_command = counting_run_command  # type: ignore[method-assign]
+        self.engine._startup()
+        return len(calls)
+
+    track_startup_round_trips.unit = "round trips"  # type: ignore[attr-defined]
+
+
 class TimeEvalRoundTrip:
     """Time eval round-trip latency for representative expressions."""
 
@@ -31,6 +79,116 @@ class TimeEvalRoundTrip:
     def time_matrix_output(self):
         self.engine.eval("disp(reshape(1:25, 5, 5))")
 
+    def time_ten_evals(self):
+        for i in range(10):
+            self.engine.eval(f"x{i} = {i};", silent=True)
+
+    def time_eval_many(self):
+        self.engine.eval_many([f"x{i} = {i};" for i in range(10)])
+
+
+class TimeLongCell:
+    """Time a long generated cell, typed line by line or sourced from a file."""
+
+    params: ClassVar[list[int]] = [0, 4096]
+    param_names: ClassVar[list[str]] = ["source_threshold"]
+
+    def setup(self, source_threshold):
+        self.engine = OctaveEngine(source_threshold=source_threshold)
+        self.code = "\n".join(f"x{i} = {i};" for i in range(2000))
+
+    def teardown(self, source_threshold):
+        self.engine._cleanup()
+
+    def time_long_cell(self, source_threshold):
+        self.engine.eval(self.code, silent=True)
+
+
+class TrackStreamMessages:
+    """Track the stream messages sent for a cell that prints many lines.
+
+    An interval of 0 sends one message per chunk, as without coalescing.
+    """
+
+    params: ClassVar[list[float]] = [0.0, 0.05]
+    param_names: ClassVar[list[str]] = ["interval"]
+
+    def setup(self, interval):
+        self.engine = OctaveEngine()
+
+    def teardown(self, interval):
+        self.engine._cleanup()
+
+    def track_stream_messages(self, interval):
+        messages = 0
+
+        def sink(text: str) -> None:
+            nonlocal messages
+            messages += 1
+
+        if interval > 0:
+            output = OutputCoalescer(sink, interval)
+            self.engine.stream_handler = output.write
+        else:
+            self.engine.stream_handler = sink
+        self.engine.eval("for i = 1:10000, disp(i), end")
+        if interval > 0:
+            output.flush()
+        return messages
+
+    track_stream_messages.unit = "messages"  # type: ignore[attr-defined]
+
+
+class _Transport:
+    """Streamed output of a large matrix over each transport."""
+
+    params: ClassVar[list[str]] = ["pty", "pipe"]
+    param_names: ClassVar[list[str]] = ["transport"]
+
+    def setup(self, transport):
+        self.engine = OctaveEngine(transport=transport)
+        self.received = 0
+
+        def count(text: str) -> None:
+            self.received += len(text.encode())
+
+        self.engine.stream_handler = count
+
+    def teardown(self, transport):
+        self.engine._cleanup()
+
+
+class TimeTransportOutput(_Transport):
+    """Time streaming about 8 MB of output over each transport."""
+
+    def time_output(self, transport):
+        self.engine.eval("disp(rand(1000))")
+
+
+class TrackTransportThroughput(_Transport):
+    """Track the output throughput of each transport."""
+
+    def track_throughput(self, transport):
+        start = time.perf_counter()
+        self.engine.eval("disp(rand(1000))")
+        return self.received / 1e6 / (time.perf_counter() - start)
+
+    track_throughput.unit = "MB/s"  # type: ignore[attr-defined]
+
+
+class TimeEnginePool:
+    """Time a pool checkout and checkin, including the ping and the reset."""
+
+    def setup(self):
+        self.pool = OctaveEnginePool(size=1)
+        self.pool.checkin(self.pool.checkout())
+
+    def teardown(self):
+        self.pool.close()
+
+    def time_checkout_checkin(self):
+        self.pool.checkin(self.pool.checkout())
+
 
 class TimeMatrixOps:
     """Time matrix computation evals."""
@@ -49,6 +207,54 @@ class TimeMatrixOps:
         self.engine.eval("e = eig(A);", silent=True)
 
 
+class TimeArrayTransfer:
+    """Time moving a 100 MB array in and out of the Octave workspace."""
+
+    number = 1
+    repeat = 5
+
+    def setup(self):
+        import numpy as np
+
+        self.engine = OctaveEngine()
+        self.array = np.random.default_rng(0).random((3_500, 3_500))
+        self.engine.push("bench_array", self.array)
+
+    def teardown(self):
+        self.engine._cleanup()
+
+    def time_push(self):
+        self.engine.push("bench_array", self.array)
+
+    def time_pull(self):
+        self.engine.pull("bench_array")
+
+
+class TimeEvalValue:
+    """Time getting values out of Octave as Python objects or as text."""
+
+    def setup(self):
+        self.engine = OctaveEngine()
+        self.engine.eval(
+            "bench_matrix = rand(200); "
+            "bench_struct = struct('name', 'x', 'values', {{1:100}});",
+            silent=True,
+        )
+
+    def teardown(self):
+        self.engine._cleanup()
+
+    def time_matrix_value(self):
+        self.engine.eval_value("bench_matrix")
+
+    def time_matrix_disp(self):
+        text = self.engine.eval("disp(bench_matrix)", silent=True)
+        [[float(x) for x in line.split()] for line in text.splitlines()]
+
+    def time_struct_json(self):
+        self.engine.eval_json("bench_struct")
+
+
 class TimeCompletions:
     """Time completion_matches eval (exercises Octave's completion engine)."""
 
@@ -62,6 +268,194 @@ class TimeCompletions:
         self.engine.eval('completion_matches("mat")', silent=True)
 
 
+class TimeCompletionIndex:
+    """Time prefix lookups in the kernel-side completion index."""
+
+    def setup(self):
+        # Roughly the number of functions on a default Octave load path.
+        self.trie = PrefixTrie(f"func_{i:05d}" for i in range(20_000))
+
+    def time_short_prefix(self):
+        self.trie.matches("func_1")
+
+    def time_long_prefix(self):
+        self.trie.matches("func_1234")
+
+
+TOOLKITS = ["gnuplot", "qt", "fltk"]
+FORMATS = ["png", "svg", "pdf", "auto"]
+
+
+class _FigurePipeline:
+    """Shared setup for the inline figure benchmarks.
+
+    The figures are drawn in ``setup``, so that only ``make_figures`` (and
+    ``_make_figures.m``) and ``extract_figures`` are measured.  Toolkits
+    that are not available are skipped.
+    """
+
+    number = 1
+    repeat = 5
+
+    def setup(self, toolkit, *args):
+        self.engine = OctaveEngine(
+            inline_toolkit=toolkit,
+            plot_settings={"backend": "inline", "format": self.plot_format(*args)},
+        )
+        available = self.engine.eval(
+            f'disp(any(strcmp(available_graphics_toolkits(), "{toolkit}")))',
+            silent=True,
+        )
+        if available.strip() != "1":
+            self.engine._cleanup()
+            raise NotImplementedError(f"{toolkit} is not available")
+        self.engine.eval(self.figure_code(*args), silent=True)
+
+    def teardown(self, toolkit, *args):
+        self.engine._cleanup()
+
+    def plot_format(self, *args: Any) -> str:
+        return "png"
+
+    def figure_code(self, *args: Any) -> str:
+        raise NotImplementedError
+
+    def run_pipeline(self) -> None:
+        plot_dir = self.engine.make_figures()
+        if plot_dir is not None:
+            self.engine.extract_figures(plot_dir, remove=True)
+
+
+class _FigureFormats(_FigurePipeline):
+    params: ClassVar[list[list[str]]] = [TOOLKITS, FORMATS]
+    param_names: ClassVar[list[str]] = ["toolkit", "format"]
+
+    def plot_format(self, fmt):
+        return fmt
+
+    def figure_code(self, fmt):
+        return "figure; plot(sin(linspace(0, 2 * pi, 100)));"
+
+
+class TimeFigureFormats(_FigureFormats):
+    """Time saving and reading a simple line plot in each format."""
+
+    def time_figure(self, toolkit, fmt):
+        self.run_pipeline()
+
+
+class PeakMemFigureFormats(_FigureFormats):
+    """Peak memory for saving and reading a simple line plot in each format."""
+
+    def peakmem_figure(self, toolkit, fmt):
+        self.run_pipeline()
+
+
+class _MultipleFigures(_FigurePipeline):
+    params: ClassVar[list[list[Any]]] = [TOOLKITS, [1, 4, 8]]
+    param_names: ClassVar[list[str]] = ["toolkit", "figures"]
+
+    def figure_code(self, n_figures):
+        return f"for i = 1:{n_figures}; figure; plot(rand(10, 1)); end"
+
+
+class TimeMultipleFigures(_MultipleFigures):
+    """Time a cell that leaves several figures open."""
+
+    def time_figures(self, toolkit, n_figures):
+        self.run_pipeline()
+
+
+class PeakMemMultipleFigures(_MultipleFigures):
+    """Peak memory for a cell that leaves several figures open."""
+
+    def peakmem_figures(self, toolkit, n_figures):
+        self.run_pipeline()
+
+
+class _Imshow(_FigurePipeline):
+    # A bare image takes the imwrite fast path in _make_figures.m.
+    params: ClassVar[list[list[Any]]] = [TOOLKITS, [256, 2048]]
+    param_names: ClassVar[list[str]] = ["toolkit", "size"]
+
+    def figure_code(self, size):
+        return f"figure; imshow(rand({size}, {size}));"
+
+
+class TimeImshow(_Imshow):
+    """Time saving and reading a large image shown with imshow."""
+
+    def time_imshow(self, toolkit, size):
+        self.run_pipeline()
+
+
+class PeakMemImshow(_Imshow):
+    """Peak memory for saving and reading a large image shown with imshow."""
+
+    def peakmem_imshow(self, toolkit, size):
+        self.run_pipeline()
+
+
+class _DenseLines(_FigureFormats):
+    def figure_code(self, fmt):
+        return "figure; plot(cumsum(randn(100000, 4)));"
+
+
+class TimeDenseLines(_DenseLines):
+    """Time saving and reading a plot with many line vertices."""
+
+    def time_dense_lines(self, toolkit, fmt):
+        self.run_pipeline()
+
+
+class PeakMemDenseLines(_DenseLines):
+    """Peak memory for saving and reading a plot with many line vertices."""
+
+    def peakmem_dense_lines(self, toolkit, fmt):
+        self.run_pipeline()
+
+
+def _make_svg(n_paths: int) -> str:
+    """Return a gnuplot-like SVG document with ``n_paths`` path elements."""
+    paths = "".join(
+        f'<path stroke-width="1.00" d="M{i},0 L{i},100" stroke="rgb(0,0,0)"/>\n'
+        for i in range(n_paths)
+    )
+    return (
+        '<?xml version="1.0" encoding="utf-8" standalone="no"?>\n'
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 600 400">\n'
+        f"{paths}</svg>\n"
+    )
+
+
+class TimeFixSvgSize:
+    """Time the SVG size fix-up on large documents (no Octave process)."""
+
+    params: ClassVar[list[int]] = [1_000, 10_000, 100_000]
+    param_names: ClassVar[list[str]] = ["paths"]
+
+    def setup(self, n_paths):
+        self.engine = types.SimpleNamespace(plot_settings={"width": -1, "height": -1})
+        self.data = _make_svg(n_paths)
+
+    def time_fix_svg_size(self, n_paths):
+        OctaveEngine._fix_svg_size(self.engine, self.data)  # type: ignore[arg-type]
+
+
+class PeakMemFixSvgSize:
+    """Peak memory for the SVG size fix-up on large documents."""
+
+    params: ClassVar[list[int]] = [1_000, 10_000, 100_000]
+    param_names: ClassVar[list[str]] = ["paths"]
+
+    def setup(self, n_paths):
+        self.engine = types.SimpleNamespace(plot_settings={"width": -1, "height": -1})
+        self.data = _make_svg(n_paths)
+
+    def peakmem_fix_svg_size(self, n_paths):
+        OctaveEngine._fix_svg_size(self.engine, self.data)  # type: ignore[arg-type]
+
+
 class PeakMemEngineStartup:
     """Peak memory for spawning an Octave process."""
 
@@ -84,3 +478,8 @@ class PeakMemEval:
 
     def peakmem_matrix_alloc(self):
         self.engine.eval("A = rand(100, 100);", silent=True)
+
+    def peakmem_streamed_output(self):
+        # About 40 MB of output, streamed as a cell's output would be.
+        self.engine.stream_handler = lambda text: None
+        self.engine.eval("disp(rand(2000))")
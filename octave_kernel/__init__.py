@@ -1,6 +1,7 @@
 """An Octave kernel for Jupyter"""
 
+from ._pool import OctaveEnginePool
 from ._version import __version__
 from .kernel import OctaveKernel
 
-__all__ = ["OctaveKernel", "__version__"]
+__all__ = ["OctaveEnginePool", "OctaveKernel", "__version__"]
@@ -0,0 +1,179 @@
+"""Kernel-side completion index for octave_kernel."""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Iterable
+from typing import Any
+
+# Built-in functions, functions on the load path, and keywords.  These only
+# change with the Octave installation, so they are loaded once per version.
+NAMES_CMD = (
+    'try, printf("%s\\n", __list_functions__(){:}, __builtins__(){:}, '
+    "iskeyword(){:}); end"
+)
+# Workspace variables and functions in the current directory, which can
+# change with every cell.
+WORKSPACE_CMD = 'try, printf("%s\\n", who(){:}, __list_functions__(pwd){:}); end'
+IDENTIFIER_REGEX = re.compile(r"[A-Za-z_]\w*")
+
+_names_by_version: dict[str, PrefixTrie] = {}
+_names_lock = threading.Lock()
+
+
+class PrefixTrie:
+    """A set of names that supports prefix lookups.
+
+    Parameters
+    ----------
+    words
+        Initial names to add.
+    """
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self._root: dict[str, Any] = {}
+        self._size = 0
+        self.update(words)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        node = self._find(word)
+        return node is not None and "" in node
+
+    def add(self, word: str) -> None:
+        """Add a name to the trie."""
+        if not word:
+            return
+        node = self._root
+        for char in word:
+            node = node.setdefault(char, {})
+        if "" not in node:
+            node[""] = True
+            self._size += 1
+
+    def update(self, words: Iterable[str]) -> None:
+        """Add several names to the trie."""
+        for word in words:
+            self.add(word)
+
+    def matches(self, prefix: str) -> list[str]:
+        """Return the sorted names that start with ``prefix``."""
+        node = self._find(prefix)
+        if node is None:
+            return []
+        out = []
+        stack = [(prefix, node)]
+        while stack:
+            word, node = stack.pop()
+            for char, child in node.items():
+                if char:
+                    stack.append((word + char, child))
+                else:
+                    out.append(word)
+        return sorted(out)
+
+    def _find(self, prefix: str) -> dict[str, Any] | None:
+        node = self._root
+        for char in prefix:
+            child = node.get(char)
+            if child is None:
+                return None
+            node = child
+        return node
+
+
+class CompletionIndex:
+    """Completions served from prefix tries, with Octave lookups on a miss.
+
+    Names that only depend on the Octave installation are loaded once per
+    Octave version and shared by all engines in the process.  Once the path
+    of a session changes, e.g. with ``addpath`` or ``pkg load``, the session
+    loads its own names instead.  Workspace variables and functions in the
+    current directory are reloaded on the first completion after
+    :meth:`invalidate`.
+    """
+
+    def __init__(self) -> None:
+        self._workspace: PrefixTrie | None = None
+        self._path_changed = False
+        self._names: PrefixTrie | None = None
+
+    def invalidate(self, path_changed: bool = False) -> None:
+        """Mark the workspace names as stale, e.g. after running a cell.
+
+        Parameters
+        ----------
+        path_changed
+            If True, the path may have changed, so the function names are
+            reloaded as well.
+        """
+        self._workspace = None
+        if path_changed:
+            self._path_changed = True
+            self._names = None
+
+    def complete(self, engine: Any, prefix: str) -> list[str]:
+        """Get the completions for a prefix.
+
+        Parameters
+        ----------
+        engine
+            The :class:`~octave_kernel.kernel.OctaveEngine` to query.
+        prefix
+            The text to complete.
+
+        Returns
+        -------
+        list[str]
+            The sorted completions.
+        """
+        matches: list[str] = []
+        if IDENTIFIER_REGEX.fullmatch(prefix):
+            names, workspace = self._load(engine)
+            matches = sorted(
+                set(names.matches(prefix)) | set(workspace.matches(prefix))
+            )
+        if not matches:
+            # Fields, file names, and names we do not know about yet.
+            cmd = f'completion_matches("{prefix}")'
+            val = engine.eval(cmd, silent=True)
+            matches = val.splitlines() if val else []
+        return matches
+
+    def _load(self, engine: Any) -> tuple[PrefixTrie, PrefixTrie]:
+        """Get the names and workspace names, loading any that are missing.
+
+        Both are loaded with a single round trip when neither is available.
+        """
+        with _names_lock:
+            if self._path_changed:
+                names = self._names
+            else:
+                names = _names_by_version.get(engine.version)
+            workspace = self._workspace
+            cmds = []
+            if names is None:
+                cmds.append(NAMES_CMD)
+            if workspace is None:
+                cmds.append(WORKSPACE_CMD)
+            results = iter(engine.eval_many(cmds) if cmds else [])
+            if names is None:
+                names = PrefixTrie(_parse_names(next(results).output))
+                if self._path_changed:
+                    self._names = names
+                else:
+                    _names_by_version[engine.version] = names
+            if workspace is None:
+                workspace = PrefixTrie(_parse_names(next(results).output))
+                self._workspace = workspace
+        return names, workspace
+
+
+def _parse_names(val: str) -> list[str]:
+    """Parse the output of a command that prints one name per line."""
+    return [name for name in val.splitlines() if IDENTIFIER_REGEX.fullmatch(name)]
@@ -0,0 +1,162 @@
+"""Cached help lookups for octave_kernel."""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, NamedTuple
+
+HELP_PATH = "__octave_kernel_help_path__"
+HELP_NAME_REGEX = re.compile(r"[A-Za-z_][\w.]*")
+# Cells that can change which file a name resolves to.
+PATH_CHANGE_REGEX = re.compile(
+    r"\b(?:addpath|rmpath|path|cd|chdir|pkg|restoredefaultpath)\b"
+)
+
+
+class CacheInfo(NamedTuple):
+    """Statistics for an :class:`LRUCache`, as for ``functools.lru_cache``."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache:
+    """A bounded, thread-safe least recently used cache.
+
+    Parameters
+    ----------
+    maxsize
+        The maximum number of entries; 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[Any, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Get a value and mark it as recently used, counting a hit or miss."""
+        with self._lock:
+            if key in self._data:
+                self._hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self._misses += 1
+            return default
+
+    def put(self, key: Any, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Any) -> None:
+        """Remove an entry, if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries, keeping the statistics."""
+        with self._lock:
+            self._data.clear()
+
+    def cache_info(self) -> CacheInfo:
+        """Return the cache statistics."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.maxsize, len(self._data))
+
+
+class HelpCache:
+    """Help text for Octave names, cached by the file that defines them.
+
+    Each lookup that goes to Octave also asks ``which`` for the defining
+    file.  A cached entry is reused while that file's modification time is
+    unchanged; built-in functions have no file and are reused until the
+    cache is cleared.  Errors (e.g. unknown names) are never cached.
+
+    Parameters
+    ----------
+    maxsize
+        The maximum number of cached entries; 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self._cache = LRUCache(maxsize)
+
+    def get_help(self, engine: Any, obj: str) -> str:
+        """Get the help text for a name.
+
+        Parameters
+        ----------
+        engine
+            The :class:`~octave_kernel.kernel.OctaveEngine` to query.
+        obj
+            The name to get help on.
+
+        Returns
+        -------
+        str
+            The help text.
+        """
+        if self._cache.maxsize <= 0 or not HELP_NAME_REGEX.fullmatch(obj):
+            return engine.eval(f"help {obj}", silent=True)  # type: ignore[no-any-return]
+        entry = self._cache.get(obj)
+        if entry is not None:
+            path, mtime, text = entry
+            if _get_mtime(path) == mtime:
+                return text  # type: ignore[no-any-return]
+            self._cache.pop(obj)
+
+        cmd = f'printf("{HELP_PATH}%s\\n", which("{obj}"));\nhelp {obj}'
+        resp = engine.eval(cmd, silent=True)
+        path, text = _split_help_path(resp)
+        if path is not None and not text.lstrip().startswith("error:"):
+            mtime = _get_mtime(path)
+            if mtime is not None:
+                self._cache.put(obj, (path, mtime, text))
+        return text
+
+    def clear(self) -> None:
+        """Remove all cached entries, e.g. after the load path changed."""
+        self._cache.clear()
+
+    def cache_info(self) -> CacheInfo:
+        """Return the cache statistics."""
+        return self._cache.cache_info()
+
+
+def _split_help_path(resp: str) -> tuple[str | None, str]:
+    """Split the ``which`` marker line from the help text."""
+    start = resp.find(HELP_PATH)
+    if start == -1:
+        return None, resp
+    end = resp.find("\n", start)
+    if end == -1:
+        end = len(resp)
+    path = resp[start + len(HELP_PATH) : end].strip()
+    return path, resp[:start] + resp[end + 1 :]
+
+
+def _get_mtime(path: str) -> int | None:
+    """Get the modification time of a file, or 0 for names without a file."""
+    if not path or not os.path.isabs(path):
+        # Built-in functions, variables, and keywords.
+        return 0
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
@@ -1,14 +1,33 @@
-function _make_figures(plot_dir, fmt, name, wid, hgt, res, start_ind)
+function _make_figures(plot_dir, fmt, name, wid, hgt, res, start_ind, ...
+                       max_points, max_objects)
     %%%% Create figures in the given plot directory.
     %%%%
+    %%%% With the 'auto' format, each figure is saved as svg, or as png if
+    %%%% it has more than max_points data points or max_objects objects.
+    %%%%
+    %%%% Print one manifest line per saved figure:
+    %%%% __octave_kernel_figure__<handle>\t<index>\t<format>\t<bytes>\t<file>
 
     handles = get(0, 'children');
+    file_ind = start_ind;
+    auto_fmt = strcmp(fmt, 'auto');
     for ind = 1:length(handles)
-        filename = sprintf('%s%03d', name, ind + start_ind);
+        h = handles(ind);
+        if (auto_fmt)
+            fmt = choose_format(h, max_points, max_objects);
+        end;
+
+        % Do not overwrite any existing plot files.
+        file_ind = file_ind + 1;
+        filename = sprintf('%s%03d', name, file_ind);
+        while (exist(fullfile(plot_dir, [filename, '.', fmt]), 'file') || ...
+               exist(fullfile(plot_dir, [filename, '.png']), 'file'))
+            file_ind = file_ind + 1;
+            filename = sprintf('%s%03d', name, file_ind);
+        end;
         filepath = fullfile(plot_dir, [filename, '.', fmt]);
         pngpath = fullfile(plot_dir, [filename, '.png']);
 
-        h = handles(ind);
         pos = get(h, 'position');
         % If no width or height is given, use the figure size.
         if (wid < 0 && hgt < 0 && res == 0)
@@ -40,7 +59,7 @@ function _make_figures(plot_dir, fmt, name, wid, hgt, res, start_ind)
                % Fall back on a standard figure save.
                safe_print(h, filepath, pngpath, size_opt);
             end;
-        elseif (fmt == 'svg' && strcmp(graphics_toolkit, 'gnuplot'))
+        elseif (strcmp(fmt, 'svg') && strcmp(graphics_toolkit, 'gnuplot'))
             % there is a bug in gnuplot 5.2 that prevents svgs from drawing.
             %  e.g. "no element found: line 1, column 0"
             set(0, 'currentfigure', h)
@@ -48,11 +67,56 @@ function _make_figures(plot_dir, fmt, name, wid, hgt, res, start_ind)
         else
             safe_print(h, filepath, pngpath, size_opt);
         end;
+        report_figure(h, file_ind, plot_dir, filename, fmt);
         close(h);
     end;
 end;
 
 
+function fmt = choose_format(h, max_points, max_objects)
+  % Use svg for light vector plots and png for heavy ones.
+  fmt = 'png';
+
+  % Images are raster data, which svg would only wrap.
+  if (! isempty(findall(h, 'type', 'image')))
+    return;
+  end;
+
+  if (numel(findall(h)) > max_objects)
+    return;
+  end;
+
+  points = 0;
+  for obj = [findall(h, 'type', 'line'); findall(h, 'type', 'patch')]'
+    points = points + numel(get(obj, 'xdata'));
+  end;
+  for obj = findall(h, 'type', 'surface')'
+    points = points + numel(get(obj, 'zdata'));
+  end;
+  if (points > max_points)
+    return;
+  end;
+
+  fmt = 'svg';
+end;
+
+
+function report_figure(h, file_ind, plot_dir, filename, fmt)
+  % The figure may have been saved as a png instead of the requested format.
+  if (exist(fullfile(plot_dir, [filename, '.', fmt]), 'file'))
+    saved = [filename, '.', fmt];
+  elseif (exist(fullfile(plot_dir, [filename, '.png']), 'file'))
+    saved = [filename, '.png'];
+    fmt = 'png';
+  else
+    return;
+  end;
+  info = dir(fullfile(plot_dir, saved));
+  printf('__octave_kernel_figure__%g\t%d\t%s\t%d\t%s\n', h, file_ind, fmt, ...
+         info.bytes, saved);
+end;
+
+
 function im = check_imwrite(h)
   im = '';
 
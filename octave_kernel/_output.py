@@ -0,0 +1,156 @@
+"""Coalesced stream output for octave_kernel."""
+
+from __future__ import annotations
+
+import contextvars
+import tempfile
+import threading
+from collections.abc import Callable
+from typing import IO
+
+
+class OutputCoalescer:
+    """Batch stream output into fewer, larger messages.
+
+    Text is held until ``max_bytes`` are buffered or ``interval`` seconds
+    have passed since the first buffered chunk, then sent to ``sink`` in a
+    single call.  Output is never reordered: callers flush before sending
+    anything else (e.g. rich display data or an input request).
+
+    Parameters
+    ----------
+    sink
+        Called with the coalesced text.
+    interval
+        The longest time to hold output, in seconds.
+    max_bytes
+        The buffered size at which output is sent at once.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[str], None],
+        interval: float = 0.05,
+        max_bytes: int = 65536,
+    ) -> None:
+        self.sink = sink
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.messages = 0
+        self._chunks: list[str] = []
+        self._size = 0
+        # Reentrant, since the sink may itself ask for a flush.
+        self._lock = threading.RLock()
+        self._timer: threading.Timer | None = None
+
+    def write(self, text: str) -> None:
+        """Buffer text, sending it if the buffer is full."""
+        if not text:
+            return
+        with self._lock:
+            self._chunks.append(text)
+            self._size += len(text)
+            if self._size >= self.max_bytes:
+                self._flush()
+            elif self._timer is None:
+                # Run the flush in the current context, so that it is sent
+                # with the parent header of the current cell.
+                context = contextvars.copy_context()
+                self._timer = threading.Timer(
+                    self.interval, context.run, args=(self.flush,)
+                )
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Send any buffered output."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._chunks:
+            return
+        text = "".join(self._chunks)
+        self._chunks = []
+        self._size = 0
+        self.messages += 1
+        self.sink(text)
+
+
+class OutputLimit:
+    """Cap the streamed output of a cell, writing the rest to a file.
+
+    Parameters
+    ----------
+    directory
+        The directory for the file that holds the output over the limit.
+    max_bytes
+        The most bytes to stream, or 0 for no limit.
+    max_lines
+        The most lines to stream, or 0 for no limit.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 0, max_lines: int = 0) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.bytes = 0
+        self.lines = 0
+        self.spilled_bytes = 0
+        self.path: str | None = None
+        self._file: IO[str] | None = None
+
+    def write(self, text: str) -> str:
+        """Count output, returning the part that is within the limit.
+
+        Once the limit is reached, this and all later output is written
+        to a file instead.
+        """
+        if self._file is None:
+            cut = self._find_cut(text)
+            kept = text[:cut]
+            self.bytes += len(kept.encode())
+            self.lines += kept.count("\n")
+            if cut == len(text):
+                return kept
+            fd, self.path = tempfile.mkstemp(
+                prefix="output-", suffix=".txt", dir=self.directory
+            )
+            self._file = open(fd, "w", encoding="utf-8")  # noqa: SIM115
+            text = text[cut:]
+        else:
+            kept = ""
+        self._file.write(text)
+        self.spilled_bytes += len(text.encode())
+        return kept
+
+    def close(self) -> str | None:
+        """Close the file, returning a note about the output it holds."""
+        if self._file is None:
+            return None
+        self._file.close()
+        self._file = None
+        return (
+            f"Output limit reached; the remaining {self.spilled_bytes} bytes "
+            f"were written to {self.path}\n"
+        )
+
+    def _find_cut(self, text: str) -> int:
+        """Find how much of the text fits in the limit."""
+        cut = len(text)
+        if self.max_bytes:
+            data = text.encode()
+            if self.bytes + len(data) > self.max_bytes:
+                room = data[: max(self.max_bytes - self.bytes, 0)]
+                cut = len(room.decode(errors="ignore"))
+        if self.max_lines:
+            pos = -1
+            for _ in range(max(self.max_lines - self.lines, 0)):
+                pos = text.find("\n", pos + 1)
+                if pos == -1:
+                    return cut
+            cut = min(cut, pos + 1)
+        return cut
@@ -0,0 +1,292 @@
+"""Pipe transport for octave_kernel."""
+
+from __future__ import annotations
+
+import codecs
+import contextlib
+import os
+import select
+import signal
+import subprocess
+import time
+import uuid
+from typing import Any
+
+from metakernel.pexpect import EOF, TIMEOUT
+
+# Starts every control frame, so frames can be told apart from output.
+FRAME_START = b"\x1e"
+READ_SIZE = 65536
+
+
+class PipeREPL:
+    """Run Octave over plain pipes, with framed control messages.
+
+    Provides the parts of :class:`metakernel.REPLWrapper` used by the kernel
+    (``run_command``, ``interrupt``, ``sendline``, ``terminate``, and
+    ``child.before``), without a pty or prompt regexes.
+
+    Each command is written to a file in ``tmp_dir`` and sent as a single
+    line that sources it and then prints a frame.  A frame is a line
+    ``\\x1e<token> <kind> <value>``, where the token is random per session:
+
+    ``error <n>``
+        Followed by the ``n`` byte message of an error raised by the command.
+    ``done <id>``
+        The command with this id has finished.
+
+    Everything else is output.  Input requests are found by their prompt
+    marker at the end of the output, as with the pty transport.
+
+    Parameters
+    ----------
+    cmd
+        The Octave command line.
+    tmp_dir
+        The directory for command files.
+    stdin_prompts
+        Text that ends the prompt of a request for input.
+    label
+        Shown in place of the command file name in error messages.
+    """
+
+    def __init__(
+        self,
+        cmd: list[str],
+        tmp_dir: str,
+        stdin_prompts: tuple[str, ...] = (),
+        label: str = "cell",
+    ) -> None:
+        self.tmp_dir = tmp_dir
+        self.stdin_prompts = tuple(prompt.encode() for prompt in stdin_prompts)
+        self.label = label
+        self.prompt_change_cmd = ""
+        self.before = ""
+        self.last_error: str | None = None
+        self._token = uuid.uuid4().hex.encode()
+        self._marker = FRAME_START + self._token + b" "
+        self._ids = 0
+        self._pending = b""
+        # A new session, so a SIGINT sent to the kernel does not reach Octave.
+        self.process = subprocess.Popen(  # noqa: S603
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+        assert self.process.stdin is not None  # noqa: S101
+        assert self.process.stdout is not None  # noqa: S101
+        self._stdin = self.process.stdin
+        self._fd = self.process.stdout.fileno()
+        try:
+            # Drop the banner and the first prompt, and silence the prompts.
+            cmd_id = self._next_id()
+            self.sendline(f"PS1(''); PS2(''); {self._done_cmd(cmd_id)}")
+            self._read_until(cmd_id, 30, None, None, None)
+        except BaseException:
+            self.terminate()
+            raise
+
+    @property
+    def child(self) -> PipeREPL:
+        """The wrapper itself, which has ``before`` as a pexpect child does."""
+        return self
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def run_command(
+        self,
+        command: str,
+        timeout: float | None = None,
+        stream_handler: Any = None,
+        line_handler: Any = None,
+        stdin_handler: Any = None,
+    ) -> str:
+        """Run a command, see :meth:`metakernel.REPLWrapper.run_command`.
+
+        Returns the output, or ``""`` if it was passed to a handler.
+        """
+        if not command.strip():
+            raise ValueError("No command was given")
+        name = f"cell_{uuid.uuid4().hex}"
+        path = os.path.join(self.tmp_dir, f"{name}.m")
+        with open(path, "w", encoding="utf-8") as fid:
+            fid.write(command)
+        self._path = path.replace(os.path.sep, "/")
+        source = self._path.replace("'", "''")
+        error = (
+            f'printf("\\036{self._token.decode()} error %d\\n%s", '
+            "numel(lasterr()), lasterr())"
+        )
+        cmd_id = self._next_id()
+        self.last_error = None
+        try:
+            self.sendline(
+                f"try, source('{source}'); catch, {error}; end; "
+                f"{self._done_cmd(cmd_id)}"
+            )
+            out = self._read_until(
+                cmd_id, timeout, stream_handler, line_handler, stdin_handler
+            )
+        finally:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+        if stream_handler or line_handler:
+            return ""
+        return out
+
+    def interrupt(self, continuation: bool = False) -> str:
+        """Interrupt Octave and return the output up to the interruption."""
+        cmd_id = self.send_interrupt()
+        while True:
+            try:
+                return self._read_until(cmd_id, None, None, None, None)
+            except KeyboardInterrupt:
+                pass
+
+    def send_interrupt(self) -> int:
+        """Interrupt Octave without reading its output.
+
+        An interrupt is not caught by ``try``, so the running command may
+        never print its done frame.  This sends the frame again, so that a
+        thread that is reading the output of the command returns.  Returns
+        the id of the command.
+        """
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(self.process.pid, signal.SIGINT)
+        cmd_id = self._ids
+        self.sendline(self._done_cmd(cmd_id))
+        return cmd_id
+
+    def sendline(self, line: str = "") -> None:
+        """Send a line to Octave."""
+        try:
+            self._stdin.write(line.encode() + b"\n")
+            self._stdin.flush()
+        except (BrokenPipeError, ValueError) as e:
+            raise EOF("Octave has exited") from e
+
+    def terminate(self) -> None:
+        """Stop the Octave process."""
+        with contextlib.suppress(OSError):
+            self._stdin.close()
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(1)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        if self.process.stdout is not None:
+            self.process.stdout.close()
+
+    def _next_id(self) -> int:
+        self._ids += 1
+        return self._ids
+
+    def _done_cmd(self, cmd_id: int) -> str:
+        return (
+            f'printf("\\036{self._token.decode()} done {cmd_id}\\n"); fflush(stdout);'
+        )
+
+    def _read_until(
+        self,
+        cmd_id: int,
+        timeout: float | None,
+        stream_handler: Any,
+        line_handler: Any,
+        stdin_handler: Any,
+    ) -> str:
+        """Pass on output until the done frame of a command."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        out: list[str] = []
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def emit(data: bytes) -> None:
+            text = decoder.decode(data)
+            if not text:
+                return
+            if stream_handler:
+                stream_handler(text)
+            elif line_handler:
+                for line in text.splitlines():
+                    line_handler(line)
+            else:
+                out.append(text)
+
+        pending, self._pending = self._pending, b""
+        try:
+            while True:
+                start = pending.find(self._marker)
+                if start >= 0:
+                    emit(pending[:start])
+                    pending = pending[start:]
+                    end = pending.find(b"\n")
+                    if end >= 0:
+                        kind, _, value = pending[len(self._marker) : end].partition(
+                            b" "
+                        )
+                        if kind == b"error":
+                            size = int(value)
+                            if len(pending) >= end + 1 + size:
+                                message = pending[end + 1 : end + 1 + size].decode(
+                                    errors="replace"
+                                )
+                                message = self._relabel(message)
+                                self.last_error = message
+                                emit(f"error: {message}\n".encode())
+                                pending = pending[end + 1 + size :]
+                                continue
+                        else:
+                            pending = pending[end + 1 :]
+                            if kind == b"done" and int(value) == cmd_id:
+                                emit(b"")
+                                return "".join(out)
+                            continue
+                else:
+                    # Pass on complete lines, keeping the last partial line
+                    # in case it is the start of a frame or an input prompt.
+                    end = pending.rfind(b"\n") + 1
+                    if end:
+                        emit(pending[:end])
+                        pending = pending[end:]
+                    if pending.rstrip().endswith(self.stdin_prompts) and (
+                        not self._wait_readable(0.05)
+                    ):
+                        prompt = pending.decode(errors="replace")
+                        pending = b""
+                        if not stdin_handler:
+                            raise ValueError(
+                                "Stdin Requested but no stdin handler available"
+                            )
+                        self.sendline(stdin_handler(prompt))
+                        continue
+                pending += self._read(deadline)
+        finally:
+            self._pending = pending
+            self.before = "".join(out)
+
+    def _read(self, deadline: float | None) -> bytes:
+        """Read the next chunk of output."""
+        remaining = None
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._wait_readable(remaining):
+                raise TIMEOUT("Timed out")
+        data = os.read(self._fd, READ_SIZE)
+        if not data:
+            raise EOF("Octave has exited")
+        return data
+
+    def _wait_readable(self, timeout: float) -> bool:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        return bool(readable)
+
+    def _relabel(self, text: str) -> str:
+        path = getattr(self, "_path", None)
+        if path:
+            text = text.replace(path, self.label)
+        return text
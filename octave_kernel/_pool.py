@@ -0,0 +1,366 @@
+"""A pool of Octave engines for octave_kernel."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import subprocess
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, NamedTuple, Self
+
+from .kernel import OctaveEngine
+
+PING_MARKER = "__octave_kernel_pong__"
+
+
+class PoolStats(NamedTuple):
+    """Statistics for an :class:`OctaveEnginePool`."""
+
+    idle: int
+    busy: int
+    starting: int
+    started: int
+    recycled: int
+
+
+class OctaveEnginePool:
+    """A pool of started Octave engines, for use by many callers.
+
+    ``size`` engines are started in the background when the pool is created.
+    :meth:`checkout` hands out an idle engine, after checking with a cheap
+    ping that it still responds.  :meth:`checkin` returns it to the pool,
+    after resetting its workspace with ``clear all``, ``close all``, and a
+    ``cd`` back to the directory it started in.  An engine that fails the
+    ping or the reset, has been checked out ``max_uses`` times, or whose
+    process uses more than ``max_rss`` bytes of memory is stopped and
+    replaced by a new one.
+
+    Parameters
+    ----------
+    size
+        The number of engines to keep.
+    max_uses
+        Replace an engine after this many checkouts; 0 for no limit.
+    max_rss
+        Replace an engine when the resident memory of its process is over
+        this many bytes when it is checked in; 0 for no limit.  The memory
+        is read from ``/proc`` or ``ps``, and is not checked where neither
+        is available.
+    ping
+        If True (default), ping each engine before it is checked out.
+    ping_timeout
+        Seconds to wait for the ping or the reset.
+    logger
+        Logger instance; defaults to the module-level logger.
+    **engine_kwargs
+        Passed to :class:`~octave_kernel.kernel.OctaveEngine`.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_uses: int = 0,
+        max_rss: int = 0,
+        ping: bool = True,
+        ping_timeout: float = 10,
+        logger: Any = None,
+        **engine_kwargs: Any,
+    ) -> None:
+        if size < 1:
+            raise ValueError("The pool size must be at least 1")
+        self.size = size
+        self.max_uses = max_uses
+        self.max_rss = max_rss
+        self.ping = ping
+        self.ping_timeout = ping_timeout
+        self.logger = logger or logging.getLogger(__name__)
+        self.engine_kwargs = engine_kwargs
+        self._idle: deque[OctaveEngine] = deque()
+        self._busy: set[OctaveEngine] = set()
+        self._uses: dict[OctaveEngine, int] = {}
+        self._cwds: dict[OctaveEngine, str] = {}
+        self._starting = 0
+        self._started = 0
+        self._recycled = 0
+        self._start_error: BaseException | None = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(
+            max_workers=size, thread_name_prefix="octave-pool"
+        )
+        for _ in range(size):
+            self._start()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def checkout(self, timeout: float | None = None) -> OctaveEngine:
+        """Take an engine from the pool, waiting for one to be idle.
+
+        Parameters
+        ----------
+        timeout
+            Seconds to wait for an engine; ``None`` waits indefinitely.
+
+        Returns
+        -------
+        OctaveEngine
+            The engine, which must be returned with :meth:`checkin`.
+
+        Raises
+        ------
+        TimeoutError
+            If no engine was idle within the timeout.
+        RuntimeError
+            If the pool is closed, or no engine could be started.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while not self._idle:
+                    if self._closed:
+                        raise RuntimeError("The pool is closed")
+                    if self._start_error and not self._starting and not self._uses:
+                        raise RuntimeError(
+                            "Could not start an Octave engine"
+                        ) from self._start_error
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError("No Octave engine is available")
+                    self._cond.wait(remaining)
+                if self._closed:
+                    raise RuntimeError("The pool is closed")
+                engine = self._idle.popleft()
+                self._busy.add(engine)
+            if not self.ping or self._ping(engine):
+                with self._cond:
+                    self._uses[engine] += 1
+                return engine
+            self.logger.warning("Replacing an Octave engine that failed a ping")
+            self._replace(engine)
+
+    def checkin(self, engine: OctaveEngine) -> None:
+        """Reset an engine and return it to the pool.
+
+        Parameters
+        ----------
+        engine
+            An engine from :meth:`checkout`.
+
+        Raises
+        ------
+        ValueError
+            If the engine is not checked out from this pool.
+        """
+        with self._cond:
+            if engine not in self._busy:
+                raise ValueError("The engine is not checked out from this pool")
+            closed = self._closed
+        if closed:
+            self._retire(engine)
+            return
+        reason = self._recycle_reason(engine)
+        if reason is None and not self._reset(engine):
+            reason = "it failed to reset"
+        if reason is not None:
+            self.logger.info("Replacing an Octave engine, since %s", reason)
+            self._replace(engine)
+            return
+        with self._cond:
+            self._busy.discard(engine)
+            self._idle.append(engine)
+            self._cond.notify()
+
+    async def checkout_async(self, timeout: float | None = None) -> OctaveEngine:
+        """Take an engine from the pool without blocking the event loop.
+
+        See :meth:`checkout`.  If the call is cancelled, an engine that is
+        checked out after all is returned to the pool.
+        """
+        future = asyncio.ensure_future(asyncio.to_thread(self.checkout, timeout))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(self._checkin_orphan)
+            raise
+
+    async def checkin_async(self, engine: OctaveEngine) -> None:
+        """Reset an engine and return it to the pool, see :meth:`checkin`."""
+        await asyncio.to_thread(self.checkin, engine)
+
+    @contextlib.contextmanager
+    def engine(self, timeout: float | None = None) -> Iterator[OctaveEngine]:
+        """Check out an engine for the duration of a ``with`` block."""
+        engine = self.checkout(timeout)
+        try:
+            yield engine
+        finally:
+            self.checkin(engine)
+
+    @contextlib.asynccontextmanager
+    async def engine_async(
+        self, timeout: float | None = None
+    ) -> AsyncIterator[OctaveEngine]:
+        """Check out an engine for the duration of an ``async with`` block."""
+        engine = await self.checkout_async(timeout)
+        try:
+            yield engine
+        finally:
+            await self.checkin_async(engine)
+
+    def stats(self) -> PoolStats:
+        """Return the pool statistics."""
+        with self._cond:
+            return PoolStats(
+                len(self._idle),
+                len(self._busy),
+                self._starting,
+                self._started,
+                self._recycled,
+            )
+
+    def close(self) -> None:
+        """Stop the idle engines, and any others when they are checked in."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for engine in idle:
+            self._retire(engine)
+
+    def _start(self) -> None:
+        """Start a new engine in the background."""
+        with self._cond:
+            self._starting += 1
+        try:
+            future: Future[None] = self._executor.submit(self._start_engine)
+        except RuntimeError:
+            # The executor was shut down by close().
+            with self._cond:
+                self._starting -= 1
+            return
+        future.add_done_callback(self._start_done)
+
+    def _start_done(self, future: Future[None]) -> None:
+        if future.cancelled():
+            with self._cond:
+                self._starting -= 1
+                self._cond.notify_all()
+
+    def _start_engine(self) -> None:
+        cwd = os.getcwd()
+        try:
+            engine = OctaveEngine(**self.engine_kwargs)
+        except BaseException as e:  # noqa: BLE001
+            self.logger.error("Could not start an Octave engine: %s", e)
+            with self._cond:
+                self._starting -= 1
+                self._start_error = e
+                self._cond.notify_all()
+            return
+        with self._cond:
+            self._starting -= 1
+            self._started += 1
+            if not self._closed:
+                self._uses[engine] = 0
+                self._cwds[engine] = cwd
+                self._idle.append(engine)
+                self._cond.notify()
+                return
+        self._retire(engine)
+
+    def _replace(self, engine: OctaveEngine) -> None:
+        """Stop an engine and start another in its place."""
+        with self._cond:
+            self._recycled += 1
+        self._retire(engine)
+        self._start()
+
+    def _retire(self, engine: OctaveEngine) -> None:
+        """Stop an engine and forget about it."""
+        with self._cond:
+            self._busy.discard(engine)
+            self._uses.pop(engine, None)
+            self._cwds.pop(engine, None)
+            self._cond.notify_all()
+        # This also removes its exit handlers, so a long-lived pool does not
+        # collect them.
+        try:
+            engine._cleanup()
+        except Exception as e:  # noqa: BLE001
+            self.logger.debug(str(e))
+
+    def _checkin_orphan(self, future: asyncio.Future[OctaveEngine]) -> None:
+        """Return an engine checked out for a cancelled caller."""
+        if not future.cancelled() and future.exception() is None:
+            threading.Thread(
+                target=self.checkin, args=(future.result(),), daemon=True
+            ).start()
+
+    def _ping(self, engine: OctaveEngine) -> bool:
+        """Check that an engine responds."""
+        try:
+            resp = engine.eval(
+                f'printf("{PING_MARKER}")', timeout=self.ping_timeout, silent=True
+            )
+        except Exception as e:  # noqa: BLE001
+            self.logger.debug(str(e))
+            return False
+        return PING_MARKER in (resp or "")
+
+    def _reset(self, engine: OctaveEngine) -> bool:
+        """Clear the workspace and figures, and go back to the start dir."""
+        cwd = self._cwds.get(engine, os.getcwd()).replace(os.path.sep, "/")
+        cwd = cwd.replace('"', '\\"')
+        cmd = f'clear all; close all; cd("{cwd}"); printf("{PING_MARKER}")'
+        try:
+            resp = engine.eval(cmd, timeout=self.ping_timeout, silent=True)
+        except Exception as e:  # noqa: BLE001
+            self.logger.debug(str(e))
+            return False
+        return PING_MARKER in (resp or "")
+
+    def _recycle_reason(self, engine: OctaveEngine) -> str | None:
+        """Get the reason to replace an engine, if it should be replaced."""
+        if self.max_uses and self._uses.get(engine, 0) >= self.max_uses:
+            return f"it was used {self.max_uses} times"
+        if self.max_rss:
+            rss = _get_rss(engine.repl.child.pid)
+            if rss is not None and rss > self.max_rss:
+                return f"it uses {rss} bytes of memory"
+        return None
+
+
+def _get_rss(pid: int) -> int | None:
+    """Get the resident set size of a process in bytes, if it can be read."""
+    try:
+        with open(f"/proc/{pid}/status") as fid:
+            for line in fid:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        out = subprocess.check_output(  # noqa: S603
+            ["ps", "-o", "rss=", "-p", str(pid)],  # noqa: S607
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        return int(out.strip()) * 1024
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return None
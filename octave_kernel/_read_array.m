@@ -0,0 +1,25 @@
+function x = _read_array(filename, cls, dims, is_complex)
+    %%%% Read an array written by the kernel.
+    %%%%
+    %%%% The file holds the little-endian elements in column-major order,
+    %%%% with the real and imaginary parts interleaved for complex arrays.
+
+    fid = fopen(filename, 'r', 'ieee-le');
+    if (fid < 0)
+        error('_read_array: cannot open %s', filename);
+    end;
+    unwind_protect
+        if (strcmp(cls, 'logical'))
+            x = logical(fread(fid, Inf, '*uint8'));
+        else
+            x = fread(fid, Inf, ['*', cls]);
+        end;
+    unwind_protect_cleanup
+        fclose(fid);
+    end_unwind_protect
+    if (is_complex)
+        x = reshape(x, 2, []);
+        x = complex(x(1, :), x(2, :));
+    end;
+    x = reshape(x, dims);
+end;
@@ -2,13 +2,23 @@
 
 from __future__ import annotations
 
+import contextlib
+import json
 import os
+import shlex
 import subprocess
+import tempfile
+from typing import Any
 
+from jupyter_core.paths import jupyter_runtime_dir
 from metakernel.pexpect import which
 
+CACHE_FILENAME = "octave_kernel_cache.json"
+FLATPAK_APP = "org.octave.Octave"
+FLATPAK_EXECUTABLE = f"flatpak run {FLATPAK_APP}"
 
-def get_octave_executable(executable: str = "") -> str:
+
+def get_octave_executable(executable: str = "", refresh: bool = False) -> str:
     """Find the Octave executable.
 
     Parameters
@@ -17,6 +27,9 @@ def get_octave_executable(executable: str = "") -> str:
         Explicit path or command to use. If empty, the function searches in
         order: ``OCTAVE_EXECUTABLE`` env var, ``octave`` on PATH,
         ``octave-cli`` on PATH, then the flatpak ``org.octave.Octave`` app.
+    refresh
+        If True, ignore a cached flatpak lookup and run ``flatpak info``
+        again.
 
     Returns
     -------
@@ -34,16 +47,22 @@ def get_octave_executable(executable: str = "") -> str:
         if not executable:
             executable = which("octave-cli") or ""
         if not executable:
-            # Try flatpak as a fallback.
+            # Try flatpak as a fallback, reusing a previous positive lookup
+            # while the same deployment of the flatpak app is active.
+            key = _cache_key("executable", FLATPAK_EXECUTABLE)
+            if not refresh and key and read_cache(key) == FLATPAK_EXECUTABLE:
+                return FLATPAK_EXECUTABLE
             try:
-                subprocess.check_call(
-                    ["flatpak", "info", "org.octave.Octave"],  # noqa: S607
+                subprocess.check_call(  # noqa: S603
+                    ["flatpak", "info", FLATPAK_APP],  # noqa: S607
                     stdout=subprocess.DEVNULL,
                     stderr=subprocess.DEVNULL,
                 )
-                executable = "flatpak run org.octave.Octave"
+                executable = FLATPAK_EXECUTABLE
             except (subprocess.CalledProcessError, FileNotFoundError):
                 raise OSError("octave not found, please see README") from None
+            if key:
+                write_cache(key, executable)
     if not executable:
         raise OSError("octave not found, please see README")
 
@@ -70,3 +89,153 @@ def is_sandboxed_octave(executable: str = "") -> bool:
         except OSError:
             return False
     return "flatpak" in executable or "snap" in executable
+
+
+def get_cached_version(executable: str, cli_options: str = "") -> str | None:
+    """Return the cached Octave version for an executable, if still valid.
+
+    Parameters
+    ----------
+    executable
+        The Octave executable string.
+    cli_options
+        The command-line options the executable is run with.
+
+    Returns
+    -------
+    str or None
+        The cached version string, or None if there is no valid entry.
+    """
+    key = _cache_key("version", executable, cli_options)
+    if not key:
+        return None
+    value = read_cache(key)
+    return value if isinstance(value, str) else None
+
+
+def set_cached_version(executable: str, version: str, cli_options: str = "") -> None:
+    """Store the Octave version for an executable in the on-disk cache.
+
+    Parameters
+    ----------
+    executable
+        The Octave executable string.
+    version
+        The version string reported by the executable.
+    cli_options
+        The command-line options the executable is run with.
+    """
+    key = _cache_key("version", executable, cli_options)
+    if key:
+        write_cache(key, version)
+
+
+def read_cache(key: str) -> Any:
+    """Read a value from the on-disk cache, or None if it is missing."""
+    try:
+        with open(_cache_path()) as fid:
+            data = json.load(fid)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    return data.get(key)
+
+
+def write_cache(key: str, value: Any) -> None:
+    """Write a value to the on-disk cache.
+
+    The file is replaced atomically so that concurrent kernels never see a
+    partially written cache.  Failures are ignored, the cache is only an
+    optimization.
+    """
+    path = _cache_path()
+    try:
+        with open(path) as fid:
+            data = json.load(fid)
+        if not isinstance(data, dict):
+            data = {}
+    except (OSError, ValueError):
+        data = {}
+    data[key] = value
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w") as fid:
+            json.dump(data, fid)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError):
+        pass
+    finally:
+        if os.path.exists(tmp_path):
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+
+def _cache_path() -> str:
+    """Get the path of the on-disk cache file."""
+    return os.path.join(jupyter_runtime_dir(), CACHE_FILENAME)
+
+
+def _cache_key(kind: str, executable: str, cli_options: str = "") -> str | None:
+    """Build a cache key for a kind of entry about an executable string.
+
+    The kind (e.g. ``"executable"`` or ``"version"``) keeps entries about
+    the same executable apart.
+
+    Every non-option word of the executable that resolves to a file (e.g.
+    ``xvfb-run`` and ``octave``, or ``flatpak``) contributes its resolved
+    path, inode, and modification time, so that upgrading or replacing a
+    binary invalidates the entry.  The app run by ``flatpak run``
+    contributes its active deployment directory, which is named after the
+    installed commit, so that updating the app invalidates the entry.
+    Returns None if nothing can be resolved.
+    """
+    parts = []
+    resolved = False
+    words = [word for word in shlex.split(executable) if not word.startswith("-")]
+    for i, word in enumerate(words):
+        if (
+            i >= 2
+            and words[i - 1] == "run"
+            and os.path.basename(words[i - 2]) == "flatpak"
+        ):
+            path = _flatpak_deploy_dir(word)
+            if not path:
+                return None
+        else:
+            path = which(word)
+        if not path:
+            parts.append(word)
+            continue
+        try:
+            path = os.path.realpath(path)
+            stat = os.stat(path)
+        except OSError:
+            return None
+        parts.append(f"{path}|{stat.st_ino}|{stat.st_mtime_ns}")
+        resolved = True
+    if not resolved:
+        return None
+    return json.dumps([kind, parts, cli_options])
+
+
+def _flatpak_deploy_dir(app: str) -> str | None:
+    """Get the active deployment directory of a flatpak app, if installed.
+
+    The user installation is searched before the system one, as ``flatpak
+    run`` does.
+    """
+    installations = [
+        os.environ.get("FLATPAK_USER_DIR")
+        or os.path.join(os.path.expanduser("~"), ".local", "share", "flatpak"),
+        os.environ.get("FLATPAK_SYSTEM_DIR") or "/var/lib/flatpak",
+    ]
+    for installation in installations:
+        path = os.path.join(installation, "app", app, "current", "active")
+        if os.path.isdir(path):
+            return path
+    return None
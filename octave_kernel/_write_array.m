@@ -0,0 +1,36 @@
+function _write_array(x, filename)
+    %%%% Write an array for the kernel to read.
+    %%%%
+    %%%% Print a header line:
+    %%%% __octave_kernel_array__<class>\t<complex>\t<dims>
+    %%%% and write the little-endian elements in column-major order, with
+    %%%% the real and imaginary parts interleaved for complex arrays.
+
+    if (!(isnumeric(x) || islogical(x)))
+        error('_write_array: cannot transfer a %s', class(x));
+    end;
+    if (issparse(x))
+        x = full(x);
+    end;
+    cls = class(x);
+    if (islogical(x))
+        precision = 'uint8';
+    else
+        precision = cls;
+    end;
+    fid = fopen(filename, 'w', 'ieee-le');
+    if (fid < 0)
+        error('_write_array: cannot open %s', filename);
+    end;
+    unwind_protect
+        if (iscomplex(x))
+            fwrite(fid, [real(x(:)).'; imag(x(:)).'], precision);
+        else
+            fwrite(fid, x, precision);
+        end;
+    unwind_protect_cleanup
+        fclose(fid);
+    end_unwind_protect
+    printf('__octave_kernel_array__%s\t%d\t%s\n', cls, iscomplex(x), ...
+           sprintf('%d ', size(x)));
+end;
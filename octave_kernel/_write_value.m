@@ -0,0 +1,16 @@
+function _write_value(filename, x)
+    %%%% Write the value of an expression for the kernel to decode.
+    %%%%
+    %%%% Numeric and logical arrays other than real scalars are written with
+    %%%% _write_array when a filename is given.  Everything else is printed
+    %%%% on one line as:
+    %%%% __octave_kernel_json__<jsonencode(x)>
+
+    if (!isempty(filename) && (isnumeric(x) || islogical(x)) ...
+        && (numel(x) != 1 || iscomplex(x)))
+        _write_array(x, filename);
+    else
+        printf('__octave_kernel_json__%s\n', ...
+               jsonencode(x, 'ConvertInfAndNaN', false));
+    end;
+end;
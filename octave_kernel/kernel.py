@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
 import atexit
 import base64
 import contextlib
+import functools
 import glob
 import json
 import logging
@@ -15,20 +17,89 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+import time
 import uuid
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from importlib.resources import files
-from typing import Any
-from xml.dom import minidom
+from typing import Any, NamedTuple, cast
 
 from IPython.display import SVG, Image
 from metakernel import MetaKernel, ProcessMetaKernel, REPLWrapper, u
-from traitlets import Bool, Dict, Unicode
-
-from ._utils import get_octave_executable, is_sandboxed_octave
+from metakernel._metakernel import format_message
+from metakernel.pexpect import EOF, TIMEOUT
+from metakernel.replwrap import strip_bracketing
+from traitlets import Bool, Dict, Float, Int, Unicode
+
+from ._completion import CompletionIndex
+from ._help import PATH_CHANGE_REGEX, CacheInfo, HelpCache
+from ._output import OutputCoalescer, OutputLimit
+from ._pipe import PipeREPL
+from ._utils import (
+    get_cached_version,
+    get_octave_executable,
+    is_sandboxed_octave,
+    set_cached_version,
+)
 from ._version import __version__
 
 STDIN_PROMPT = "__stdin_prompt>"
 STDIN_PROMPT_REGEX = re.compile(rf"\A.+?{STDIN_PROMPT}|debug> ", re.DOTALL)
+STARTUP_ERROR = "__octave_kernel_startup_error__"
+# Startup steps configured by the user, whose failures are shown to the user.
+USER_STARTUP_STEPS = ("octaverc", "plot_settings")
+FIGURE_MANIFEST = "__octave_kernel_figure__"
+FIGURE_COUNT = "__octave_kernel_figures__"
+EVAL_MARKER = "__octave_kernel_eval__"
+EVAL_ERROR = "__octave_kernel_eval_error__"
+FIGURE_TRANSPORTS = ("auto", "shm", "file")
+TRANSPORTS = ("pty", "pipe")
+SHM_DIR = "/dev/shm"  # noqa: S108
+# Threads used to read and encode the figures of a cell.
+FIGURE_WORKERS = 4
+# Characters of a partial line held back while streaming; longer lines are
+# passed on before they end.
+STREAM_PARTIAL_LIMIT = 65536
+# With the "auto" plot format, figures with more data points or graphics
+# objects than these are saved as png instead of svg.
+SVG_MAX_POINTS = 10000
+SVG_MAX_OBJECTS = 1000
+# Shown in place of the temp file name in errors from a sourced cell.
+SOURCE_LABEL = "cell"
+ARRAY_HEADER = "__octave_kernel_array__"
+JSON_HEADER = "__octave_kernel_json__"
+# numpy dtype kind and item size to Octave class, for arrays moved by
+# OctaveEngine.push and OctaveEngine.pull.
+OCTAVE_CLASSES = {
+    ("b", 1): "logical",
+    ("i", 1): "int8",
+    ("i", 2): "int16",
+    ("i", 4): "int32",
+    ("i", 8): "int64",
+    ("u", 1): "uint8",
+    ("u", 2): "uint16",
+    ("u", 4): "uint32",
+    ("u", 8): "uint64",
+    ("f", 4): "single",
+    ("f", 8): "double",
+    ("c", 8): "single",
+    ("c", 16): "double",
+}
+NUMPY_DTYPES = {"logical": "bool", "single": "float32", "double": "float64"}
+IDENTIFIER_REGEX = re.compile(r"[A-Za-z_]\w*")
+FIGURE_COUNT_REGEX = re.compile(rf"{FIGURE_COUNT}(\d+)")
+# Each marker is printed on a line of its own, after a newline that is not
+# part of the output of the previous statement.
+EVAL_MARKER_REGEX = re.compile(rf"\n{EVAL_MARKER}(\d+)\n")
+# Appended to each cell, so that the kernel learns whether there are any
+# figures to render without a separate round trip.  There is no trailing
+# newline, so the marker is followed directly by the prompt.
+FIGURE_COUNT_CMD = f'printf("{FIGURE_COUNT}%d", numel(get(0, "children")));'
+# The root <svg> start tag, allowing for ">" inside quoted attribute values.
+SVG_ROOT_REGEX = re.compile(r"""<svg\b(?:[^>"']|"[^"]*"|'[^']*')*>""")
+SVG_VIEWBOX_REGEX = re.compile(r"""\sviewBox\s*=\s*(["'])(.*?)\1""")
+SVG_SIZE_REGEX = re.compile(r"""\s(?:width|height)\s*=\s*(["']).*?\1""")
 HELP_LINKS = [
     {
         "text": "GNU Octave",
@@ -42,6 +113,56 @@ HELP_LINKS = [
 ]
 
 
+class FigureInfo(NamedTuple):
+    """A figure saved by ``_make_figures``, as listed in its manifest."""
+
+    filename: str
+    format: str
+    size: int
+    handle: float
+    file_index: int
+
+
+class EvalResult(NamedTuple):
+    """The result of one statement run by :meth:`OctaveEngine.eval_many`."""
+
+    output: str
+    error: str | None
+
+
+class StartupFuture(Future["OctaveEngine"]):
+    """The future of an engine started in the background.
+
+    Errors reported while the engine starts up are kept in ``errors``
+    rather than sent to the frontend, since there is no request to send
+    them for.  They are reported when the engine is first used.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.errors: list[Any] = []
+
+
+def _relabeled(handler: Any, relabel: Callable[[str], str]) -> Any:
+    """Wrap an output handler to pass on relabeled text."""
+    if not handler:
+        return handler
+    return lambda text: handler(relabel(text))
+
+
+def parse_figure_manifest(resp: str) -> list[FigureInfo]:
+    """Parse the manifest lines printed by ``_make_figures``."""
+    figures = []
+    for line in resp.splitlines():
+        if not line.startswith(FIGURE_MANIFEST):
+            continue
+        handle, index, fmt, size, filename = line[len(FIGURE_MANIFEST) :].split("\t", 4)
+        figures.append(
+            FigureInfo(filename.rstrip("\r"), fmt, int(size), float(handle), int(index))
+        )
+    return figures
+
+
 class PDF:
     """Wrapper for PDF object for display."""
 
@@ -51,6 +172,27 @@ class PDF:
             self._repr_pdf_ = base64.b64encode(data)
 
 
+class RawSVG(SVG):
+    """SVG display object that does not parse the document.
+
+    IPython's :class:`~IPython.display.SVG` parses the whole document with
+    minidom just to drop the XML prolog, which is slow and memory hungry for
+    large gnuplot SVGs.  This keeps the data from the root ``<svg>`` on.
+    """
+
+    @property
+    def data(self) -> str | None:
+        return self._data
+
+    @data.setter
+    def data(self, svg: str | None) -> None:
+        if svg is not None:
+            start = svg.find("<svg")
+            if start > 0:
+                svg = svg[start:]
+        self._data = svg
+
+
 def get_kernel_json() -> dict[str, Any]:
     """Get the kernel json for the kernel."""
     json_file = os.environ.get("OCTAVE_KERNEL_JSON")
@@ -71,7 +213,11 @@ class OctaveKernel(ProcessMetaKernel):
 
     Configuration is done via ``octave_kernel_config.py`` in the Jupyter config
     path. Configurable traits: ``plot_settings``, ``inline_toolkit``,
-    ``kernel_json``, ``cli_options``, ``executable``, and ``load_octaverc``.
+    ``kernel_json``, ``cli_options``, ``executable``, ``load_octaverc``,
+    ``refresh_executable_cache``, ``background_startup``, ``hot_spare``,
+    ``figure_transport``, ``help_cache_size``, ``output_interval``,
+    ``output_max_bytes``, ``output_limit_bytes``, ``output_limit_lines``,
+    ``source_threshold``, and ``transport``.
     """
 
     app_name = "octave_kernel"
@@ -84,12 +230,42 @@ class OctaveKernel(ProcessMetaKernel):
     inline_toolkit = Unicode("").tag(config=True)
     executable = Unicode("").tag(config=True)
     load_octaverc = Bool(True).tag(config=True)
+    refresh_executable_cache = Bool(False).tag(config=True)
+    background_startup = Bool(True).tag(config=True)
+    hot_spare = Bool(False).tag(config=True)
+    figure_transport = Unicode("auto").tag(config=True)
+    help_cache_size = Int(128).tag(config=True)
+    output_interval = Float(0.05).tag(config=True)
+    output_max_bytes = Int(65536).tag(config=True)
+    output_limit_bytes = Int(0).tag(config=True)
+    output_limit_lines = Int(0).tag(config=True)
+    source_threshold = Int(0).tag(config=True)
+    transport = Unicode("pty").tag(config=True)
 
     _octave_engine: OctaveEngine | None = None
+    _engine_future: Future[OctaveEngine] | None = None
+    _spare_future: Future[OctaveEngine] | None = None
     _language_version: str | None = None
+    _figure_count: int | None = None
+    _completion_index: CompletionIndex | None = None
+    _help_cache: HelpCache | None = None
+    _timings: dict[str, float] | None = None
+    _cell_timings: dict[str, float] | None = None
+    _output: OutputCoalescer | None = None
+    _output_limit: OutputLimit | None = None
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        if self.background_startup:
+            # Answer kernel_info from the version cache while Octave starts.
+            self._language_version = self._get_cached_language_version()
+            self._engine_future = self._start_engine()
+        self._refill_spare()
 
     @property
     def language_version(self) -> str:
+        if self._octave_engine is None and self._language_version:
+            return self._language_version
         return self.octave_engine.version
 
     @property
@@ -111,7 +287,24 @@ class OctaveKernel(ProcessMetaKernel):
     def octave_engine(self) -> OctaveEngine:
         if self._octave_engine:
             return self._octave_engine
-        self._octave_engine = OctaveEngine(
+        if self._engine_future is not None:
+            future, self._engine_future = self._engine_future, None
+            engine = future.result()
+            engine.error_handler = self.Error
+            if isinstance(future, StartupFuture):
+                for error in future.errors:
+                    self.Error(error)
+            if engine.plot_settings != self.plot_settings:
+                # A hot spare may predate a change made with the plot magic.
+                engine.plot_settings = self.plot_settings
+            self._octave_engine = engine
+            return engine
+        self._octave_engine = self._make_engine()
+        return self._octave_engine
+
+    def _make_engine(self) -> OctaveEngine:
+        """Create an Octave engine from the kernel configuration."""
+        return OctaveEngine(
             plot_settings=self.plot_settings,
             defer_startup=True,
             error_handler=self.Error,
@@ -122,13 +315,91 @@ class OctaveKernel(ProcessMetaKernel):
             load_octaverc=self.load_octaverc,
             logger=self.log,
             executable=self.executable,
+            refresh_cache=self.refresh_executable_cache,
+            figure_transport=self.figure_transport,
+            source_threshold=self.source_threshold,
+            transport=self.transport,
         )
-        return self._octave_engine
+
+    def _start_engine(self) -> StartupFuture:
+        """Create and start up an Octave engine on a background thread."""
+        future = StartupFuture()
+
+        def target() -> None:
+            try:
+                engine = self._make_engine()
+                engine.error_handler = future.errors.append
+                engine._startup()
+            except BaseException as e:  # noqa: BLE001
+                future.set_exception(e)
+            else:
+                future.set_result(engine)
+
+        thread = threading.Thread(target=target, name="octave-startup", daemon=True)
+        thread.start()
+        return future
+
+    def _refill_spare(self) -> None:
+        """Start a hot spare engine in the background, if configured."""
+        if self.hot_spare and self._spare_future is None:
+            self._spare_future = self._start_engine()
+
+    def _swap_engine(self) -> None:
+        """Shut down the current engine and promote the hot spare, if any.
+
+        The spare is refilled in the background, so a later swap is also
+        immediate.  Without a spare, the next engine is created on first use.
+        """
+        if self._octave_engine is not None:
+            self._octave_engine._cleanup()
+            self._octave_engine = None
+        if self._engine_future is not None:
+            self._discard_future(self._engine_future)
+            self._engine_future = None
+        if self._spare_future is not None:
+            self._engine_future, self._spare_future = self._spare_future, None
+        # The new engine starts with the default path again.
+        self._completion_index = None
+        if self._help_cache is not None:
+            self._help_cache.clear()
+        self._refill_spare()
+
+    def _discard_future(self, future: Future[OctaveEngine]) -> None:
+        """Clean up the engine of a startup future once it resolves."""
+
+        def cleanup(future: Future[OctaveEngine]) -> None:
+            if not future.cancelled() and future.exception() is None:
+                future.result()._cleanup()
+
+        future.add_done_callback(cleanup)
+
+    def _get_cached_language_version(self) -> str | None:
+        """Get the Octave version from the on-disk cache, without starting Octave."""
+        if self.refresh_executable_cache:
+            return None
+        try:
+            executable = get_octave_executable(self.executable)
+        except OSError:
+            return None
+        cli_options = os.environ.get("OCTAVE_CLI_OPTIONS", self.cli_options)
+        return get_cached_version(executable, cli_options)
 
     def makeWrapper(self) -> REPLWrapper:
         """Start an Octave process and return a :class:`REPLWrapper` object."""
         return self.octave_engine.repl
 
+    def restart_kernel(self) -> None:
+        """Restart the Octave process, swapping in the hot spare if there is one."""
+        self._swap_engine()
+        self.wrapper = self.makeWrapper()
+
+    async def do_shutdown(self, restart: bool) -> dict[str, Any]:
+        """Shut down the kernel, stopping any hot spare unless restarting."""
+        if not restart and self._spare_future is not None:
+            self._discard_future(self._spare_future)
+            self._spare_future = None
+        return await super().do_shutdown(restart)
+
     def do_execute_direct(self, code: str, silent: bool = False) -> Any:
         """Execute code in Octave and display any resulting inline figures.
 
@@ -144,27 +415,102 @@ class OctaveKernel(ProcessMetaKernel):
         Any
             Result from the parent kernel's execute method.
         """
+        start = time.perf_counter()
+        self._timings = {}
+        if self._octave_engine is not None:
+            self._octave_engine.reset_timings()
+        if self.output_interval > 0:
+            self._output = OutputCoalescer(
+                super().Write, self.output_interval, self.output_max_bytes
+            )
+        try:
+            return self._execute_direct(code, silent)
+        finally:
+            self._finish_output()
+            self._finish_timings(start)
+
+    def _execute_direct(self, code: str, silent: bool) -> Any:
+        """Execute a cell, see :meth:`do_execute_direct`."""
         if code.strip() in ["quit", "quit()", "exit", "exit()"]:
-            if self._octave_engine is not None:
-                self._octave_engine._cleanup()
-                self._octave_engine = None
+            self._swap_engine()
             self.payload = [{"source": "ask_exit", "keepkernel": False}]
             return None
         if not self.octave_engine._has_startup:
             self.octave_engine._startup()
+        if not silent and (self.output_limit_bytes or self.output_limit_lines):
+            self._output_limit = OutputLimit(
+                self.octave_engine.tmp_dir,
+                self.output_limit_bytes,
+                self.output_limit_lines,
+            )
+        self._figure_count = None
+        backend = self.octave_engine.plot_settings["backend"]
+        if not silent and code.strip() and backend.startswith("inline"):
+            code = f"{code.rstrip()}\n{FIGURE_COUNT_CMD}"
+        start = time.perf_counter()
         val = ProcessMetaKernel.do_execute_direct(self, code, silent=silent)
-
-        if not silent:
+        if self._timings is not None:
+            self._timings["execute_seconds"] = time.perf_counter() - start
+            self._timings["execute_bytes_sent"] = len(code.encode())
+        path_changed = PATH_CHANGE_REGEX.search(code) is not None
+        if self._completion_index is not None:
+            self._completion_index.invalidate(path_changed)
+        if self._help_cache is not None and path_changed:
+            self._help_cache.clear()
+
+        # Skip the figure round trip when the cell reported no figures.  If
+        # the count is unknown (e.g. the cell was interrupted), check anyway.
+        if not silent and self._figure_count != 0:
             try:
                 plot_dir = self.octave_engine.make_figures()
             except Exception as e:  # noqa: BLE001
                 self.Error(e)
                 return val
             if plot_dir:
-                for image in self.octave_engine.extract_figures(plot_dir, True):
+                for image in self.octave_engine.iter_figures(plot_dir, True):
                     self.Display(image)
         return val
 
+    def _finish_output(self) -> None:
+        """Send the remaining output of a cell and stop coalescing."""
+        limit, self._output_limit = self._output_limit, None
+        note = limit.close() if limit is not None else None
+        if note is not None:
+            self._write_stream(note)
+        output, self._output = self._output, None
+        if output is not None:
+            output.flush()
+            if self._timings is not None:
+                self._timings["output_messages"] = output.messages
+
+    def _finish_timings(self, start: float) -> None:
+        """Collect the timings of a cell for the execute_reply metadata."""
+        timings = self._timings
+        assert timings is not None  # noqa: S101
+        if self._octave_engine is not None:
+            timings.update(self._octave_engine.reset_timings())
+        timings["total_seconds"] = time.perf_counter() - start
+        self._cell_timings, self._timings = timings, None
+        self.log.debug("Octave cell timings: %s", json.dumps(timings, sort_keys=True))
+
+    def finish_metadata(
+        self, parent: dict[str, Any], metadata: dict[str, Any], reply_content: Any
+    ) -> dict[str, Any]:
+        """Add the timings of the last cell to the execute_reply metadata.
+
+        The timings are under ``metadata["octave_kernel"]["timings"]``, in
+        seconds and bytes: ``execute_*`` for running the cell in Octave,
+        ``make_figures_*`` and ``extract_figures_*`` for inline figures,
+        ``eval_*`` for the kernel's own round trips to Octave,
+        ``output_messages`` for the number of stream messages sent, and
+        ``total_seconds`` for the whole cell.
+        """
+        metadata = super().finish_metadata(parent, metadata, reply_content)  # type: ignore[no-untyped-call]
+        timings, self._cell_timings = self._cell_timings, None
+        if timings is not None and parent["header"]["msg_type"] == "execute_request":
+            metadata["octave_kernel"] = {"timings": timings}
+        return metadata
+
     def get_kernel_help_on(
         self, info: dict[str, Any], level: int = 0, none_on_fail: bool = False
     ) -> str | None:
@@ -190,7 +536,51 @@ class OctaveKernel(ProcessMetaKernel):
                 return None
             else:
                 return ""
-        return self.octave_engine.eval(f"help {obj}", silent=True)
+        if self._help_cache is None:
+            self._help_cache = HelpCache(self.help_cache_size)
+        return self._help_cache.get_help(self.octave_engine, obj)
+
+    def help_cache_info(self) -> CacheInfo:
+        """Return the hit/miss statistics of the help cache."""
+        if self._help_cache is None:
+            self._help_cache = HelpCache(self.help_cache_size)
+        return self._help_cache.cache_info()
+
+    def get_variable(self, name: str) -> Any:
+        """Get an Octave variable for ``%get``, or None if it cannot be read.
+
+        Numeric arrays are returned as numpy arrays, and other values as
+        decoded by :meth:`OctaveEngine.eval_value`.
+        """
+        if not IDENTIFIER_REGEX.fullmatch(name):
+            return None
+        try:
+            return self.octave_engine.eval_value(name)
+        except (RuntimeError, ValueError):
+            return None
+
+    def send_response(self, *args: Any, **kwargs: Any) -> Any:
+        """Send a message, after any coalesced output so order is kept."""
+        if self._output is not None:
+            self._output.flush()
+        return super().send_response(*args, **kwargs)
+
+    def Write(self, message: str) -> None:
+        """Write output, consuming the figure count marker.
+
+        While a cell runs, output is coalesced into fewer stream messages.
+        """
+        if self._timings is not None:
+            received = self._timings.get("execute_bytes_received", 0)
+            self._timings["execute_bytes_received"] = received + len(message.encode())
+        if FIGURE_COUNT in message:
+            match = FIGURE_COUNT_REGEX.search(message)
+            if match:
+                self._figure_count = int(match.group(1))
+                message = message[: match.start()] + message[match.end() :]
+            if not message:
+                return
+        self._write_stream(message)
 
     def Print(self, *args: str, **kwargs: Any) -> None:
         """Write output, filtering out raw stdin-prompt markers."""
@@ -202,7 +592,22 @@ class OctaveKernel(ProcessMetaKernel):
             if arg.strip().startswith(STDIN_PROMPT):
                 arg = arg.replace(STDIN_PROMPT, "")
             out.append(arg)
-        super().Print(*out, **kwargs)
+        streaming = self._output is not None or self._output_limit is not None
+        if streaming and all(isinstance(arg, str) for arg in out):
+            self._write_stream(format_message(*out, **kwargs))
+        else:
+            super().Print(*out, **kwargs)
+
+    def _write_stream(self, message: str) -> None:
+        """Send stream output through the output limit and coalescer."""
+        if self._output_limit is not None:
+            message = self._output_limit.write(message)
+            if not message:
+                return
+        if self._output is not None:
+            self._output.write(message)
+        else:
+            super().Write(message)
 
     def raw_input(self, text: str) -> str:  # type: ignore[override]
         """Read a line of user input, stripping the stdin-prompt prefix.
@@ -236,15 +641,21 @@ class OctaveKernel(ProcessMetaKernel):
                     self.Print(preceding)
                 break
 
+        # Show the output so far before asking for input.
+        if self._output is not None:
+            self._output.flush()
         return super().raw_input(text)  # type: ignore[no-untyped-call, no-any-return]
 
     def get_completions(self, info: dict[str, Any]) -> list[str]:
         """
         Get completions from kernel based on info dict.
+
+        Names are served from a kernel-side index; Octave is only asked
+        for completions the index does not know about.
         """
-        cmd = f'completion_matches("{info["obj"]}")'
-        val = self.octave_engine.eval(cmd, silent=True)
-        return val.splitlines() if val else []
+        if self._completion_index is None:
+            self._completion_index = CompletionIndex()
+        return self._completion_index.complete(self.octave_engine, info["obj"])
 
     async def do_is_complete(self, code: str) -> dict[str, str]:
         """Check whether the code is complete and ready to execute.
@@ -300,6 +711,10 @@ class OctaveEngine:
         executable: str = "",
         load_octaverc: bool = True,
         logger: Any = None,
+        refresh_cache: bool = False,
+        figure_transport: str = "auto",
+        source_threshold: int = 0,
+        transport: str = "pty",
     ) -> None:
         """Initialize the Octave engine.
 
@@ -334,24 +749,62 @@ class OctaveEngine:
             alter the path, set conflicting options, or is simply unavailable.
         logger
             Logger instance; defaults to the module-level logger.
+        refresh_cache
+            If True, ignore the on-disk executable cache and re-run the
+            executable discovery and version check, updating the cache.
+        figure_transport
+            Where inline figures are written: ``"shm"`` for a tmpfs
+            directory under ``/dev/shm``, ``"file"`` for the session temp
+            dir, or ``"auto"`` (default) to use tmpfs when it is available.
+        source_threshold
+            Commands longer than this many characters are written to a file
+            in the session temp dir and run with ``source``, instead of being
+            typed into Octave line by line; 0 (default) disables this.  A
+            sourced command stops at its first error, as a script does,
+            while a typed one goes on with the next line.
+        transport
+            How to talk to Octave: ``"pty"`` (default) to drive its prompts
+            through a pseudo-terminal, or ``"pipe"`` to run it over plain
+            pipes and mark the end of each command with a frame (POSIX only).
+            With ``"pipe"`` every command is run with ``source``.
         """
         if not logger:
             logger = logging.getLogger(__name__)
             logging.basicConfig()
         self.logger = logger
+        self.cli_options = cli_options
+        self.refresh_cache = refresh_cache
         self._executable = self._get_executable(executable)
-        self.version = self._validate_executable(self.executable)
+        self.version = self._get_version(self.executable)
+        self._exit_handlers: list[Callable[[], Any]] = []
         self.tmp_dir = self._get_temp_dir()
-        self.cli_options = cli_options
+        if figure_transport not in FIGURE_TRANSPORTS:
+            msg = f"figure_transport must be one of {FIGURE_TRANSPORTS}"
+            raise ValueError(msg)
+        self.figure_transport = figure_transport
+        if transport not in TRANSPORTS:
+            msg = f"transport must be one of {TRANSPORTS}"
+            raise ValueError(msg)
+        if transport == "pipe" and os.name == "nt":
+            msg = "The pipe transport is not available on Windows"
+            raise ValueError(msg)
+        self.transport = transport
+        self.source_threshold = source_threshold
+        self._plot_tmp_dir = self._get_plot_tmp_dir()
         self.inline_toolkit = inline_toolkit
         self.load_octaverc = load_octaverc
-        self.repl = self._create_repl()
+        self.repl: REPLWrapper = self._create_repl()
         self.error_handler = error_handler
         self.stream_handler = stream_handler
         self.stdin_handler = stdin_handler or sys.stdin
         self.line_handler = line_handler
         self._has_startup = False
         self._plot_settings = plot_settings
+        self._figure_index = 0
+        self._figure_manifests: dict[str, list[FigureInfo]] = {}
+        self._async_lock: asyncio.Lock | None = None
+        self._figure_pool: ThreadPoolExecutor | None = None
+        self.timings: dict[str, float] = {}
         try:
             if not defer_startup:
                 self._startup()
@@ -373,12 +826,20 @@ class OctaveEngine:
     @plot_settings.setter
     def plot_settings(self, settings: dict[str, Any] | None) -> None:
         if not self._has_startup:
-            # This will set plot_settings again.
+            # The startup command applies the plot settings.
+            self._plot_settings = settings
             self._startup()
             return
 
-        settings = settings or {"backend": "inline"}
+        settings = self._normalize_plot_settings(settings)
         self._plot_settings = settings
+        self.eval("\n".join(self._plot_settings_cmds(settings)))
+
+    def _normalize_plot_settings(
+        self, settings: dict[str, Any] | None
+    ) -> dict[str, Any]:
+        """Fill in defaults for any missing plot settings."""
+        settings = settings or {"backend": "inline"}
 
         # Remove "None" keys so we can use setdefault below.
         keys = [
@@ -390,6 +851,8 @@ class OctaveEngine:
             "backend",
             "name",
             "plot_dir",
+            "svg_max_points",
+            "svg_max_objects",
         ]
         for key in keys:
             if key in settings and settings.get(key, None) is None:
@@ -402,7 +865,12 @@ class OctaveEngine:
         settings.setdefault("resolution", 0)
         settings.setdefault("name", "Figure")
         settings.setdefault("plot_dir", None)
+        settings.setdefault("svg_max_points", SVG_MAX_POINTS)
+        settings.setdefault("svg_max_objects", SVG_MAX_OBJECTS)
+        return settings
 
+    def _plot_settings_cmds(self, settings: dict[str, Any]) -> list[str]:
+        """Get the Octave commands that apply the given plot settings."""
         cmds = []
 
         if settings["backend"] == "inline":
@@ -417,7 +885,7 @@ class OctaveEngine:
             cmds.append("set(0, 'defaultfigurevisible', 'on');")
             if settings["backend"] != "default":
                 cmds.append(f"graphics_toolkit('{settings['backend']}');")
-        self.eval("\n".join(cmds))
+        return cmds
 
     def eval(
         self, code: str, timeout: float | None = None, silent: bool = False
@@ -444,6 +912,8 @@ class OctaveEngine:
         if self.logger:
             self.logger.debug("Octave eval:")
             self.logger.debug(code)
+        start = time.perf_counter()
+        resp = ""
         try:
             resp = self.repl.run_command(
                 code.rstrip(),
@@ -464,6 +934,430 @@ class OctaveEngine:
                 return ""
             else:
                 raise
+        finally:
+            self._record(
+                "eval",
+                start,
+                bytes_sent=len(code.encode()),
+                bytes_received=len(resp.encode()),
+            )
+
+    def eval_many(
+        self, statements: Sequence[str], timeout: float | None = None
+    ) -> list[EvalResult]:
+        """Evaluate several statements in a single round trip.
+
+        Each statement is run with ``eval`` in its own ``try`` block, so an
+        error (including a parse error) in one does not stop the others.
+
+        Parameters
+        ----------
+        statements
+            Octave statements to run, in order.
+        timeout
+            Seconds to wait for a response; ``None`` uses the default.
+
+        Returns
+        -------
+        list[EvalResult]
+            The output and error message of each statement.  A statement
+            that was not run, e.g. because Octave was interrupted, has an
+            error saying so.
+        """
+        if not statements:
+            return []
+        cmds = []
+        for index, statement in enumerate(statements):
+            code = " char(10) ".join(
+                "'" + line.replace("'", "''") + "'"
+                for line in statement.rstrip().splitlines() or [""]
+            )
+            cmds.append(
+                f'printf("\\n{EVAL_MARKER}%d\\n", {index}); '
+                f"try, eval([{code}]); catch, "
+                f'printf("\\n{EVAL_ERROR}%s", lasterr()); end'
+            )
+        # One line, so that Octave is sent a single input and the statements
+        # do not each wait for a prompt.
+        resp = self.eval("; ".join(cmds), timeout=timeout, silent=True)
+        parts = EVAL_MARKER_REGEX.split("\n" + resp.replace("\r\n", "\n"))
+        found: dict[int, EvalResult] = {}
+        for number, text in zip(parts[1::2], parts[2::2], strict=True):
+            output, marker, error = text.partition(f"\n{EVAL_ERROR}")
+            if marker:
+                found[int(number)] = EvalResult(output, error.rstrip())
+            else:
+                found[int(number)] = EvalResult(text, None)
+        missing = EvalResult("", "The statement was not run")
+        return [found.get(index, missing) for index in range(len(statements))]
+
+    async def eval_async(
+        self, code: str, timeout: float | None = None, silent: bool = False
+    ) -> str:
+        """Evaluate code in the Octave subprocess without blocking the loop.
+
+        Output is read from the child with the running event loop, so one
+        thread can drive many engines.  Calls on the same engine are run
+        one at a time.  Cancelling the call interrupts Octave.
+
+        Parameters
+        ----------
+        code
+            Octave source code to run.
+        timeout
+            Seconds to wait for each prompt; ``None`` waits indefinitely.
+        silent
+            If True, suppress the stream callback and return the output.
+
+        Returns
+        -------
+        str
+            Text output from Octave, or ``""`` if it was streamed.
+        """
+        stream_handler = None if silent else self.stream_handler
+        code = code.rstrip()
+        lines = code.splitlines()
+        if not lines:
+            raise ValueError("No command was given")
+
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            if self.transport == "pipe":
+                # There is no async reader for pipes, so wait on a thread.
+                future = asyncio.ensure_future(
+                    asyncio.to_thread(self.eval, code, timeout, silent)
+                )
+                try:
+                    return await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    # The thread is still reading, so only send the signal.
+                    cast("PipeREPL", self.repl).send_interrupt()
+                    await asyncio.wait([future])
+                    raise
+            if self.logger:
+                self.logger.debug("Octave async eval:")
+                self.logger.debug(code)
+            res: list[str] = []
+            with contextlib.ExitStack() as stack:
+                relabel: Callable[[str], str] = str
+                if self.source_threshold and len(code) > self.source_threshold:
+                    # Long code is sourced from a file, as by eval.
+                    source, relabel = stack.enter_context(self._source_file(code))
+                    lines = [source]
+                    stream_handler = _relabeled(stream_handler, relabel)
+                try:
+                    for line in lines:
+                        self.repl.sendline(line)
+                        pos = await self._expect_prompt_async(
+                            timeout, stream_handler, res
+                        )
+                    if pos == 1:
+                        # Resolve a soft continuation, as in REPLWrapper.run_command.
+                        self.repl.sendline("")
+                        pos = await self._expect_prompt_async(
+                            timeout, stream_handler, res
+                        )
+                        if pos == 1:
+                            await asyncio.to_thread(
+                                self._interrupt, continuation=True, silent=True
+                            )
+                            raise ValueError(
+                                "Continuation prompt found - input was incomplete:\n"
+                                + code
+                            )
+                except asyncio.CancelledError:
+                    # Interrupting reads the output up to the prompt, which
+                    # would block the event loop.
+                    await asyncio.to_thread(self._interrupt, silent=True)
+                    raise
+                except Exception as e:
+                    if self.error_handler:
+                        self.error_handler(e)
+                        return ""
+                    raise
+            if stream_handler:
+                return ""
+            resp = relabel("".join(res)).replace(STDIN_PROMPT, "")
+            if self.logger and resp:
+                self.logger.debug(resp)
+            return resp
+
+    async def _expect_prompt_async(
+        self, timeout: float | None, stream_handler: Any, res: list[str]
+    ) -> int:
+        """Wait for a prompt, streaming complete lines as they arrive.
+
+        The child is only read while this waits, through a reader on the
+        running loop that is removed when it returns or is cancelled.  So
+        nothing is read behind the back of the interrupt that follows a
+        cancel, and each call works on whichever loop runs it.
+        """
+        repl = self.repl
+        child = repl.child
+        expects = [
+            repl.prompt_regex,
+            repl.continuation_prompt_regex,
+            repl.stdin_prompt_regex,
+        ]
+        if stream_handler:
+            expects.append(child.crlf)
+        patterns = child.compile_pattern_list(expects)
+        stdin_handler: Any = self.stdin_handler
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                # Match what is buffered or can be read without waiting.
+                pos: int = child.expect_list(patterns, timeout=0)
+            except TIMEOUT:
+                await self._wait_readable(deadline)
+                continue
+            line = strip_bracketing(child.before)
+            if pos == 2:
+                if not stdin_handler:
+                    raise ValueError("Stdin Requested but no stdin handler available")
+                repl.sendline(stdin_handler(line + child.after))
+                continue
+            if pos == 3:
+                stream_handler(line + "\n")
+                continue
+            if stream_handler:
+                if line:
+                    stream_handler(line)
+            else:
+                res.append(line)
+            return pos
+
+    async def _wait_readable(self, deadline: float | None) -> None:
+        """Wait until the child has output to read, raising TIMEOUT at the deadline."""
+        remaining = None
+        if deadline is not None:
+            remaining = max(deadline - time.monotonic(), 0)
+        loop = asyncio.get_running_loop()
+        if os.name == "nt":
+            # The Windows loop cannot watch the child's pipe, so poll it.
+            if remaining == 0:
+                raise TIMEOUT("Timed out")
+            await asyncio.sleep(min(remaining or 0.05, 0.05))
+            return
+        fd = self.repl.child.child_fd
+        readable: asyncio.Future[None] = loop.create_future()
+
+        def ready() -> None:
+            if not readable.done():
+                readable.set_result(None)
+
+        loop.add_reader(fd, ready)
+        try:
+            await asyncio.wait_for(readable, remaining)
+        except TimeoutError:
+            raise TIMEOUT("Timed out") from None
+        finally:
+            loop.remove_reader(fd)
+
+    def push(self, name: str, value: Any) -> None:
+        """Copy a numeric array into the Octave workspace.
+
+        The array is written to a memory-mapped binary file in the session
+        temp dir and read by Octave with ``fread``, so large arrays are not
+        converted to text.  Requires numpy.
+
+        Parameters
+        ----------
+        name
+            The Octave variable name.
+        value
+            A numeric, logical, or complex array, or anything that
+            :func:`numpy.asarray` converts to one.
+
+        Raises
+        ------
+        ValueError
+            If the name is not a valid identifier or the dtype is not
+            supported.
+        RuntimeError
+            If Octave fails to read the array.
+        """
+        import numpy as np
+
+        if not IDENTIFIER_REGEX.fullmatch(name):
+            raise ValueError(f"Invalid Octave variable name: {name!r}")
+        array = np.asarray(value)
+        dtype = array.dtype
+        cls = OCTAVE_CLASSES.get((dtype.kind, dtype.itemsize))
+        if cls is None:
+            raise ValueError(f"Cannot push an array of dtype {dtype}")
+        # Octave arrays have at least two dimensions; vectors become rows.
+        dims = array.shape if array.ndim >= 2 else (1, array.size)
+        filename = self._array_file()
+        try:
+            if array.size:
+                mapped = np.memmap(
+                    filename,
+                    dtype=dtype.newbyteorder("<"),
+                    mode="w+",
+                    shape=dims,
+                    order="F",
+                )
+                mapped[...] = array.reshape(dims)
+                mapped.flush()
+                del mapped
+            else:
+                open(filename, "wb").close()
+            dims_str = " ".join(str(dim) for dim in dims)
+            is_complex = "true" if dtype.kind == "c" else "false"
+            path = filename.replace(os.path.sep, "/")
+            cmd = (
+                f'{name} = _read_array("{path}", "{cls}", [{dims_str}], {is_complex});'
+            )
+            resp = self.eval(cmd, silent=True)
+        finally:
+            with contextlib.suppress(OSError):
+                os.remove(filename)
+        if resp and "error:" in resp:
+            raise RuntimeError(resp)
+
+    def pull(self, name: str) -> Any:
+        """Copy a numeric array out of the Octave workspace.
+
+        Octave writes the array to a binary file in the session temp dir
+        with ``fwrite``, which is then memory-mapped.  Requires numpy.
+
+        Parameters
+        ----------
+        name
+            The Octave variable name.
+
+        Returns
+        -------
+        numpy.ndarray
+            The array, with the Octave dimensions and class.
+
+        Raises
+        ------
+        ValueError
+            If the name is not a valid identifier.
+        RuntimeError
+            If the variable does not exist or is not numeric or logical.
+        """
+        import numpy  # noqa: F401
+
+        if not IDENTIFIER_REGEX.fullmatch(name):
+            raise ValueError(f"Invalid Octave variable name: {name!r}")
+        filename = self._array_file()
+        path = filename.replace(os.path.sep, "/")
+        try:
+            resp = self.eval(f'_write_array({name}, "{path}");', silent=True)
+            if not resp or ARRAY_HEADER not in resp:
+                raise RuntimeError(resp or f"Could not pull {name!r} from Octave")
+            return self._map_array(resp, filename)
+        finally:
+            # The mapping stays valid after the file is removed on POSIX.
+            with contextlib.suppress(OSError):
+                os.remove(filename)
+
+    def eval_json(self, expr: str) -> Any:
+        """Evaluate an expression and decode its value from JSON.
+
+        The value is encoded by Octave's ``jsonencode`` (Octave 7 or later)
+        and decoded with :func:`json.loads`, so no ``disp`` output is
+        parsed.  Structs become dicts, cell arrays and matrices become
+        lists, and ``NaN`` and ``Inf`` become floats.
+
+        Parameters
+        ----------
+        expr
+            A single-line Octave expression.
+
+        Returns
+        -------
+        Any
+            The decoded value.
+
+        Raises
+        ------
+        ValueError
+            If the expression spans more than one line.
+        RuntimeError
+            If the expression fails or its value cannot be encoded.
+        """
+        return self._eval_value(expr, None)
+
+    def eval_value(self, expr: str) -> Any:
+        """Evaluate an expression and return its value as a Python object.
+
+        Numeric and logical arrays, and complex scalars, are moved as
+        binary data as in :meth:`pull` and returned as numpy arrays.
+        Other values are decoded as in :meth:`eval_json`.  Without numpy,
+        this is the same as :meth:`eval_json`.
+
+        Parameters
+        ----------
+        expr
+            A single-line Octave expression.
+
+        Returns
+        -------
+        Any
+            The value.
+
+        Raises
+        ------
+        ValueError
+            If the expression spans more than one line.
+        RuntimeError
+            If the expression fails or its value cannot be encoded.
+        """
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            return self.eval_json(expr)
+        filename = self._array_file()
+        try:
+            return self._eval_value(expr, filename)
+        finally:
+            with contextlib.suppress(OSError):
+                os.remove(filename)
+
+    def _eval_value(self, expr: str, filename: str | None) -> Any:
+        """Evaluate an expression with ``_write_value`` and decode it."""
+        expr = expr.strip().rstrip(";")
+        if "\n" in expr:
+            raise ValueError("The expression must be on a single line")
+        path = "" if filename is None else filename.replace(os.path.sep, "/")
+        resp = self.eval(f'_write_value("{path}", ({expr}));', silent=True) or ""
+        start = resp.find(JSON_HEADER)
+        if start != -1:
+            return json.loads(resp[start + len(JSON_HEADER) :].splitlines()[0])
+        if filename is not None and ARRAY_HEADER in resp:
+            return self._map_array(resp, filename)
+        raise RuntimeError(resp or f"Could not evaluate {expr!r}")
+
+    def _map_array(self, resp: str, filename: str) -> Any:
+        """Map the array written by ``_write_array``, as described by its header."""
+        import numpy as np
+
+        start = resp.find(ARRAY_HEADER)
+        header = resp[start + len(ARRAY_HEADER) :].splitlines()[0]
+        cls, is_complex, dims_str = header.split("\t")
+        dims = tuple(int(dim) for dim in dims_str.split())
+        dtype = np.dtype(NUMPY_DTYPES.get(cls, cls))
+        if is_complex == "1":
+            dtype = np.result_type(dtype, np.complex64)
+        dtype = dtype.newbyteorder("<")
+        if not np.prod(dims):
+            return np.zeros(dims, dtype=dtype.newbyteorder("="), order="F")
+        if os.name == "nt":
+            # Windows cannot remove a file that is still mapped, so read it.
+            data = np.fromfile(filename, dtype=dtype)
+            return data.reshape(dims, order="F")
+        # Copy on write, so the array is writeable without changing the file.
+        mapped = np.memmap(filename, dtype=dtype, mode="c", shape=dims, order="F")
+        return mapped.view(np.ndarray)
+
+    def _array_file(self) -> str:
+        """Get a fresh file name for an array transfer."""
+        return os.path.join(self.tmp_dir, f"array-{uuid.uuid4().hex}.bin")
 
     def make_figures(self, plot_dir: str | None = None) -> str | None:
         """Create figures for the current figures.
@@ -486,21 +1380,60 @@ class OctaveEngine:
                 return None
         if not self._has_startup:
             self._startup()
+        start = time.perf_counter()
+        plot_dir, make_figs = self._make_figures_cmd(plot_dir)
+        resp = self.eval(make_figs, silent=True)
+        try:
+            return self._read_figure_manifest(plot_dir, resp)
+        finally:
+            figures = self._figure_manifests.get(plot_dir, [])
+            self._record("make_figures", start, figures=len(figures))
+
+    async def make_figures_async(self, plot_dir: str | None = None) -> str | None:
+        """Create figures for the current figures, without blocking the loop.
+
+        See :meth:`make_figures`.
+        """
+        settings = self._plot_settings
+        assert settings is not None  # noqa: S101
+        if not settings["backend"].startswith("inline"):
+            await self.eval_async('drawnow("expose");')
+            if not plot_dir:
+                return None
+        if not self._has_startup:
+            await asyncio.to_thread(self._startup)
+        plot_dir, make_figs = self._make_figures_cmd(plot_dir)
+        resp = await self.eval_async(make_figs, silent=True)
+        return self._read_figure_manifest(plot_dir, resp)
+
+    def _make_figures_cmd(self, plot_dir: str | None) -> tuple[str, str]:
+        """Get the plot directory and the command that saves the figures."""
+        settings = self.plot_settings
         fmt = settings["format"]
         res = settings["resolution"]
         wid = settings["width"]
         hgt = settings["height"]
         name = settings["name"]
-        tmp_dir = settings["plot_dir"] or os.path.join(self.tmp_dir, "plots")
+        tmp_dir = settings["plot_dir"] or self._plot_tmp_dir
         plot_dir = plot_dir or tempfile.mkdtemp(dir=tmp_dir)
         plot_dir = plot_dir.replace(os.path.sep, "/")
 
-        # Do not overwrite any existing plot files.
-        spec = os.path.join(plot_dir, f"{name}*")
-        start = len(glob.glob(spec))
-
-        make_figs = f'_make_figures("{plot_dir}", "{fmt}", "{name}", {wid}, {hgt}, {res}, {start})'
-        resp = self.eval(make_figs, silent=True)
+        # _make_figures skips over any existing plot files, starting after
+        # the last figure made by this engine.
+        start = self._figure_index
+        args = f'"{plot_dir}", "{fmt}", "{name}", {wid}, {hgt}, {res}, {start}'
+        if fmt == "auto":
+            # The thresholds for choosing svg or png for each figure.
+            args += f", {settings['svg_max_points']}, {settings['svg_max_objects']}"
+        make_figs = f"_make_figures({args})"
+        return plot_dir, make_figs
+
+    def _read_figure_manifest(self, plot_dir: str, resp: str) -> str:
+        """Record the figures reported by ``_make_figures`` and handle errors."""
+        figures = parse_figure_manifest(resp or "")
+        self._figure_manifests[plot_dir] = figures
+        if figures:
+            self._figure_index = max(fig.file_index for fig in figures)
         msg = "Inline plot failed, consider trying another graphics toolkit\n"
         if resp and "error:" in resp:
             resp = msg + resp
@@ -524,46 +1457,153 @@ class OctaveEngine:
         -------
         A list of figures.
         """
-        images: list[Any] = []
-        spec = os.path.join(plot_dir, f"{self.plot_settings['name']}*")
-        for fname in reversed(glob.glob(spec)):
-            filename = os.path.join(plot_dir, fname)
-            try:
-                if fname.lower().endswith(".svg"):
-                    im = self._handle_svg(filename)
-                elif fname.lower().endswith(".pdf"):
-                    im = PDF(filename)
-                else:
-                    im = Image(filename)  # type: ignore[no-untyped-call]
-                images.append(im)
-            except Exception as e:
-                if self.error_handler:
-                    self.error_handler(e)
-                else:
+        return list(self.iter_figures(plot_dir, remove))
+
+    def iter_figures(self, plot_dir: str, remove: bool = False) -> Iterator[Any]:
+        """Yield IPython Image objects for the created figures, in order.
+
+        The figures are read and encoded in a thread pool, and each one is
+        yielded as soon as it is ready, so it can be displayed while the
+        rest are still loading.
+
+        Parameters
+        ----------
+        plot_dir
+            The directory in which to create the plots.
+        remove
+            Whether to remove the plot directory after saving.
+
+        Yields
+        ------
+        Any
+            The figures.
+        """
+        manifest = self._figure_manifests.pop(plot_dir, None)
+        if manifest is not None:
+            # Only read the files listed by make_figures, oldest figure first.
+            fnames = [os.path.join(plot_dir, fig.filename) for fig in manifest]
+        else:
+            spec = os.path.join(plot_dir, f"{self.plot_settings['name']}*")
+            fnames = glob.glob(spec)
+        filenames = [os.path.join(plot_dir, fname) for fname in reversed(fnames)]
+        start = time.perf_counter()
+        nbytes = 0
+        futures = []
+        if len(filenames) > 1:
+            if self._figure_pool is None:
+                self._figure_pool = ThreadPoolExecutor(
+                    FIGURE_WORKERS, thread_name_prefix="octave-figures"
+                )
+            pool = self._figure_pool
+            futures = [pool.submit(self._load_figure, name) for name in filenames]
+        try:
+            for i, filename in enumerate(filenames):
+                try:
+                    if futures:
+                        im, size = futures[i].result()
+                    else:
+                        im, size = self._load_figure(filename)
+                except Exception as e:
+                    if self.error_handler:
+                        self.error_handler(e)
+                        continue
                     raise
-        if remove:
-            shutil.rmtree(plot_dir, True)
-        return images
+                nbytes += size
+                yield im
+        finally:
+            if remove:
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+                shutil.rmtree(plot_dir, True)
+            self._record("extract_figures", start, bytes_received=nbytes)
+
+    def _load_figure(self, filename: str) -> tuple[Any, int]:
+        """Load a figure file, returning the image and the file size."""
+        if filename.lower().endswith(".svg"):
+            im = self._handle_svg(filename)
+        elif filename.lower().endswith(".pdf"):
+            im = PDF(filename)
+        else:
+            im = Image(filename)  # type: ignore[no-untyped-call]
+        return im, os.path.getsize(filename)
+
+    def reset_timings(self) -> dict[str, float]:
+        """Return the timings recorded since the last reset, and clear them.
+
+        Each phase (``eval``, ``make_figures``, ``extract_figures``) records
+        ``<phase>_seconds`` and ``<phase>_calls``, plus ``<phase>_bytes_sent``,
+        ``<phase>_bytes_received``, or ``<phase>_figures`` where they apply.
+        ``eval`` includes the evals made by ``make_figures``.
+        """
+        timings, self.timings = self.timings, {}
+        return timings
+
+    def _record(self, phase: str, start: float, **counts: int) -> None:
+        """Add the time since ``start`` and the given counts to a phase."""
+        timings = self.timings
+        elapsed = time.perf_counter() - start
+        timings[f"{phase}_seconds"] = timings.get(f"{phase}_seconds", 0.0) + elapsed
+        timings[f"{phase}_calls"] = timings.get(f"{phase}_calls", 0) + 1
+        for name, count in counts.items():
+            key = f"{phase}_{name}"
+            timings[key] = timings.get(key, 0) + count
 
     def _startup(self) -> None:
-        """Start up the Octave process."""
+        """Start up the Octave process.
+
+        All of the startup steps are sent as a single command, so that
+        startup costs one round trip to Octave.  Each step is wrapped in its
+        own ``try`` block, so that a failure does not skip the later steps.
+        A failure of a step configured by the user, ``~/.octaverc`` or the
+        plot settings, is reported to the error handler; a failure of the
+        internal setup is logged with the step name.
+        """
         self._has_startup = True
+        settings = self._normalize_plot_settings(self._plot_settings)
+        self._plot_settings = settings
         cwd = os.getcwd().replace(os.path.sep, "/")
-        octaverc = "source ~/.octaverc; " if self.load_octaverc else ""
-        cmd = f'more off; {octaverc}cd("{cwd}");{self.repl.prompt_change_cmd}'
-        self.eval(cmd, silent=True)
         here = os.path.realpath(os.path.dirname(__file__)).replace(os.path.sep, "/")
-        self.eval(f'addpath("{here}")')
-        self.plot_settings = self._plot_settings
+        steps = [("more", "more off")]
+        if self.load_octaverc:
+            steps.append(
+                (
+                    "octaverc",
+                    (
+                        'if exist(tilde_expand("~/.octaverc"), "file"), '
+                        "source ~/.octaverc; end"
+                    ),
+                )
+            )
+        steps.append(("cd", f'cd("{cwd}")'))
+        steps.append(("addpath", f'addpath("{here}")'))
+        steps.extend(
+            ("plot_settings", cmd) for cmd in self._plot_settings_cmds(settings)
+        )
+        cmd = "".join(
+            f"try, {code.rstrip(';')}; catch, "
+            f'printf("{STARTUP_ERROR}%s: %s\\n", "{name}", lasterr()); end; '
+            for name, code in steps
+        )
+        resp = self.eval(f"{cmd}{self.repl.prompt_change_cmd}", silent=True)
+        for line in (resp or "").splitlines():
+            if not line.startswith(STARTUP_ERROR):
+                continue
+            msg = line[len(STARTUP_ERROR) :]
+            name = msg.partition(":")[0]
+            if name in USER_STARTUP_STEPS and self.error_handler:
+                self.error_handler(f"Octave startup step failed: {msg}")
+            else:
+                self.logger.warning("Octave startup step failed: %s", msg)
 
     def _handle_svg(self, filename: str) -> Any:
         """Handle special considerations for SVG images."""
         # Gnuplot can create invalid characters in SVG files.
         with open(filename, encoding="utf-8", errors="replace") as fid:
             data = fid.read()
-        im = SVG(data=data)  # type: ignore[no-untyped-call]
+        im = RawSVG(data=data)  # type: ignore[no-untyped-call]
         try:
-            im.data = self._fix_svg_size(im.data)
+            im.data = self._fix_svg_size(data)
         except Exception:  # noqa: BLE001, S110
             pass
         return im
@@ -572,16 +1612,20 @@ class OctaveEngine:
         """GnuPlot SVGs do not have height/width attributes.  Set
         these to be the same as the viewBox, so that the browser
         scales the image correctly.
-        """
-        # Minidom does not support parseUnicode, so it must be decoded
-        # to accept unicode characters
-        parsed = minidom.parseString(data.encode("utf-8"))  # noqa: S318
-        (svg,) = parsed.getElementsByTagName("svg")
 
-        viewbox = svg.getAttribute("viewBox").split(" ")
-        w_str, h_str = viewbox[2:]
-        width: float = int(w_str)
-        height: float = int(h_str)
+        Only the root ``<svg>`` start tag is rewritten; the rest of the
+        document is passed through untouched, without being parsed.
+        """
+        match = SVG_ROOT_REGEX.search(data)
+        if not match:
+            raise ValueError("No <svg> element found")
+        tag = match.group(0)
+        viewbox = SVG_VIEWBOX_REGEX.search(tag)
+        if not viewbox:
+            raise ValueError("No viewBox attribute found")
+        w_str, h_str = viewbox.group(2).split()[2:]
+        width: float = float(w_str)
+        height: float = float(h_str)
 
         # Handle overrides in case they were not encoded.
         settings = self.plot_settings
@@ -594,12 +1638,13 @@ class OctaveEngine:
                 width = width * settings["height"] / height
             height = settings["height"]
 
-        svg.setAttribute("width", f"{int(width)}px")
-        svg.setAttribute("height", f"{int(height)}px")
-        return svg.toxml()
+        end = "/>" if tag.endswith("/>") else ">"
+        tag = SVG_SIZE_REGEX.sub("", tag[: -len(end)]).rstrip()
+        tag += f' width="{int(width)}px" height="{int(height)}px"{end}'
+        return tag + data[match.end() :]
 
-    def _create_repl(self) -> REPLWrapper:
-        """Create the REPLWrapper for Octave."""
+    def _create_repl(self) -> Any:
+        """Create the REPLWrapper, or the PipeREPL, for Octave."""
         cmd = self.executable
         # Interactive mode prevents crashing on Windows on syntax errors.
         # Delay sourcing the "~/.octaverc" file in case it displays a pager.
@@ -614,6 +1659,14 @@ class OctaveEngine:
         # Disaable ansi escape characters.
         os.environ["TERM"] = "dumb"
 
+        if self.transport == "pipe":
+            return PipeREPL(
+                shlex.split(cmd),
+                self.tmp_dir,
+                stdin_prompts=(STDIN_PROMPT, "debug> "),
+                label=SOURCE_LABEL,
+            )
+
         repl = REPLWrapper(
             cmd,
             orig_prompt,
@@ -624,6 +1677,7 @@ class OctaveEngine:
         if os.name == "nt":
             repl.child.crlf = "\n"
         repl.interrupt = self._interrupt  # type: ignore[method-assign]
+        repl.run_command = self._run_command  # type: ignore[method-assign]
         # Remove the default 50ms delay before sending lines.
         repl.child.delaybeforesend = None
         # ptyprocess's close() sleeps `delayafterclose` (default 0.1s) then
@@ -635,8 +1689,197 @@ class OctaveEngine:
         repl.child.delayafterterminate = 0.5
         return repl
 
+    def _run_command(
+        self,
+        command: str,
+        timeout: float | None = None,
+        stream_handler: Any = None,
+        line_handler: Any = None,
+        stdin_handler: Any = None,
+    ) -> str:
+        """Run a command, see :meth:`metakernel.REPLWrapper.run_command`.
+
+        When the output is streamed, it is read straight from the child and
+        passed on line by line, holding only the last partial line.  This
+        keeps memory flat for verbose cells, where pexpect would otherwise
+        buffer and re-scan everything received between prompts.
+
+        Commands longer than ``source_threshold`` are sourced from a file,
+        see :meth:`_run_sourced`.
+        """
+        if self.source_threshold and len(command) > self.source_threshold:
+            return self._run_sourced(
+                command, timeout, stream_handler, line_handler, stdin_handler
+            )
+        return self._run_lines(
+            command, timeout, stream_handler, line_handler, stdin_handler
+        )
+
+    def _run_sourced(
+        self,
+        command: str,
+        timeout: float | None,
+        stream_handler: Any,
+        line_handler: Any,
+        stdin_handler: Any,
+    ) -> str:
+        """Write a command to a file and run it with ``source``.
+
+        This sends one short line instead of typing every line into the pty
+        and waiting for its prompt, and avoids the tty line length limit.
+        The file holds the command as is, so line numbers in errors match
+        the cell; the file name in errors is replaced by ``SOURCE_LABEL``.
+        Unlike typed lines, the rest of the file is not run after an error.
+        """
+        with self._source_file(command) as (source, relabel):
+            resp = self._run_lines(
+                source,
+                timeout,
+                _relabeled(stream_handler, relabel),
+                _relabeled(line_handler, relabel),
+                stdin_handler,
+            )
+        return relabel(resp)
+
+    @contextlib.contextmanager
+    def _source_file(self, command: str) -> Iterator[tuple[str, Callable[[str], str]]]:
+        """Write a command to a file, for the duration of a ``with`` block.
+
+        Yields the line that sources the file, and a function that replaces
+        the file name in output with ``SOURCE_LABEL``.
+        """
+        name = f"cell_{uuid.uuid4().hex}"
+        path = os.path.join(self.tmp_dir, f"{name}.m")
+        with open(path, "w", encoding="utf-8") as fid:
+            fid.write(command)
+        octave_path = path.replace(os.path.sep, "/")
+
+        def relabel(text: str) -> str:
+            return text.replace(octave_path, SOURCE_LABEL).replace(name, SOURCE_LABEL)
+
+        try:
+            yield "source('{}')".format(octave_path.replace("'", "''")), relabel
+        finally:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+    def _run_lines(
+        self,
+        command: str,
+        timeout: float | None,
+        stream_handler: Any,
+        line_handler: Any,
+        stdin_handler: Any,
+    ) -> str:
+        """Type a command into Octave line by line, see :meth:`_run_command`."""
+        if not stream_handler or line_handler:
+            return REPLWrapper.run_command(
+                self.repl,
+                command,
+                timeout=timeout,
+                stream_handler=stream_handler,
+                line_handler=line_handler,
+                stdin_handler=stdin_handler,
+            )
+        lines = command.splitlines()
+        if command.endswith("\n"):
+            lines.append("")
+        if not lines:
+            raise ValueError("No command was given")
+        repl = self.repl
+        repl.sendline(lines[0])
+        for line in lines[1:]:
+            self._stream_to_prompt(timeout, stream_handler, stdin_handler)
+            repl.sendline(line)
+        pos = self._stream_to_prompt(timeout, stream_handler, stdin_handler)
+        if pos == 1:
+            # Resolve a soft continuation, as in REPLWrapper.run_command.
+            repl.sendline("")
+            if self._stream_to_prompt(timeout, stream_handler, stdin_handler) == 1:
+                repl.interrupt(continuation=True)
+                raise ValueError(
+                    "Continuation prompt found - input was incomplete:\n" + command
+                )
+        return ""
+
+    def _stream_to_prompt(
+        self, timeout: float | None, stream_handler: Any, stdin_handler: Any
+    ) -> int:
+        """Stream output until a prompt, returning its index as for ``expect``."""
+        repl = self.repl
+        child = repl.child
+        expects: list[Any] = [
+            re.compile(regex, re.DOTALL) if isinstance(regex, str) else regex
+            for regex in (
+                repl.prompt_regex,
+                repl.continuation_prompt_regex,
+                repl.stdin_prompt_regex,
+            )
+        ]
+        # A prompt can only be split across reads within this many
+        # characters, as the patterns are mostly literal text.
+        tail = max(len(regex.pattern) for regex in expects)
+        if timeout == -1:
+            timeout = child.timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pending, child.buffer = child.buffer, ""
+        # The output so far has been passed on, so an earlier command's
+        # output must not be left here to be shown on EOF.
+        child.before = ""
+        try:
+            while True:
+                match = None
+                pos = -1
+                for index, regex in enumerate(expects):
+                    found = regex.search(pending)
+                    if found and (match is None or found.start() < match.start()):
+                        match, pos = found, index
+                if match is not None:
+                    before, pending = pending[: match.start()], pending[match.end() :]
+                    if pos == 2:
+                        if not stdin_handler:
+                            raise ValueError(
+                                "Stdin Requested but no stdin handler available"
+                            )
+                        repl.sendline(stdin_handler(before + match.group()))
+                        continue
+                    if before:
+                        stream_handler(before)
+                    child.before = before
+                    return pos
+                # Pass on complete lines, holding back a trailing carriage
+                # return in case it starts a line ending.
+                end = max(pending.rfind("\n"), pending.rfind("\r"))
+                if end >= 0:
+                    if pending[end] == "\r":
+                        text, pending = pending[:end], pending[end:]
+                    else:
+                        text, pending = pending[: end + 1], pending[end + 1 :]
+                    if text:
+                        stream_handler(text)
+                if len(pending) > STREAM_PARTIAL_LIMIT:
+                    # Pass on most of a long line, so that it is neither held
+                    # in memory nor searched again on every read.
+                    cut = len(pending) - tail
+                    stream_handler(pending[:cut])
+                    pending = pending[cut:]
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TIMEOUT("Timed out")
+                pending += child.read_nonblocking(child.maxread, remaining)
+        except (EOF, TIMEOUT):
+            # As with pexpect, hold the output that was not passed on.
+            child.before = pending
+            raise
+        finally:
+            child.buffer = pending + child.buffer
+
     def _interrupt(self, continuation: bool = False, silent: bool = False) -> str:
         """Interrupt the Octave process."""
+        if self.transport == "pipe":
+            return self.repl.interrupt(continuation=continuation)  # type: ignore[no-any-return]
         if os.name == "nt":
             msg = "** Warning: Cannot interrupt Octave on Windows"
             if self.stream_handler:
@@ -697,7 +1940,18 @@ class OctaveEngine:
 
     def _get_executable(self, executable: str = "") -> str:
         """Find the best octave executable."""
-        return get_octave_executable(executable)
+        return get_octave_executable(executable, refresh=self.refresh_cache)
+
+    def _get_version(self, executable: str) -> str:
+        """Get the Octave version, using the on-disk cache when it is valid."""
+        cli_options = os.environ.get("OCTAVE_CLI_OPTIONS", self.cli_options)
+        if not self.refresh_cache:
+            version = get_cached_version(executable, cli_options)
+            if version:
+                return version
+        version = self._validate_executable(executable)
+        set_cached_version(executable, version, cli_options)
+        return version
 
     def _validate_executable(self, executable: str) -> str:
         """Validate the Octave executable."""
@@ -726,15 +1980,62 @@ class OctaveEngine:
 
         temp_dir = tempfile.mkdtemp(dir=base_dir)
         os.mkdir(os.path.join(temp_dir, "plots"))
-        atexit.register(shutil.rmtree, temp_dir)
+        self._at_exit(shutil.rmtree, temp_dir, True)
         return temp_dir
 
+    def _get_plot_tmp_dir(self) -> str:
+        """Get the directory in which per-cell plot directories are created.
+
+        With the ``shm`` transport, figures are written by Octave and read
+        back by the kernel from tmpfs, without touching the disk.  Falls back
+        to the session temp dir when ``/dev/shm`` is unavailable or Octave
+        runs in a sandbox that cannot see it.
+        """
+        plots_dir = os.path.join(self.tmp_dir, "plots")
+        if self.figure_transport == "file":
+            return plots_dir
+        if (
+            os.path.isdir(SHM_DIR)
+            and os.access(SHM_DIR, os.W_OK)
+            and not is_sandboxed_octave(self.executable)
+        ):
+            # Removed by _cleanup, since tmpfs holds the files in memory.
+            shm_dir = tempfile.mkdtemp(prefix="octave_kernel-", dir=SHM_DIR)
+            self._at_exit(shutil.rmtree, shm_dir, True)
+            return shm_dir
+        if self.figure_transport == "shm":
+            self.logger.debug("%s is not available, using %s", SHM_DIR, plots_dir)
+        return plots_dir
+
+    def _at_exit(self, func: Callable[..., Any], *args: Any) -> None:
+        """Call a function at exit, or earlier when the session is cleaned up."""
+        handler = functools.partial(func, *args)
+        atexit.register(handler)
+        self._exit_handlers.append(handler)
+
     def _cleanup(self) -> None:
-        """Clean up resources used by the session."""
+        """Clean up resources used by the session.
+
+        This removes the session's temp dirs and its exit handlers, those of
+        the REPL included, so that an engine that is replaced before exit
+        leaves nothing behind.
+        """
+        atexit.unregister(self._cleanup)
+        if self._figure_pool is not None:
+            self._figure_pool.shutdown(wait=False, cancel_futures=True)
+        # REPLWrapper registers its terminate at exit.
+        atexit.unregister(self.repl.terminate)
         try:
             self.repl.terminate()
         except Exception as e:  # noqa: BLE001
             self.logger.debug(str(e))
+        while self._exit_handlers:
+            handler = self._exit_handlers.pop()
+            atexit.unregister(handler)
+            try:
+                handler()
+            except Exception as e:  # noqa: BLE001
+                self.logger.debug(str(e))
         workspace = os.path.join(os.getcwd(), "octave-workspace")
         if os.path.exists(workspace):
             os.remove(workspace)
@@ -0,0 +1 @@
+"""Octave kernel magics, loaded by MetaKernel from this directory."""
@@ -0,0 +1,63 @@
+"""Magics that move arrays between the %python environment and Octave."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from metakernel import Magic, MetaKernel
+
+
+class TransferMagic(Magic):
+    """Copy numeric arrays between ``%python`` and the Octave workspace."""
+
+    def line_put(self, name: str, octave_name: str = "") -> None:
+        """
+        %put NAME [OCTAVE_NAME] - copy a Python array into Octave.
+
+        This line magic copies the numeric array NAME from the %python
+        environment into the Octave workspace, as OCTAVE_NAME if given.
+        The data is moved through a binary file, not printed as text.
+
+        Examples:
+            %python import numpy as np; x = np.random.rand(1000, 1000)
+            %put x
+            %put x y
+        """
+        env = self._python_env()
+        if name not in env:
+            self.kernel.Error(f"No Python variable named {name!r}")
+            return
+        try:
+            engine = self.kernel.octave_engine  # type: ignore[attr-defined]
+            engine.push(octave_name or name, env[name])
+        except (ImportError, ValueError, RuntimeError) as e:
+            self.kernel.Error(str(e))
+
+    def line_pull(self, name: str, python_name: str = "") -> None:
+        """
+        %pull NAME [PYTHON_NAME] - copy an Octave array into Python.
+
+        This line magic copies the numeric Octave variable NAME into the
+        %python environment as a numpy array, as PYTHON_NAME if given.
+        The data is moved through a binary file, not printed as text.
+
+        Examples:
+            x = rand(1000, 1000);
+            %pull x
+            %python x.mean()
+        """
+        try:
+            engine = self.kernel.octave_engine  # type: ignore[attr-defined]
+            value = engine.pull(name)
+        except (ImportError, ValueError, RuntimeError) as e:
+            self.kernel.Error(str(e))
+            return
+        self._python_env()[python_name or name] = value
+
+    def _python_env(self) -> dict[str, Any]:
+        return self.kernel.line_magics["python"].env  # type: ignore[no-any-return]
+
+
+def register_magics(kernel: MetaKernel) -> None:
+    """Register the transfer magics with the kernel."""
+    kernel.register_magics(TransferMagic)
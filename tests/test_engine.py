@@ -2,16 +2,49 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import glob
+import math
 import os
 import shutil
+import sys
 import tempfile
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
+import pexpect
 import pytest
 from IPython.display import SVG
 from metakernel import REPLWrapper
-
-from octave_kernel.kernel import STDIN_PROMPT_REGEX, OctaveEngine
+from metakernel.pexpect import EOF, TIMEOUT
+
+from octave_kernel._pipe import PipeREPL
+from octave_kernel._pool import PING_MARKER, OctaveEnginePool, PoolStats, _get_rss
+from octave_kernel._utils import (
+    get_cached_version,
+    get_octave_executable,
+    read_cache,
+    set_cached_version,
+    write_cache,
+)
+from octave_kernel.kernel import (
+    ARRAY_HEADER,
+    EVAL_ERROR,
+    EVAL_MARKER,
+    FIGURE_MANIFEST,
+    JSON_HEADER,
+    PDF,
+    STARTUP_ERROR,
+    STDIN_PROMPT_REGEX,
+    SVG_MAX_OBJECTS,
+    EvalResult,
+    FigureInfo,
+    OctaveEngine,
+    RawSVG,
+    parse_figure_manifest,
+)
 
 
 @pytest.fixture(scope="module")
@@ -66,6 +99,18 @@ class TestEval:
         finally:
             engine.stream_handler = old
 
+    def test_eval_many_returns_each_result(self, engine):
+        results = engine.eval_many(["x = 3;", "error('boom')", "disp(x)", "y = ["])
+        assert results[0] == EvalResult("", None)
+        assert results[1].error == "boom"
+        assert results[2].output.strip() == "3"
+        assert "parse error" in (results[3].error or "")
+
+    def test_eval_value_returns_python_objects(self, engine):
+        value = engine.eval_value("struct('a', 1, 'b', {{'x', true}})")
+        assert value == {"a": 1, "b": ["x", True]}
+        assert engine.eval_value("int32([1 2; 3 4])").tolist() == [[1, 2], [3, 4]]
+
     def test_error_handler_called_on_repl_exception(self):
         error_handler = MagicMock()
         mock_repl = MagicMock()
@@ -85,6 +130,834 @@ class TestEval:
             eng.eval("bad")
 
 
+# ---------------------------------------------------------------------------
+# eval_async / make_figures_async
+# ---------------------------------------------------------------------------
+
+# A stand-in REPL that echoes each line back, so the async reads can be
+# tested against a real child process without Octave.
+_FAKE_REPL = r"""
+import os, sys, time
+sys.stdout.write("PROMPT>")
+sys.stdout.flush()
+for line in sys.stdin:
+    line = line.rstrip("\n")
+    if line == "sleep":
+        try:
+            time.sleep(30)
+        except KeyboardInterrupt:
+            # Answer late, once the interrupt is waiting for the prompt.
+            time.sleep(0.2)
+            sys.stdout.write("interrupted\n")
+    elif line.startswith("source('"):
+        path = line[len("source('"):-2]
+        with open(path) as fid:
+            sys.stdout.write(fid.read() + "\n")
+        name = os.path.splitext(os.path.basename(path))[0]
+        sys.stdout.write("error: called from\n    %s at line 2\n" % name)
+        sys.stdout.write("near line 2 of file %s\n" % path)
+    elif line == "many":
+        for i in range(10000):
+            sys.stdout.write("line %d\n" % i)
+    elif line == "long":
+        for i in range(100):
+            sys.stdout.write("x" * 3000)
+        sys.stdout.flush()
+    elif line == "die":
+        sys.stdout.write("partial")
+        sys.stdout.flush()
+        sys.exit()
+    elif line == "input":
+        sys.stdout.write("Enter: STDIN>")
+        sys.stdout.flush()
+        sys.stdout.write("got:" + sys.stdin.readline())
+    elif line:
+        sys.stdout.write("out:" + line + "\n")
+    sys.stdout.write("PROMPT>")
+    sys.stdout.flush()
+"""
+
+
+@pytest.fixture
+def async_engine():
+    """OctaveEngine whose REPL is a fake prompt-driven child process."""
+    child = pexpect.spawnu(sys.executable, ["-u", "-c", _FAKE_REPL], echo=False)
+    repl = MagicMock()
+    repl.child = child
+    repl.sendline = child.sendline
+    repl.prompt_regex = "PROMPT>"
+    repl.continuation_prompt_regex = "CONT>"
+    repl.stdin_prompt_regex = "STDIN>"
+    with patch.object(OctaveEngine, "_create_repl", return_value=repl):
+        eng = OctaveEngine(defer_startup=True)
+    child.expect("PROMPT>")
+    yield eng
+    child.terminate(force=True)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Requires a pty")
+class TestRunCommand:
+    """Tests for OctaveEngine._run_command(), used as the REPL's run_command."""
+
+    def test_streams_output_and_returns_nothing(self, async_engine):
+        out: list[str] = []
+        resp = async_engine._run_command("x = 1", stream_handler=out.append)
+        assert resp == ""
+        assert "".join(out).strip() == "out:x = 1"
+
+    def test_multiline_command_is_streamed(self, async_engine):
+        out: list[str] = []
+        async_engine._run_command("a\nb", stream_handler=out.append)
+        assert "".join(out).split() == ["out:a", "out:b"]
+
+    def test_large_output_is_streamed_in_full(self, async_engine):
+        out: list[str] = []
+        async_engine._run_command("many", stream_handler=out.append)
+        lines = "".join(out).splitlines()
+        assert lines == [f"line {i}" for i in range(10000)]
+        assert len(out) > 1
+        assert async_engine.repl.child.buffer == ""
+
+    def test_long_line_is_streamed_before_it_ends(self, async_engine):
+        out: list[str] = []
+        async_engine._run_command("long", stream_handler=out.append)
+        assert "".join(out) == "x" * 300000
+        assert len(out) > 1
+        assert max(len(text) for text in out) < 300000
+
+    def test_calls_stdin_handler(self, async_engine):
+        out: list[str] = []
+        stdin_handler = MagicMock(return_value="42")
+        async_engine._run_command(
+            "input", stream_handler=out.append, stdin_handler=stdin_handler
+        )
+        stdin_handler.assert_called_once_with("Enter: STDIN>")
+        assert "got:42" in "".join(out)
+
+    def test_eof_leaves_unstreamed_output_in_before(self, async_engine):
+        async_engine.repl.child.before = "__previous_silent_eval__\r\n"
+        out: list[str] = []
+        with pytest.raises(EOF):
+            async_engine._run_command("a\ndie", stream_handler=out.append)
+        assert "".join(out).strip() == "out:a"
+        assert async_engine.repl.child.before == "partial"
+
+    def test_stdin_without_handler_raises(self, async_engine):
+        with pytest.raises(ValueError, match="no stdin handler"):
+            async_engine._run_command("input", stream_handler=print)
+
+    def test_long_command_is_sourced_from_a_file(self, async_engine):
+        async_engine.source_threshold = 10
+        code = "x = 1;\ny = [" + ", ".join(["1"] * 20) + "];"
+        out: list[str] = []
+        async_engine._run_command(code, stream_handler=out.append)
+        text = "".join(out).replace("\r\n", "\n")
+        assert code in text
+        assert "called from\n    cell at line 2" in text
+        assert "near line 2 of file cell\n" in text
+        assert not [f for f in os.listdir(async_engine.tmp_dir) if f.endswith(".m")]
+
+    def test_long_command_is_typed_by_default(self, async_engine):
+        code = "\n".join(["x" * 100] * 50)
+        out: list[str] = []
+        with patch.object(OctaveEngine, "_run_sourced") as run_sourced:
+            async_engine._run_command(code, stream_handler=out.append)
+        run_sourced.assert_not_called()
+        assert "".join(out).count("out:") == 50
+
+    def test_short_command_is_typed(self, async_engine):
+        async_engine.source_threshold = 100
+        out: list[str] = []
+        async_engine._run_command("x = 1", stream_handler=out.append)
+        assert "".join(out).strip() == "out:x = 1"
+
+    def test_sourced_output_is_relabeled_when_not_streamed(self, async_engine):
+        async_engine.source_threshold = 5
+        with patch.object(
+            REPLWrapper, "run_command", side_effect=lambda repl, cmd, **kw: cmd
+        ):
+            resp = async_engine._run_command("x = 1;\ny = 2;")
+        assert resp == "source('cell')"
+
+    def test_unstreamed_command_uses_repl_wrapper(self, async_engine):
+        with patch.object(REPLWrapper, "run_command", return_value="x") as run:
+            assert async_engine._run_command("x = 1") == "x"
+        run.assert_called_once()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Requires a pty")
+class TestEvalAsync:
+    """Tests for OctaveEngine.eval_async()."""
+
+    def test_returns_output_when_silent(self, async_engine):
+        resp = asyncio.run(async_engine.eval_async("x = 1", silent=True))
+        assert resp.strip() == "out:x = 1"
+
+    def test_multiline_output_is_collected(self, async_engine):
+        resp = asyncio.run(async_engine.eval_async("a\nb", silent=True))
+        assert "out:a" in resp
+        assert "out:b" in resp
+
+    def test_streams_lines_when_not_silent(self, async_engine):
+        lines: list[str] = []
+        async_engine.stream_handler = lines.append
+        resp = asyncio.run(async_engine.eval_async("a\nb"))
+        assert resp == ""
+        assert [line.strip() for line in lines] == ["out:a", "out:b"]
+
+    def test_calls_stdin_handler(self, async_engine):
+        async_engine.stdin_handler = MagicMock(return_value="42")
+        resp = asyncio.run(async_engine.eval_async("input", silent=True))
+        async_engine.stdin_handler.assert_called_once()
+        assert "got:42" in resp
+
+    def test_empty_code_raises(self, async_engine):
+        with pytest.raises(ValueError, match="No command"):
+            asyncio.run(async_engine.eval_async("  "))
+
+    def test_concurrent_calls_are_serialized(self, async_engine):
+        async def run():
+            return await asyncio.gather(
+                async_engine.eval_async("one", silent=True),
+                async_engine.eval_async("two", silent=True),
+            )
+
+        one, two = asyncio.run(run())
+        assert one.strip() == "out:one"
+        assert two.strip() == "out:two"
+
+    def test_cancel_interrupts_octave(self, async_engine):
+        async def run():
+            task = asyncio.create_task(async_engine.eval_async("sleep"))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            await task
+
+        with (
+            patch.object(async_engine, "_interrupt") as interrupt,
+            pytest.raises(asyncio.CancelledError),
+        ):
+            asyncio.run(run())
+        interrupt.assert_called_once_with(silent=True)
+
+    def test_cancel_interrupts_off_the_event_loop(self, async_engine):
+        threads = []
+
+        async def run():
+            task = asyncio.create_task(async_engine.eval_async("sleep"))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            await task
+
+        with (
+            patch.object(
+                async_engine,
+                "_interrupt",
+                side_effect=lambda **kw: threads.append(threading.current_thread()),
+            ),
+            pytest.raises(asyncio.CancelledError),
+        ):
+            asyncio.run(run())
+        assert threads
+        assert threads[0] is not threading.current_thread()
+
+    def test_cancel_interrupts_and_keeps_engine_in_sync(self, async_engine):
+        # Let the interrupt wait for the prompt, as with a real REPLWrapper.
+        repl = async_engine.repl
+        repl.prompt_emit_cmd = None
+        repl._stream_handler = repl._line_handler = repl._stdin_handler = None
+        repl._expect_prompt = functools.partial(REPLWrapper._expect_prompt, repl)
+
+        async def run():
+            task = asyncio.create_task(async_engine.eval_async("sleep"))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            start = time.monotonic()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert time.monotonic() - start < 10
+            return await async_engine.eval_async("say after", silent=True)
+
+        assert asyncio.run(run()).strip() == "out:say after"
+
+    def test_calls_work_on_a_new_event_loop(self, async_engine):
+        one = asyncio.run(async_engine.eval_async("one", silent=True))
+        two = asyncio.run(async_engine.eval_async("two", silent=True))
+        assert (one.strip(), two.strip()) == ("out:one", "out:two")
+        out: list[str] = []
+        async_engine._run_command("three", stream_handler=out.append)
+        assert "".join(out).strip() == "out:three"
+
+    def test_long_code_is_sourced_from_a_file(self, async_engine):
+        async_engine.source_threshold = 10
+        code = "x = 1;\ny = [" + ", ".join(["1"] * 20) + "];"
+        resp = asyncio.run(async_engine.eval_async(code, silent=True))
+        text = resp.replace("\r\n", "\n")
+        assert code in text
+        assert "out:" not in text
+        assert "near line 2 of file cell\n" in text
+        assert not [f for f in os.listdir(async_engine.tmp_dir) if f.endswith(".m")]
+
+    def test_long_code_is_relabeled_when_streamed(self, async_engine):
+        async_engine.source_threshold = 10
+        lines: list[str] = []
+        async_engine.stream_handler = lines.append
+        code = "x = 1;\ny = [" + ", ".join(["1"] * 20) + "];"
+        asyncio.run(async_engine.eval_async(code))
+        assert "called from" in "".join(lines)
+        assert any("    cell at line 2" in line for line in lines)
+
+    def test_timeout_goes_to_error_handler(self, async_engine):
+        async_engine.error_handler = MagicMock()
+        with patch.object(async_engine, "_interrupt"):
+            resp = asyncio.run(async_engine.eval_async("sleep", timeout=0.2))
+        assert resp == ""
+        async_engine.error_handler.assert_called_once()
+
+    def test_make_figures_async_reads_manifest(self, mock_engine, tmp_path):
+        mock_engine._has_startup = True
+        mock_engine._plot_settings = {
+            "backend": "inline",
+            "format": "png",
+            "width": -1,
+            "height": -1,
+            "resolution": 0,
+            "name": "Figure",
+            "plot_dir": None,
+        }
+        line = _manifest_line(1, 3, "png", 10, "Figure_3.png")
+
+        async def fake_eval(code, **kwargs):
+            assert code.startswith("_make_figures(")
+            return line
+
+        with patch.object(mock_engine, "eval_async", side_effect=fake_eval):
+            plot_dir = asyncio.run(mock_engine.make_figures_async(str(tmp_path)))
+        assert plot_dir == str(tmp_path).replace(os.path.sep, "/")
+        assert mock_engine._figure_index == 3
+
+
+# ---------------------------------------------------------------------------
+# eval_many
+# ---------------------------------------------------------------------------
+
+
+class TestEvalMany:
+    """Tests for OctaveEngine.eval_many()."""
+
+    def test_sends_one_command(self, mock_engine):
+        with patch.object(mock_engine, "eval", return_value="") as mock_eval:
+            mock_engine.eval_many(["x = 1", "y = 2"])
+        mock_eval.assert_called_once()
+        code = mock_eval.call_args[0][0]
+        assert "eval(['x = 1'])" in code
+        assert "eval(['y = 2'])" in code
+        assert mock_eval.call_args[1]["silent"] is True
+
+    def test_sends_one_line(self, mock_engine):
+        with patch.object(mock_engine, "eval", return_value="") as mock_eval:
+            mock_engine.eval_many(["x = 1", "s = 'a';\ndisp(s)", "y = 2"])
+        assert "\n" not in mock_eval.call_args[0][0]
+
+    def test_quotes_and_newlines_are_escaped(self, mock_engine):
+        with patch.object(mock_engine, "eval", return_value="") as mock_eval:
+            mock_engine.eval_many(["s = 'a';\ndisp(s)"])
+        assert "eval(['s = ''a'';' char(10) 'disp(s)'])" in mock_eval.call_args[0][0]
+
+    def test_splits_outputs_and_errors(self, mock_engine):
+        resp = (
+            f"\n{EVAL_MARKER}0\nx = 1\n"
+            f"\n{EVAL_MARKER}1\n\n{EVAL_ERROR}boom"
+            f"\n{EVAL_MARKER}2\nabc"
+        )
+        with patch.object(mock_engine, "eval", return_value=resp):
+            results = mock_engine.eval_many(["x = 1", "error('boom')", "printf('abc')"])
+        assert results == [
+            EvalResult("x = 1\n", None),
+            EvalResult("", "boom"),
+            EvalResult("abc", None),
+        ]
+
+    def test_keeps_output_before_an_error(self, mock_engine):
+        resp = f"\n{EVAL_MARKER}0\nsome\n\n{EVAL_ERROR}boom\n"
+        with patch.object(mock_engine, "eval", return_value=resp):
+            results = mock_engine.eval_many(["disp('some'); error('boom')"])
+        assert results == [EvalResult("some\n", "boom")]
+
+    def test_handles_crlf(self, mock_engine):
+        resp = f"\r\n{EVAL_MARKER}0\r\nx = 1\r\n"
+        with patch.object(mock_engine, "eval", return_value=resp):
+            results = mock_engine.eval_many(["x = 1"])
+        assert results == [EvalResult("x = 1\n", None)]
+
+    def test_statements_that_did_not_run_have_an_error(self, mock_engine):
+        resp = f"\n{EVAL_MARKER}0\nx = 1\n"
+        with patch.object(mock_engine, "eval", return_value=resp):
+            results = mock_engine.eval_many(["x = 1", "y = 2"])
+        assert results[0] == EvalResult("x = 1\n", None)
+        assert results[1].error == "The statement was not run"
+
+    def test_no_statements(self, mock_engine):
+        with patch.object(mock_engine, "eval") as mock_eval:
+            assert mock_engine.eval_many([]) == []
+        mock_eval.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# PipeREPL
+# ---------------------------------------------------------------------------
+
+# A stand-in for Octave over pipes, which runs the sourced file one line at
+# a time and prints the frames asked for by each command.
+_FAKE_PIPE_OCTAVE = r"""
+import re, sys, time
+sys.stdout.write("banner\nPROMPT>")
+sys.stdout.flush()
+for line in sys.stdin:
+    try:
+        match = re.search(r"source\('(.*?)'\)", line)
+        if match:
+            path = match.group(1)
+            for code in open(path).read().splitlines():
+                if code == "sleep":
+                    time.sleep(30)
+                elif code == "many":
+                    sys.stdout.write("".join("line %d\n" % i for i in range(10000)))
+                elif code == "input":
+                    sys.stdout.write("Enter: STDIN>")
+                    sys.stdout.flush()
+                    sys.stdout.write("got:" + sys.stdin.readline())
+                elif code.startswith("error "):
+                    msg = "%s near line 1 of file %s" % (code[6:], path)
+                    token = re.search(r"\\036(\w+) error", line).group(1)
+                    data = msg.encode()
+                    sys.stdout.write("\x1e%s error %d\n" % (token, len(data)))
+                    sys.stdout.write(msg)
+                    break
+                elif code == "partial":
+                    sys.stdout.write("no newline")
+                elif code == "exit":
+                    sys.exit(0)
+                else:
+                    sys.stdout.write("out:" + code + "\n")
+        for token, cmd_id in re.findall(r"\\036(\w+) done (\d+)", line):
+            sys.stdout.write("\x1e%s done %s\n" % (token, cmd_id))
+        sys.stdout.flush()
+    except KeyboardInterrupt:
+        sys.stdout.write("interrupted\n")
+"""
+
+
+@pytest.fixture
+def pipe_repl(tmp_path):
+    """PipeREPL over a fake Octave child process."""
+    repl = PipeREPL(
+        [sys.executable, "-u", "-c", _FAKE_PIPE_OCTAVE],
+        str(tmp_path),
+        stdin_prompts=("STDIN>",),
+    )
+    yield repl
+    repl.terminate()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Requires POSIX pipes")
+class TestPipeREPL:
+    """Tests for the pipe transport."""
+
+    def test_drops_startup_output(self, pipe_repl):
+        assert pipe_repl.run_command("x = 1") == "out:x = 1\n"
+
+    def test_runs_multiline_command(self, pipe_repl):
+        assert pipe_repl.run_command("a\nb") == "out:a\nout:b\n"
+
+    def test_streams_output(self, pipe_repl):
+        chunks: list[str] = []
+        resp = pipe_repl.run_command("a\nb", stream_handler=chunks.append)
+        assert resp == ""
+        assert "".join(chunks) == "out:a\nout:b\n"
+
+    def test_calls_line_handler(self, pipe_repl):
+        lines: list[str] = []
+        pipe_repl.run_command("a\nb", line_handler=lines.append)
+        assert lines == ["out:a", "out:b"]
+
+    def test_large_output(self, pipe_repl):
+        resp = pipe_repl.run_command("many")
+        assert resp.count("\n") == 10000
+        assert resp.endswith("line 9999\n")
+
+    def test_output_without_newline(self, pipe_repl):
+        assert pipe_repl.run_command("partial") == "no newline"
+
+    def test_error_frame(self, pipe_repl):
+        resp = pipe_repl.run_command("error boom\nnot run")
+        assert resp == "error: boom near line 1 of file cell\n"
+        assert pipe_repl.last_error == "boom near line 1 of file cell"
+
+    def test_next_command_clears_error(self, pipe_repl):
+        pipe_repl.run_command("error boom")
+        pipe_repl.run_command("x")
+        assert pipe_repl.last_error is None
+
+    def test_removes_command_file(self, pipe_repl, tmp_path):
+        pipe_repl.run_command("x")
+        assert list(tmp_path.iterdir()) == []
+
+    def test_calls_stdin_handler(self, pipe_repl):
+        stdin_handler = MagicMock(return_value="42")
+        resp = pipe_repl.run_command("input", stdin_handler=stdin_handler)
+        stdin_handler.assert_called_once_with("Enter: STDIN>")
+        assert resp == "got:42\n"
+
+    def test_stdin_without_handler_raises(self, pipe_repl):
+        with pytest.raises(ValueError, match="no stdin handler"):
+            pipe_repl.run_command("input")
+
+    def test_empty_command_raises(self, pipe_repl):
+        with pytest.raises(ValueError, match="No command"):
+            pipe_repl.run_command("  ")
+
+    def test_timeout(self, pipe_repl):
+        with pytest.raises(TIMEOUT):
+            pipe_repl.run_command("sleep", timeout=0.2)
+
+    def test_interrupt_after_timeout(self, pipe_repl):
+        with pytest.raises(TIMEOUT):
+            pipe_repl.run_command("sleep", timeout=0.2)
+        assert "interrupted" in pipe_repl.interrupt()
+        assert pipe_repl.run_command("x") == "out:x\n"
+
+    def test_send_interrupt_ends_command_on_another_thread(self, pipe_repl):
+        timer = threading.Timer(0.2, pipe_repl.send_interrupt)
+        timer.start()
+        try:
+            assert "interrupted" in pipe_repl.run_command("sleep", timeout=10)
+        finally:
+            timer.join()
+        assert pipe_repl.run_command("x") == "out:x\n"
+
+    def test_exit_raises_eof(self, pipe_repl):
+        with pytest.raises(EOF):
+            pipe_repl.run_command("exit")
+
+    def test_child_has_before(self, pipe_repl):
+        pipe_repl.run_command("x")
+        assert pipe_repl.child.before == "out:x\n"
+
+    def test_engine_eval(self, pipe_repl):
+        with patch.object(OctaveEngine, "_create_repl", return_value=pipe_repl):
+            eng = OctaveEngine(defer_startup=True, transport="pipe")
+        assert eng.eval("x", silent=True) == "out:x\n"
+
+    def test_engine_interrupt(self, pipe_repl):
+        with patch.object(OctaveEngine, "_create_repl", return_value=pipe_repl):
+            eng = OctaveEngine(defer_startup=True, transport="pipe")
+        with patch.object(pipe_repl, "interrupt", return_value="") as interrupt:
+            eng._interrupt(continuation=True)
+        interrupt.assert_called_once_with(continuation=True)
+
+    def test_engine_eval_async(self, pipe_repl):
+        with patch.object(OctaveEngine, "_create_repl", return_value=pipe_repl):
+            eng = OctaveEngine(defer_startup=True, transport="pipe")
+        resp = asyncio.run(eng.eval_async("x", silent=True))
+        assert resp == "out:x\n"
+
+    def test_engine_eval_async_cancel_interrupts(self, pipe_repl):
+        with patch.object(OctaveEngine, "_create_repl", return_value=pipe_repl):
+            eng = OctaveEngine(defer_startup=True, transport="pipe")
+
+        async def run():
+            task = asyncio.create_task(eng.eval_async("sleep"))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            await task
+
+        eng.stream_handler = MagicMock()
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(run())
+        assert eng.eval("x", silent=True) == "out:x\n"
+
+
+# ---------------------------------------------------------------------------
+# push / pull
+# ---------------------------------------------------------------------------
+
+
+class TestPushPull:
+    """Tests for OctaveEngine.push() and OctaveEngine.pull()."""
+
+    @pytest.fixture(autouse=True)
+    def _numpy(self):
+        self.np = pytest.importorskip("numpy")
+
+    def _push(self, eng, name, value):
+        """Push a value, returning the eval command and the file contents."""
+        seen = {}
+
+        def fake_eval(code, **kwargs):
+            seen["cmd"] = code
+            path = code.split('"')[1]
+            with open(path, "rb") as fid:
+                seen["data"] = fid.read()
+            return ""
+
+        with patch.object(eng, "eval", side_effect=fake_eval):
+            eng.push(name, value)
+        return seen["cmd"], seen["data"]
+
+    def _pull(self, eng, name, array, cls, is_complex=False):
+        """Pull a variable, writing ``array`` as Octave would."""
+
+        def fake_eval(code, **kwargs):
+            path = code.split('"')[1]
+            data = self.np.asarray(array).astype(array.dtype.newbyteorder("<"))
+            with open(path, "wb") as fid:
+                fid.write(data.tobytes(order="F"))
+            dims = " ".join(str(dim) for dim in array.shape)
+            return f"{ARRAY_HEADER}{cls}\t{int(is_complex)}\t{dims} \n"
+
+        with patch.object(eng, "eval", side_effect=fake_eval):
+            return eng.pull(name)
+
+    def test_push_writes_column_major_data(self, mock_engine):
+        array = self.np.arange(6, dtype="float64").reshape(2, 3)
+        cmd, data = self._push(mock_engine, "x", array)
+        assert data == array.tobytes(order="F")
+        assert cmd.startswith("x = _read_array(")
+        assert '"double", [2 3], false);' in cmd
+
+    def test_push_vector_becomes_row(self, mock_engine):
+        cmd, _ = self._push(mock_engine, "v", self.np.arange(4, dtype="int32"))
+        assert '"int32", [1 4], false);' in cmd
+
+    def test_push_complex_is_interleaved(self, mock_engine):
+        array = self.np.array([1 + 2j, 3 + 4j])
+        cmd, data = self._push(mock_engine, "z", array)
+        assert self.np.frombuffer(data, "<f8").tolist() == [1, 2, 3, 4]
+        assert '"double", [1 2], true);' in cmd
+
+    def test_push_logical(self, mock_engine):
+        cmd, data = self._push(mock_engine, "b", self.np.array([True, False]))
+        assert data == b"\x01\x00"
+        assert '"logical"' in cmd
+
+    def test_push_removes_file(self, mock_engine):
+        self._push(mock_engine, "x", self.np.ones(3))
+        assert not [
+            f for f in os.listdir(mock_engine.tmp_dir) if f.startswith("array-")
+        ]
+
+    def test_push_rejects_invalid_name(self, mock_engine):
+        with pytest.raises(ValueError, match="variable name"):
+            mock_engine.push("x; system('rm')", self.np.ones(3))
+
+    def test_push_rejects_unsupported_dtype(self, mock_engine):
+        with pytest.raises(ValueError, match="dtype"):
+            mock_engine.push("x", self.np.array(["a", "b"]))
+
+    def test_push_raises_on_octave_error(self, mock_engine):
+        with (
+            patch.object(mock_engine, "eval", return_value="error: out of memory"),
+            pytest.raises(RuntimeError, match="out of memory"),
+        ):
+            mock_engine.push("x", self.np.ones(3))
+
+    def test_pull_round_trips_shape_and_dtype(self, mock_engine):
+        array = self.np.arange(24, dtype="float64").reshape(2, 3, 4)
+        result = self._pull(mock_engine, "x", array, "double")
+        assert result.dtype == self.np.float64
+        assert (result == array).all()
+
+    def test_pull_int_and_single(self, mock_engine):
+        array = self.np.arange(6, dtype="uint16").reshape(3, 2)
+        assert self._pull(mock_engine, "x", array, "uint16").dtype == self.np.uint16
+        array = self.np.ones((2, 2), dtype="float32")
+        assert self._pull(mock_engine, "x", array, "single").dtype == self.np.float32
+
+    def test_pull_complex(self, mock_engine):
+        array = self.np.array([[1 + 2j, 3 - 4j]])
+        result = self._pull(mock_engine, "z", array, "double", is_complex=True)
+        assert (result == array).all()
+
+    def test_pull_logical(self, mock_engine):
+        array = self.np.array([[True, False]])
+        result = self._pull(mock_engine, "b", array, "logical")
+        assert result.dtype == self.np.bool_
+        assert result.tolist() == [[True, False]]
+
+    def test_pulled_array_is_writeable(self, mock_engine):
+        array = self.np.arange(6, dtype="float64").reshape(2, 3)
+        result = self._pull(mock_engine, "x", array, "double")
+        result[0, 0] = 42
+        assert result[0, 0] == 42
+
+    def test_pull_reads_file_where_it_cannot_stay_mapped(self, mock_engine):
+        array = self.np.arange(6, dtype="int32").reshape(3, 2)
+        with patch.object(os, "name", "nt"):
+            result = self._pull(mock_engine, "x", array, "int32")
+        assert not isinstance(result.base, self.np.memmap)
+        assert result.flags.writeable
+        assert (result == array).all()
+        assert not [
+            f for f in os.listdir(mock_engine.tmp_dir) if f.startswith("array-")
+        ]
+
+    def test_pull_empty(self, mock_engine):
+        array = self.np.zeros((0, 3))
+        result = self._pull(mock_engine, "e", array, "double")
+        assert result.shape == (0, 3)
+
+    def test_pull_raises_on_octave_error(self, mock_engine):
+        with (
+            patch.object(mock_engine, "eval", return_value="error: 'y' undefined\n"),
+            pytest.raises(RuntimeError, match="undefined"),
+        ):
+            mock_engine.pull("y")
+
+
+# ---------------------------------------------------------------------------
+# eval_json / eval_value
+# ---------------------------------------------------------------------------
+
+
+class TestEvalValue:
+    """Tests for OctaveEngine.eval_json() and OctaveEngine.eval_value()."""
+
+    def test_eval_json_decodes_value(self, mock_engine):
+        resp = f'{JSON_HEADER}{{"a":1,"b":[1,2],"c":"x"}}\n'
+        with patch.object(mock_engine, "eval", return_value=resp) as mock_eval:
+            value = mock_engine.eval_json("s")
+        assert value == {"a": 1, "b": [1, 2], "c": "x"}
+        mock_eval.assert_called_once_with('_write_value("", (s));', silent=True)
+
+    def test_eval_json_decodes_nan_and_inf(self, mock_engine):
+        resp = f"{JSON_HEADER}[NaN,Infinity,-Infinity]\n"
+        with patch.object(mock_engine, "eval", return_value=resp):
+            value = mock_engine.eval_json("[NaN Inf -Inf]")
+        assert math.isnan(value[0])
+        assert value[1:] == [math.inf, -math.inf]
+
+    def test_eval_json_skips_other_output(self, mock_engine):
+        resp = f"warning: something\n{JSON_HEADER}true\n"
+        with patch.object(mock_engine, "eval", return_value=resp):
+            assert mock_engine.eval_json("x > 0") is True
+
+    def test_eval_json_strips_trailing_semicolon(self, mock_engine):
+        with patch.object(
+            mock_engine, "eval", return_value=f"{JSON_HEADER}1\n"
+        ) as mock_eval:
+            mock_engine.eval_json(" x; ")
+        assert mock_eval.call_args[0][0] == '_write_value("", (x));'
+
+    def test_eval_json_raises_on_octave_error(self, mock_engine):
+        with (
+            patch.object(mock_engine, "eval", return_value="error: 'y' undefined\n"),
+            pytest.raises(RuntimeError, match="undefined"),
+        ):
+            mock_engine.eval_json("y")
+
+    def test_multiline_expression_raises(self, mock_engine):
+        with pytest.raises(ValueError, match="single line"):
+            mock_engine.eval_json("x\ny")
+
+    def test_eval_value_maps_arrays(self, mock_engine):
+        np = pytest.importorskip("numpy")
+        array = np.arange(6, dtype="float64").reshape(2, 3)
+
+        def fake_eval(code, **kwargs):
+            path = code.split('"')[1]
+            with open(path, "wb") as fid:
+                fid.write(array.astype("<f8").tobytes(order="F"))
+            return f"{ARRAY_HEADER}double\t0\t2 3 \n"
+
+        with patch.object(mock_engine, "eval", side_effect=fake_eval):
+            value = mock_engine.eval_value("reshape(0:5, 3, 2)'")
+        assert (value == array).all()
+        assert not [
+            f for f in os.listdir(mock_engine.tmp_dir) if f.startswith("array-")
+        ]
+
+    def test_eval_value_decodes_scalars_from_json(self, mock_engine):
+        pytest.importorskip("numpy")
+        with patch.object(mock_engine, "eval", return_value=f"{JSON_HEADER}3\n"):
+            assert mock_engine.eval_value("1 + 2") == 3
+
+    def test_eval_value_without_numpy_uses_json(self, mock_engine):
+        with (
+            patch.dict(sys.modules, {"numpy": None}),
+            patch.object(
+                mock_engine, "eval", return_value=f"{JSON_HEADER}[[1,2],[3,4]]\n"
+            ) as mock_eval,
+        ):
+            value = mock_engine.eval_value("[1 2; 3 4]")
+        assert value == [[1, 2], [3, 4]]
+        assert mock_eval.call_args[0][0].startswith('_write_value("",')
+
+
+# ---------------------------------------------------------------------------
+# timings
+# ---------------------------------------------------------------------------
+
+
+class TestTimings:
+    """Tests for the phase timings recorded by OctaveEngine."""
+
+    def test_eval_records_time_calls_and_bytes(self, mock_engine):
+        mock_engine.repl.run_command.return_value = "ans = 2"
+        mock_engine.eval("1 + 1", silent=True)
+        timings = mock_engine.timings
+        assert timings["eval_calls"] == 1
+        assert timings["eval_seconds"] >= 0
+        assert timings["eval_bytes_sent"] == len("1 + 1")
+        assert timings["eval_bytes_received"] == len("ans = 2")
+
+    def test_eval_accumulates(self, mock_engine):
+        mock_engine.repl.run_command.return_value = ""
+        mock_engine.eval("a")
+        mock_engine.eval("b")
+        assert mock_engine.timings["eval_calls"] == 2
+
+    def test_eval_error_is_still_recorded(self, mock_engine):
+        mock_engine.error_handler = MagicMock()
+        mock_engine.repl.run_command.side_effect = Exception("boom")
+        mock_engine.eval("bad")
+        assert mock_engine.timings["eval_calls"] == 1
+
+    def test_make_figures_records_figure_count(self, mock_engine, tmp_path):
+        mock_engine._has_startup = True
+        mock_engine._plot_settings = {
+            "backend": "inline",
+            "format": "png",
+            "width": -1,
+            "height": -1,
+            "resolution": 0,
+            "name": "Figure",
+            "plot_dir": None,
+        }
+        lines = "\n".join(
+            _manifest_line(i, i, "png", 10, f"Figure00{i}.png") for i in (1, 2)
+        )
+        with patch.object(mock_engine, "eval", return_value=lines):
+            mock_engine.make_figures(str(tmp_path))
+        assert mock_engine.timings["make_figures_calls"] == 1
+        assert mock_engine.timings["make_figures_figures"] == 2
+
+    def test_extract_figures_records_bytes(self, mock_engine, tmp_path):
+        mock_engine._plot_settings = {"name": "Figure"}
+        (tmp_path / "Figure001.png").write_bytes(b"\x89PNG\r\n\x1a\n" + b"\0" * 16)
+        with patch("octave_kernel.kernel.Image"):
+            mock_engine.extract_figures(str(tmp_path))
+        assert mock_engine.timings["extract_figures_bytes_received"] == 24
+        assert mock_engine.timings["extract_figures_seconds"] >= 0
+
+    def test_reset_timings_returns_and_clears(self, mock_engine):
+        mock_engine.repl.run_command.return_value = ""
+        mock_engine.eval("a")
+        timings = mock_engine.reset_timings()
+        assert timings["eval_calls"] == 1
+        assert mock_engine.timings == {}
+
+
 # ---------------------------------------------------------------------------
 # plot_settings
 # ---------------------------------------------------------------------------
@@ -212,6 +1085,187 @@ class TestMakeFigures:
             eng.make_figures()
 
 
+# ---------------------------------------------------------------------------
+# Figure manifest
+# ---------------------------------------------------------------------------
+
+
+def _manifest_line(handle, index, fmt, size, filename):
+    return f"{FIGURE_MANIFEST}{handle}\t{index}\t{fmt}\t{size}\t{filename}"
+
+
+class TestFigureManifest:
+    """Tests for the figure manifest printed by _make_figures."""
+
+    def _setup(self, eng):
+        eng._has_startup = True
+        eng._plot_settings = {
+            "backend": "inline",
+            "format": "png",
+            "width": -1,
+            "height": -1,
+            "resolution": 0,
+            "name": "Figure",
+            "plot_dir": None,
+        }
+
+    def test_parse_manifest(self):
+        resp = "\n".join(
+            [
+                "some output",
+                _manifest_line(2, 1, "svg", 1234, "Figure001.svg"),
+                _manifest_line(1, 2, "png", 99, "Figure002.png\r"),
+            ]
+        )
+        figures = parse_figure_manifest(resp)
+        assert figures == [
+            FigureInfo("Figure001.svg", "svg", 1234, 2.0, 1),
+            FigureInfo("Figure002.png", "png", 99, 1.0, 2),
+        ]
+
+    def test_parse_empty_manifest(self):
+        assert parse_figure_manifest("") == []
+
+    def test_make_figures_does_not_glob(self, mock_engine, tmp_path):
+        self._setup(mock_engine)
+        with (
+            patch.object(mock_engine, "eval", return_value=""),
+            patch("octave_kernel.kernel.glob.glob") as mock_glob,
+        ):
+            mock_engine.make_figures(str(tmp_path))
+        mock_glob.assert_not_called()
+
+    def test_start_index_follows_previous_figures(self, mock_engine, tmp_path):
+        self._setup(mock_engine)
+        resp = _manifest_line(1, 7, "png", 10, "Figure007.png")
+        with patch.object(mock_engine, "eval", return_value=resp) as mock_eval:
+            mock_engine.make_figures(str(tmp_path))
+            mock_engine.make_figures(str(tmp_path))
+        assert mock_eval.call_args_list[0][0][0].endswith(", 0)")
+        assert mock_eval.call_args_list[1][0][0].endswith(", 7)")
+
+    def test_auto_format_passes_thresholds(self, mock_engine, tmp_path):
+        self._setup(mock_engine)
+        mock_engine._plot_settings = mock_engine._normalize_plot_settings(
+            {"format": "auto", "svg_max_points": 500}
+        )
+        with patch.object(mock_engine, "eval", return_value="") as mock_eval:
+            mock_engine.make_figures(str(tmp_path))
+        assert mock_eval.call_args[0][0].endswith(f", 0, 500, {SVG_MAX_OBJECTS})")
+
+    def test_fixed_format_has_no_thresholds(self, mock_engine, tmp_path):
+        self._setup(mock_engine)
+        with patch.object(mock_engine, "eval", return_value="") as mock_eval:
+            mock_engine.make_figures(str(tmp_path))
+        assert mock_eval.call_args[0][0].endswith(", 0)")
+
+    def test_auto_format_reads_each_saved_format(self, mock_engine, tmp_path):
+        self._setup(mock_engine)
+        mock_engine._plot_settings = mock_engine._normalize_plot_settings(
+            {"format": "auto"}
+        )
+        (tmp_path / "Figure001.svg").write_text(_SVG_TEMPLATE.format(w=10, h=10))
+        (tmp_path / "Figure002.png").write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 16)
+        resp = "\n".join(
+            [
+                _manifest_line(2, 1, "svg", 10, "Figure001.svg"),
+                _manifest_line(1, 2, "png", 24, "Figure002.png"),
+            ]
+        )
+        with patch.object(mock_engine, "eval", return_value=resp):
+            plot_dir = mock_engine.make_figures(str(tmp_path))
+        assert plot_dir is not None
+        images = mock_engine.extract_figures(plot_dir)
+        assert sorted(type(im).__name__ for im in images) == ["Image", "RawSVG"]
+
+    def test_extract_reads_only_manifest_files(self, mock_engine, tmp_path):
+        self._setup(mock_engine)
+        for fname in ["Figure001.png", "Figure002.png", "Figure_old.png"]:
+            (tmp_path / fname).write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 16)
+        resp = "\n".join(
+            [
+                _manifest_line(2, 1, "png", 24, "Figure001.png"),
+                _manifest_line(1, 2, "png", 24, "Figure002.png"),
+            ]
+        )
+        with patch.object(mock_engine, "eval", return_value=resp):
+            plot_dir = mock_engine.make_figures(str(tmp_path))
+        with patch("octave_kernel.kernel.Image") as mock_image:
+            images = mock_engine.extract_figures(plot_dir)
+        assert len(images) == 2
+        opened = [c.args[0] for c in mock_image.call_args_list]
+        assert opened == [
+            os.path.join(plot_dir, "Figure002.png"),
+            os.path.join(plot_dir, "Figure001.png"),
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Figure transport
+# ---------------------------------------------------------------------------
+
+
+class TestFigureTransport:
+    """Tests for choosing where figures are written."""
+
+    def _plot_tmp_dir(self, eng, transport, shm_dir):
+        eng.figure_transport = transport
+        eng._executable = "/usr/bin/octave"
+        with patch("octave_kernel.kernel.SHM_DIR", str(shm_dir)):
+            return eng._get_plot_tmp_dir()
+
+    def test_auto_uses_shm_when_available(self, mock_engine, tmp_path):
+        result = self._plot_tmp_dir(mock_engine, "auto", tmp_path)
+        assert os.path.dirname(result) == str(tmp_path)
+
+    def test_cleanup_removes_shm_dir(self, mock_engine, tmp_path):
+        result = self._plot_tmp_dir(mock_engine, "auto", tmp_path)
+        with patch("atexit.unregister") as mock_unregister:
+            mock_engine._cleanup()
+        assert not os.path.exists(result)
+        assert mock_unregister.called
+
+    def test_shm_falls_back_when_unavailable(self, mock_engine, tmp_path):
+        result = self._plot_tmp_dir(mock_engine, "shm", tmp_path / "missing")
+        assert result == os.path.join(mock_engine.tmp_dir, "plots")
+
+    def test_file_transport_uses_session_temp_dir(self, mock_engine, tmp_path):
+        result = self._plot_tmp_dir(mock_engine, "file", tmp_path)
+        assert result == os.path.join(mock_engine.tmp_dir, "plots")
+
+    def test_sandboxed_octave_does_not_use_shm(self, mock_engine, tmp_path):
+        mock_engine.figure_transport = "auto"
+        mock_engine._executable = "flatpak run org.octave.Octave"
+        with patch("octave_kernel.kernel.SHM_DIR", str(tmp_path)):
+            result = mock_engine._get_plot_tmp_dir()
+        assert result == os.path.join(mock_engine.tmp_dir, "plots")
+
+    def test_invalid_transport_raises(self):
+        with (
+            patch.object(OctaveEngine, "_create_repl", return_value=MagicMock()),
+            pytest.raises(ValueError, match="figure_transport"),
+        ):
+            OctaveEngine(defer_startup=True, figure_transport="pipe")
+
+    def test_make_figures_creates_plot_dir_in_transport_dir(
+        self, mock_engine, tmp_path
+    ):
+        mock_engine._has_startup = True
+        mock_engine._plot_tmp_dir = str(tmp_path)
+        mock_engine._plot_settings = {
+            "backend": "inline",
+            "format": "png",
+            "width": -1,
+            "height": -1,
+            "resolution": 0,
+            "name": "Figure",
+            "plot_dir": None,
+        }
+        with patch.object(mock_engine, "eval", return_value=""):
+            plot_dir = mock_engine.make_figures()
+        assert os.path.dirname(plot_dir) == str(tmp_path).replace(os.path.sep, "/")
+
+
 # ---------------------------------------------------------------------------
 # extract_figures
 # ---------------------------------------------------------------------------
@@ -259,6 +1313,42 @@ class TestExtractFigures:
             result = engine.extract_figures(tmp_dir)
         assert len(result) == 1
 
+    def test_many_figures_keep_their_order(self, mock_engine):
+        mock_engine._plot_settings = {"name": "Figure"}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for i in range(12):
+                fname = os.path.join(tmp_dir, f"Figure{i}.png")
+                with open(fname, "wb") as f:
+                    f.write(b"\x89PNG\r\n\x1a\n" + bytes([i]) * 16)
+            expected = []
+            for fname in reversed(glob.glob(os.path.join(tmp_dir, "Figure*"))):
+                with open(fname, "rb") as f:
+                    expected.append(f.read())
+            result = mock_engine.extract_figures(tmp_dir)
+        assert [im.data for im in result] == expected
+
+    def test_iter_figures_reports_errors_and_continues(self):
+        error_handler = MagicMock()
+        with patch.object(OctaveEngine, "_create_repl", return_value=MagicMock()):
+            eng = OctaveEngine(error_handler=error_handler, defer_startup=True)
+        eng._plot_settings = {"name": "Figure"}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for i in range(3):
+                with open(os.path.join(tmp_dir, f"Figure{i}.pdf"), "w") as f:
+                    f.write("placeholder" if i != 1 else "bad")
+            real_pdf = PDF
+
+            def fake_pdf(filename):
+                if filename.endswith("Figure1.pdf"):
+                    raise ValueError("unreadable")
+                return real_pdf(filename)
+
+            with patch("octave_kernel.kernel.PDF", side_effect=fake_pdf):
+                result = list(eng.iter_figures(tmp_dir, remove=True))
+            assert not os.path.exists(tmp_dir)
+        assert len(result) == 2
+        error_handler.assert_called_once()
+
     def test_removes_dir_when_remove_true(self, engine):
         engine.plot_settings = {"backend": "inline"}
         tmp_dir = tempfile.mkdtemp()
@@ -378,6 +1468,51 @@ class TestStartup:
         first_call_code = mock_eval.call_args_list[0][0][0]
         assert "source ~/.octaverc" not in first_call_code
 
+    def test_uses_single_round_trip(self, mock_engine):
+        mock_eval = self._run_startup(mock_engine)
+        assert mock_eval.call_count == 1
+
+    def test_plot_settings_commands_in_startup_command(self, mock_engine):
+        mock_engine._plot_settings = {"backend": "inline:gnuplot"}
+        mock_eval = self._run_startup(mock_engine)
+        assert "graphics_toolkit('gnuplot')" in mock_eval.call_args_list[0][0][0]
+
+    def test_prompt_change_is_last(self, mock_engine):
+        mock_engine.repl.prompt_change_cmd = "PS1('>>'); PS2('..')"
+        mock_eval = self._run_startup(mock_engine)
+        assert mock_eval.call_args_list[0][0][0].endswith("PS1('>>'); PS2('..')")
+
+    def test_failed_step_is_logged_with_step_name(self, mock_engine):
+        mock_engine.logger = MagicMock()
+        mock_eval = MagicMock(
+            return_value=f"{STARTUP_ERROR}addpath: permission denied\n"
+        )
+        with patch.object(mock_engine, "eval", mock_eval):
+            mock_engine._startup()
+        mock_engine.logger.warning.assert_called_once()
+        assert "addpath: permission denied" in mock_engine.logger.warning.call_args[0]
+
+    def test_failed_user_step_is_reported_to_error_handler(self, mock_engine):
+        mock_engine.logger = MagicMock()
+        mock_engine.error_handler = MagicMock()
+        mock_eval = MagicMock(
+            return_value=f"{STARTUP_ERROR}plot_settings: invalid toolkit\n"
+        )
+        with patch.object(mock_engine, "eval", mock_eval):
+            mock_engine._startup()
+        mock_engine.error_handler.assert_called_once()
+        assert "invalid toolkit" in mock_engine.error_handler.call_args[0][0]
+        mock_engine.logger.warning.assert_not_called()
+
+    def test_failed_internal_step_is_not_reported_to_error_handler(self, mock_engine):
+        mock_engine.logger = MagicMock()
+        mock_engine.error_handler = MagicMock()
+        mock_eval = MagicMock(return_value=f"{STARTUP_ERROR}more: failed\n")
+        with patch.object(mock_engine, "eval", mock_eval):
+            mock_engine._startup()
+        mock_engine.error_handler.assert_not_called()
+        mock_engine.logger.warning.assert_called_once()
+
 
 # ---------------------------------------------------------------------------
 # _handle_svg
@@ -393,6 +1528,21 @@ class TestHandleSvg:
         result = engine._handle_svg(str(svg_file))
         assert isinstance(result, SVG)
 
+    def test_returns_raw_svg_object(self, engine, tmp_path):
+        svg_file = tmp_path / "test.svg"
+        svg_file.write_text(_SVG_TEMPLATE.format(w=100, h=100))
+        result = engine._handle_svg(str(svg_file))
+        assert isinstance(result, RawSVG)
+        assert result.data is not None
+        assert result.data.startswith("<svg")
+
+    def test_does_not_parse_with_minidom(self, engine, tmp_path):
+        svg_file = tmp_path / "test.svg"
+        svg_file.write_text(_SVG_TEMPLATE.format(w=100, h=100))
+        with patch("xml.dom.minidom.parseString") as parse:
+            engine._handle_svg(str(svg_file))
+        parse.assert_not_called()
+
     def test_svg_data_contains_file_content(self, engine, tmp_path):
         svg_file = tmp_path / "test.svg"
         svg_file.write_text(_SVG_TEMPLATE.format(w=100, h=100))
@@ -478,6 +1628,50 @@ class TestFixSvgSize:
         assert isinstance(result, str)
         assert "<svg" in result
 
+    def test_drops_xml_prolog(self):
+        result = OctaveEngine._fix_svg_size(
+            self._make_self(), _SVG_TEMPLATE.format(w=10, h=10)
+        )
+        assert result.startswith("<svg")
+
+    def test_replaces_existing_width_and_height(self):
+        data = (
+            '<svg xmlns="http://www.w3.org/2000/svg" width="1in" '
+            "height='2in' viewBox=\"0 0 400 300\"></svg>"
+        )
+        result = OctaveEngine._fix_svg_size(self._make_self(), data)
+        assert "1in" not in result
+        assert "2in" not in result
+        assert 'width="400px" height="300px"' in result
+
+    def test_leaves_child_elements_untouched(self):
+        body = '<path stroke-width="2" width="5" d="M 0 0"/>'
+        data = (
+            '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 400 300">'
+            f"{body}</svg>"
+        )
+        result = OctaveEngine._fix_svg_size(self._make_self(), data)
+        assert body in result
+
+    def test_does_not_strip_stroke_width_on_root(self):
+        data = (
+            '<svg xmlns="http://www.w3.org/2000/svg" stroke-width="2" '
+            'viewBox="0 0 400 300"></svg>'
+        )
+        result = OctaveEngine._fix_svg_size(self._make_self(), data)
+        assert 'stroke-width="2"' in result
+
+    def test_handles_self_closing_root(self):
+        data = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 40 30"/>'
+        result = OctaveEngine._fix_svg_size(self._make_self(), data)
+        assert result.endswith('width="40px" height="30px"/>')
+
+    def test_raises_without_viewbox(self):
+        with pytest.raises(ValueError, match="viewBox"):
+            OctaveEngine._fix_svg_size(
+                self._make_self(), '<svg xmlns="http://www.w3.org/2000/svg"></svg>'
+            )
+
 
 # ---------------------------------------------------------------------------
 # _create_repl
@@ -540,6 +1734,22 @@ class TestCreateRepl:
         cmd = self._repl_cmd(mock_engine, OCTAVE_CLI_OPTIONS="--no-gui")
         assert "--no-gui" in cmd
 
+    def test_pipe_transport_creates_pipe_repl(self, mock_engine):
+        mock_engine.transport = "pipe"
+        with patch("octave_kernel.kernel.PipeREPL") as MockPipe:
+            repl = mock_engine._create_repl()
+        assert repl is MockPipe.return_value
+        cmd = MockPipe.call_args[0][0]
+        assert "--interactive" in cmd
+        assert MockPipe.call_args[0][1] == mock_engine.tmp_dir
+
+    def test_invalid_transport_raises(self):
+        with (
+            patch.object(OctaveEngine, "_create_repl", return_value=MagicMock()),
+            pytest.raises(ValueError, match="transport must be"),
+        ):
+            OctaveEngine(defer_startup=True, transport="socket")
+
     def test_appends_instance_cli_options(self, mock_engine):
         mock_engine.cli_options = "--no-gui"
         with patch.dict(os.environ, {}, clear=False):
@@ -665,6 +1875,141 @@ class TestValidateExecutable:
             mock_engine._validate_executable("/usr/bin/octave")
 
 
+# ---------------------------------------------------------------------------
+# Executable cache
+# ---------------------------------------------------------------------------
+
+
+class TestExecutableCache:
+    """Tests for the on-disk executable and version cache."""
+
+    @pytest.fixture(autouse=True)
+    def runtime_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("JUPYTER_RUNTIME_DIR", str(tmp_path))
+        return tmp_path
+
+    def _make_self(self, refresh_cache=False):
+        mock_self = MagicMock()
+        mock_self.cli_options = ""
+        mock_self.refresh_cache = refresh_cache
+        mock_self._validate_executable.return_value = "9.2.0"
+        return mock_self
+
+    def test_version_round_trip(self):
+        set_cached_version(sys.executable, "9.2.0")
+        assert get_cached_version(sys.executable) == "9.2.0"
+
+    def test_cli_options_are_part_of_key(self):
+        set_cached_version(sys.executable, "9.2.0", "--traditional")
+        assert get_cached_version(sys.executable) is None
+        assert get_cached_version(sys.executable, "--traditional") == "9.2.0"
+
+    def test_modified_executable_invalidates_entry(self, tmp_path):
+        exe = tmp_path / "octave"
+        exe.write_text("")
+        exe.chmod(0o755)
+        set_cached_version(str(exe), "9.2.0")
+        stat = exe.stat()
+        os.utime(exe, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert get_cached_version(str(exe)) is None
+
+    def test_unresolvable_executable_is_not_cached(self, runtime_dir):
+        set_cached_version("no-such-octave-binary", "9.2.0")
+        assert get_cached_version("no-such-octave-binary") is None
+
+    def test_corrupt_cache_file_is_ignored(self, runtime_dir):
+        (runtime_dir / "octave_kernel_cache.json").write_text("not json")
+        assert get_cached_version(sys.executable) is None
+        set_cached_version(sys.executable, "9.2.0")
+        assert get_cached_version(sys.executable) == "9.2.0"
+
+    def test_get_version_validates_on_miss(self):
+        mock_self = self._make_self()
+        assert OctaveEngine._get_version(mock_self, sys.executable) == "9.2.0"
+        mock_self._validate_executable.assert_called_once_with(sys.executable)
+        assert get_cached_version(sys.executable) == "9.2.0"
+
+    def test_get_version_skips_validation_on_hit(self):
+        set_cached_version(sys.executable, "8.4.0")
+        mock_self = self._make_self()
+        assert OctaveEngine._get_version(mock_self, sys.executable) == "8.4.0"
+        mock_self._validate_executable.assert_not_called()
+
+    def test_refresh_cache_forces_validation(self):
+        set_cached_version(sys.executable, "8.4.0")
+        mock_self = self._make_self(refresh_cache=True)
+        assert OctaveEngine._get_version(mock_self, sys.executable) == "9.2.0"
+        mock_self._validate_executable.assert_called_once()
+        assert get_cached_version(sys.executable) == "9.2.0"
+
+    def test_failed_write_leaves_no_temp_file(self, runtime_dir):
+        write_cache("key", object())
+        assert read_cache("key") is None
+        assert list(runtime_dir.iterdir()) == []
+
+    def _deploy_flatpak(self, tmp_path, commit):
+        deploy = tmp_path / "flatpak" / "app" / "org.octave.Octave" / "current"
+        (deploy / commit).mkdir(parents=True, exist_ok=True)
+        active = deploy / "active"
+        if active.is_symlink():
+            active.unlink()
+        active.symlink_to(commit)
+
+    def test_flatpak_lookup_is_cached(self, tmp_path):
+        self._deploy_flatpak(tmp_path, "abc123")
+        with (
+            patch.dict(os.environ, {"FLATPAK_USER_DIR": str(tmp_path / "flatpak")}),
+            patch(
+                "octave_kernel._utils.which",
+                side_effect=lambda name: sys.executable if name == "flatpak" else None,
+            ),
+            patch(
+                "octave_kernel._utils.subprocess.check_call", return_value=0
+            ) as mock_call,
+        ):
+            os.environ.pop("OCTAVE_EXECUTABLE", None)
+            first = get_octave_executable()
+            second = get_octave_executable()
+            third = get_octave_executable(refresh=True)
+        assert first == second == third == "flatpak run org.octave.Octave"
+        assert mock_call.call_count == 2
+
+    def test_flatpak_update_invalidates_lookup(self, tmp_path):
+        self._deploy_flatpak(tmp_path, "abc123")
+        with (
+            patch.dict(os.environ, {"FLATPAK_USER_DIR": str(tmp_path / "flatpak")}),
+            patch(
+                "octave_kernel._utils.which",
+                side_effect=lambda name: sys.executable if name == "flatpak" else None,
+            ),
+            patch(
+                "octave_kernel._utils.subprocess.check_call", return_value=0
+            ) as mock_call,
+        ):
+            os.environ.pop("OCTAVE_EXECUTABLE", None)
+            get_octave_executable()
+            self._deploy_flatpak(tmp_path, "def456")
+            get_octave_executable()
+        assert mock_call.call_count == 2
+
+    def test_flatpak_lookup_is_not_taken_for_a_version(self, tmp_path):
+        self._deploy_flatpak(tmp_path, "abc123")
+        with (
+            patch.dict(os.environ, {"FLATPAK_USER_DIR": str(tmp_path / "flatpak")}),
+            patch(
+                "octave_kernel._utils.which",
+                side_effect=lambda name: sys.executable if name == "flatpak" else None,
+            ),
+            patch("octave_kernel._utils.subprocess.check_call", return_value=0),
+        ):
+            os.environ.pop("OCTAVE_EXECUTABLE", None)
+            executable = get_octave_executable()
+            assert get_cached_version(executable) is None
+            set_cached_version(executable, "9.2.0")
+            assert get_cached_version(executable) == "9.2.0"
+            assert get_octave_executable() == executable
+
+
 # ---------------------------------------------------------------------------
 # _interrupt
 # ---------------------------------------------------------------------------
@@ -868,6 +2213,15 @@ class TestCleanup:
         mock_engine._cleanup()  # must not raise
         mock_engine.logger.debug.assert_called()
 
+    def test_removes_temp_dir_and_exit_handlers(self, mock_engine):
+        with patch("atexit.unregister") as mock_unregister:
+            mock_engine._cleanup()
+        assert not os.path.exists(mock_engine.tmp_dir)
+        unregistered = [call.args[0] for call in mock_unregister.call_args_list]
+        assert mock_engine._cleanup in unregistered
+        assert mock_engine.repl.terminate in unregistered
+        assert not mock_engine._exit_handlers
+
     def test_removes_octave_workspace_file(self, mock_engine):
         workspace = os.path.join(os.getcwd(), "octave-workspace")
         open(workspace, "w").close()
@@ -1009,3 +2363,213 @@ class TestInputInLoop:
             f"{iterations}.  input() in a for-loop did not prompt on every "
             "iteration (issue #179)."
         )
+
+
+# ---------------------------------------------------------------------------
+# OctaveEnginePool
+# ---------------------------------------------------------------------------
+
+
+def _fake_engine(**kwargs):
+    """A stand-in engine that answers every eval with the ping marker."""
+    engine = MagicMock()
+    engine.eval.return_value = PING_MARKER
+    return engine
+
+
+@pytest.fixture
+def make_pool():
+    """Create OctaveEnginePools of fake engines, closing them afterwards."""
+    pools = []
+
+    def make(**kwargs):
+        pool = OctaveEnginePool(**kwargs)
+        pools.append(pool)
+        return pool
+
+    with patch("octave_kernel._pool.OctaveEngine", side_effect=_fake_engine) as cls:
+        make.engine_class = cls  # type: ignore[attr-defined]
+        yield make
+    for pool in pools:
+        pool.close()
+
+
+class TestOctaveEnginePool:
+    """Tests for OctaveEnginePool."""
+
+    def test_prestarts_engines(self, make_pool):
+        pool = make_pool(size=3)
+        engines = {pool.checkout(timeout=5) for _ in range(3)}
+        assert len(engines) == 3
+        assert make_pool.engine_class.call_count == 3
+
+    def test_passes_engine_kwargs(self, make_pool):
+        pool = make_pool(size=1, transport="pipe")
+        pool.checkout(timeout=5)
+        make_pool.engine_class.assert_called_once_with(transport="pipe")
+
+    def test_invalid_size_raises(self, make_pool):
+        with pytest.raises(ValueError, match="at least 1"):
+            make_pool(size=0)
+
+    def test_checkout_pings_engine(self, make_pool):
+        engine = make_pool(size=1).checkout(timeout=5)
+        assert PING_MARKER in engine.eval.call_args[0][0]
+
+    def test_ping_can_be_disabled(self, make_pool):
+        engine = make_pool(size=1, ping=False).checkout(timeout=5)
+        engine.eval.assert_not_called()
+
+    def test_checkin_resets_workspace(self, make_pool):
+        pool = make_pool(size=1)
+        engine = pool.checkout(timeout=5)
+        pool.checkin(engine)
+        cmd = engine.eval.call_args[0][0]
+        assert cmd.startswith("clear all; close all; ")
+        assert f'cd("{os.getcwd()}")' in cmd
+        assert pool.checkout(timeout=5) is engine
+
+    def test_checkout_times_out(self, make_pool):
+        pool = make_pool(size=1)
+        pool.checkout(timeout=5)
+        with pytest.raises(TimeoutError):
+            pool.checkout(timeout=0.1)
+
+    def test_waiting_checkout_gets_checked_in_engine(self, make_pool):
+        pool = make_pool(size=1)
+        engine = pool.checkout(timeout=5)
+        timer = threading.Timer(0.1, pool.checkin, args=(engine,))
+        timer.start()
+        try:
+            assert pool.checkout(timeout=5) is engine
+        finally:
+            timer.join()
+
+    def test_failed_ping_replaces_engine(self, make_pool):
+        pool = make_pool(size=1)
+        engine = pool.checkout(timeout=5)
+        pool.checkin(engine)
+        engine.eval.side_effect = EOF("Octave has exited")
+        new_engine = pool.checkout(timeout=5)
+        assert new_engine is not engine
+        engine._cleanup.assert_called_once()
+        assert pool.stats().recycled == 1
+
+    def test_recycled_engine_removes_its_dirs(self, tmp_path):
+        repl = MagicMock()
+        repl.run_command.return_value = PING_MARKER
+        with (
+            patch.object(OctaveEngine, "_create_repl", return_value=repl),
+            patch("octave_kernel.kernel.SHM_DIR", str(tmp_path)),
+        ):
+            pool = OctaveEnginePool(size=1, max_uses=1, defer_startup=True)
+            try:
+                engine = pool.checkout(timeout=5)
+                dirs = [engine.tmp_dir, engine._plot_tmp_dir]
+                assert all(os.path.isdir(path) for path in dirs)
+                pool.checkin(engine)
+                # Wait for the replacement, so it starts while patched.
+                assert pool.checkout(timeout=5) is not engine
+            finally:
+                pool.close()
+        assert pool.stats().recycled == 1
+        assert not any(os.path.exists(path) for path in dirs)
+
+    def test_failed_reset_replaces_engine(self, make_pool):
+        pool = make_pool(size=1)
+        engine = pool.checkout(timeout=5)
+        engine.eval.return_value = "error: oops"
+        pool.checkin(engine)
+        assert pool.checkout(timeout=5) is not engine
+        engine._cleanup.assert_called_once()
+
+    def test_max_uses_replaces_engine(self, make_pool):
+        pool = make_pool(size=1, max_uses=2)
+        engine = pool.checkout(timeout=5)
+        pool.checkin(engine)
+        assert pool.checkout(timeout=5) is engine
+        pool.checkin(engine)
+        assert pool.checkout(timeout=5) is not engine
+        assert pool.stats().started == 2
+
+    def test_max_rss_replaces_engine(self, make_pool):
+        pool = make_pool(size=1, max_rss=1000)
+        engine = pool.checkout(timeout=5)
+        with patch("octave_kernel._pool._get_rss", return_value=2000) as get_rss:
+            pool.checkin(engine)
+        get_rss.assert_called_once_with(engine.repl.child.pid)
+        assert pool.checkout(timeout=5) is not engine
+
+    def test_rss_under_limit_keeps_engine(self, make_pool):
+        pool = make_pool(size=1, max_rss=1000)
+        engine = pool.checkout(timeout=5)
+        with patch("octave_kernel._pool._get_rss", return_value=500):
+            pool.checkin(engine)
+        assert pool.checkout(timeout=5) is engine
+
+    def test_checkin_unknown_engine_raises(self, make_pool):
+        pool = make_pool(size=1)
+        with pytest.raises(ValueError, match="not checked out"):
+            pool.checkin(MagicMock())
+
+    def test_startup_failure_raises(self, make_pool):
+        make_pool.engine_class.side_effect = OSError("no octave")
+        pool = make_pool(size=2)
+        with pytest.raises(RuntimeError, match="Could not start"):
+            pool.checkout(timeout=5)
+
+    def test_close_stops_idle_engines(self, make_pool):
+        pool = make_pool(size=1)
+        engine = pool.checkout(timeout=5)
+        pool.checkin(engine)
+        pool.close()
+        engine._cleanup.assert_called_once()
+        with pytest.raises(RuntimeError, match="closed"):
+            pool.checkout(timeout=5)
+
+    def test_checkin_after_close_stops_engine(self, make_pool):
+        pool = make_pool(size=1)
+        engine = pool.checkout(timeout=5)
+        pool.close()
+        pool.checkin(engine)
+        engine._cleanup.assert_called_once()
+        assert pool.stats() == PoolStats(0, 0, 0, 1, 0)
+
+    def test_engine_context_manager(self, make_pool):
+        pool = make_pool(size=1)
+        with pool.engine(timeout=5) as engine:
+            assert pool.stats().busy == 1
+        assert pool.stats().idle == 1
+        assert "clear all" in engine.eval.call_args[0][0]
+
+    def test_async_checkout_and_checkin(self, make_pool):
+        pool = make_pool(size=1)
+
+        async def run():
+            async with pool.engine_async(timeout=5) as engine:
+                assert pool.stats().busy == 1
+            return engine
+
+        engine = asyncio.run(run())
+        assert pool.checkout(timeout=5) is engine
+
+    def test_cancelled_async_checkout_returns_engine(self, make_pool):
+        pool = make_pool(size=1)
+        engine = pool.checkout(timeout=5)
+
+        async def run():
+            task = asyncio.create_task(pool.checkout_async(timeout=5))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            # The cancelled checkout takes this engine, then checks it in.
+            await pool.checkin_async(engine)
+            return await pool.checkout_async(timeout=5)
+
+        assert asyncio.run(run()) is engine
+        assert pool.stats().busy == 1
+
+    def test_get_rss_of_own_process(self):
+        rss = _get_rss(os.getpid())
+        assert rss is None or rss > 0
@@ -5,18 +5,33 @@ from __future__ import annotations
 import base64
 import json
 import logging
+import os
 import sys
+import threading
+from concurrent.futures import Future
 from typing import Any
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 from metakernel import ProcessMetaKernel
 
+from octave_kernel import _completion
+from octave_kernel._completion import (
+    NAMES_CMD,
+    WORKSPACE_CMD,
+    CompletionIndex,
+    PrefixTrie,
+)
+from octave_kernel._help import HELP_PATH, CacheInfo, HelpCache, LRUCache
+from octave_kernel._output import OutputCoalescer, OutputLimit
 from octave_kernel._version import __version__
 from octave_kernel.kernel import (
+    FIGURE_COUNT,
+    FIGURE_COUNT_CMD,
     HELP_LINKS,
     PDF,
     STDIN_PROMPT,
+    EvalResult,
     OctaveKernel,
     get_kernel_json,
 )
@@ -32,6 +47,14 @@ _DEFAULT_PLOT_SETTINGS: dict[str, Any] = {
 }
 
 
+def _eval_each(engine: MagicMock) -> None:
+    """Make a mock engine's eval_many call its eval once per statement."""
+    engine.eval_many.side_effect = lambda statements, **kwargs: [
+        EvalResult(engine.eval(statement, silent=True), None)
+        for statement in statements
+    ]
+
+
 @pytest.fixture
 def kernel():
     """OctaveKernel with mocked dependencies, bypassing Jupyter infrastructure.
@@ -53,6 +76,7 @@ def kernel():
     # Kernel state
     k._octave_engine = MagicMock()
     k._octave_engine.version = "9.1.0"
+    _eval_each(k._octave_engine)
     k.log = logging.getLogger(__name__)
     k.Error = MagicMock()  # type: ignore[method-assign]
     k.Display = MagicMock()  # type: ignore[method-assign]
@@ -177,6 +201,156 @@ class TestOctaveEngineProperty:
         assert MockEngine.call_args.kwargs["executable"] == "octave"
 
 
+# ---------------------------------------------------------------------------
+# Background startup
+# ---------------------------------------------------------------------------
+
+
+class TestBackgroundStartup:
+    """Tests for starting the Octave engine on a background thread."""
+
+    def test_octave_engine_waits_on_startup_future(self, kernel):
+        kernel._octave_engine = None
+        engine = MagicMock()
+        future: Future[Any] = Future()
+        future.set_result(engine)
+        kernel._engine_future = future
+        assert kernel.octave_engine is engine
+        assert kernel._engine_future is None
+
+    def test_startup_failure_is_raised_on_first_use(self, kernel):
+        kernel._octave_engine = None
+        future: Future[Any] = Future()
+        future.set_exception(OSError("octave not found"))
+        kernel._engine_future = future
+        with pytest.raises(OSError, match="octave not found"):
+            _ = kernel.octave_engine
+
+    def test_start_engine_runs_startup_off_thread(self, kernel):
+        threads = []
+        engine = MagicMock()
+        engine._startup.side_effect = lambda: threads.append(threading.current_thread())
+        with patch.object(OctaveKernel, "_make_engine", return_value=engine):
+            future = kernel._start_engine()
+            assert future.result(timeout=10) is engine
+        assert threads
+        assert threads[0] is not threading.current_thread()
+
+    def test_startup_errors_are_reported_on_first_use(self, kernel):
+        kernel._octave_engine = None
+        engine = MagicMock()
+        engine.plot_settings = _DEFAULT_PLOT_SETTINGS.copy()
+        engine._startup.side_effect = lambda: engine.error_handler("bad toolkit")
+        with (
+            patch.object(OctaveKernel, "_make_engine", return_value=engine),
+            patch.object(kernel, "Error") as mock_error,
+        ):
+            kernel._engine_future = kernel._start_engine()
+            kernel._engine_future.result(timeout=10)
+            mock_error.assert_not_called()
+            assert kernel.octave_engine is engine
+        mock_error.assert_called_once_with("bad toolkit")
+        assert engine.error_handler is mock_error
+
+    def test_start_engine_captures_exception(self, kernel):
+        with patch.object(
+            OctaveKernel, "_make_engine", side_effect=OSError("no octave")
+        ):
+            future = kernel._start_engine()
+            with pytest.raises(OSError, match="no octave"):
+                future.result(timeout=10)
+
+    def test_language_version_uses_cached_version(self, kernel):
+        kernel._octave_engine = None
+        kernel._language_version = "9.2.0"
+        kernel._engine_future = Future()
+        assert kernel.language_version == "9.2.0"
+        assert kernel._engine_future is not None
+
+    def test_engine_version_preferred_once_started(self, kernel):
+        kernel._language_version = "8.4.0"
+        assert kernel.language_version == "9.1.0"
+
+
+# ---------------------------------------------------------------------------
+# Hot spare
+# ---------------------------------------------------------------------------
+
+
+class TestHotSpare:
+    """Tests for the hot-spare engine used on exit and restart."""
+
+    def test_swap_cleans_up_current_engine(self, kernel):
+        engine = kernel._octave_engine
+        kernel._swap_engine()
+        engine._cleanup.assert_called_once()
+        assert kernel._octave_engine is None
+
+    def test_swap_promotes_spare(self, kernel):
+        spare: Future[Any] = Future()
+        kernel._spare_future = spare
+        with patch.object(OctaveKernel, "_start_engine") as mock_start:
+            kernel._swap_engine()
+        assert kernel._engine_future is spare
+        mock_start.assert_not_called()
+
+    def test_swap_refills_spare_when_enabled(self, kernel):
+        kernel._trait_values["hot_spare"] = True
+        spare: Future[Any] = Future()
+        refill: Future[Any] = Future()
+        kernel._spare_future = spare
+        with patch.object(OctaveKernel, "_start_engine", return_value=refill):
+            kernel._swap_engine()
+        assert kernel._engine_future is spare
+        assert kernel._spare_future is refill
+
+    def test_no_spare_when_disabled(self, kernel):
+        with patch.object(OctaveKernel, "_start_engine") as mock_start:
+            kernel._swap_engine()
+        mock_start.assert_not_called()
+        assert kernel._spare_future is None
+
+    def test_exit_uses_spare(self, kernel):
+        engine = MagicMock()
+        engine.plot_settings = _DEFAULT_PLOT_SETTINGS.copy()
+        spare: Future[Any] = Future()
+        spare.set_result(engine)
+        kernel._spare_future = spare
+        kernel.do_execute_direct("exit")
+        assert kernel.octave_engine is engine
+
+    def test_restart_kernel_swaps_wrapper(self, kernel):
+        old = kernel._octave_engine
+        engine = MagicMock()
+        engine.plot_settings = _DEFAULT_PLOT_SETTINGS.copy()
+        spare: Future[Any] = Future()
+        spare.set_result(engine)
+        kernel._spare_future = spare
+        kernel.restart_kernel()
+        old._cleanup.assert_called_once()
+        assert kernel.wrapper is engine.repl
+
+    def test_stale_spare_gets_current_plot_settings(self, kernel):
+        engine = MagicMock()
+        engine.plot_settings = {"backend": "inline", "format": "png"}
+        future: Future[Any] = Future()
+        future.set_result(engine)
+        kernel._octave_engine = None
+        kernel._engine_future = future
+        kernel._trait_values["plot_settings"] = {"backend": "inline", "format": "svg"}
+        assert kernel.octave_engine.plot_settings["format"] == "svg"
+
+    def test_pending_engine_is_cleaned_up_when_discarded(self, kernel):
+        engine = MagicMock()
+        future: Future[Any] = Future()
+        kernel._octave_engine = None
+        kernel._engine_future = future
+        kernel._swap_engine()
+        engine._cleanup.assert_not_called()
+        future.set_result(engine)
+        engine._cleanup.assert_called_once()
+
+
 # ---------------------------------------------------------------------------
 # makeWrapper
 # ---------------------------------------------------------------------------
@@ -254,18 +428,18 @@ class TestDoExecuteDirect:
         kernel._octave_engine._has_startup = True
         images = [MagicMock(), MagicMock(), MagicMock()]
         kernel._octave_engine.make_figures.return_value = "/tmp/plots"
-        kernel._octave_engine.extract_figures.return_value = images
+        kernel._octave_engine.iter_figures.return_value = iter(images)
         with patch.object(ProcessMetaKernel, "do_execute_direct", return_value=None):
             kernel.do_execute_direct("plot(1)")
         assert kernel.Display.call_count == 3
 
-    def test_extract_figures_called_with_plot_dir(self, kernel):
+    def test_iter_figures_called_with_plot_dir(self, kernel):
         kernel._octave_engine._has_startup = True
         kernel._octave_engine.make_figures.return_value = "/tmp/figs"
-        kernel._octave_engine.extract_figures.return_value = []
+        kernel._octave_engine.iter_figures.return_value = iter([])
         with patch.object(ProcessMetaKernel, "do_execute_direct", return_value=None):
             kernel.do_execute_direct("plot(1)")
-        kernel._octave_engine.extract_figures.assert_called_once_with("/tmp/figs", True)
+        kernel._octave_engine.iter_figures.assert_called_once_with("/tmp/figs", True)
 
     def test_no_display_when_no_plot_dir(self, kernel):
         kernel._octave_engine._has_startup = True
@@ -282,6 +456,137 @@ class TestDoExecuteDirect:
         kernel.Error.assert_called_once()
 
 
+# ---------------------------------------------------------------------------
+# Cell timings
+# ---------------------------------------------------------------------------
+
+
+class TestCellTimings:
+    """Tests for the per-cell timings in the execute_reply metadata."""
+
+    def _run(self, kernel, code="x = 1"):
+        kernel._octave_engine.plot_settings = {"backend": "inline"}
+        kernel._octave_engine.make_figures.return_value = None
+        kernel._octave_engine.reset_timings.return_value = {"eval_calls": 2}
+
+        def fake_execute(self, code, silent=False):
+            self.Write("x = 1\n")
+            self.Write(f"{FIGURE_COUNT}0")
+
+        with (
+            patch.object(ProcessMetaKernel, "do_execute_direct", fake_execute),
+            patch.object(ProcessMetaKernel, "Write"),
+        ):
+            kernel.do_execute_direct(code)
+
+    def _finish(self, kernel, msg_type="execute_request"):
+        parent = {"header": {"msg_type": msg_type}}
+        return kernel.finish_metadata(parent, {}, {})
+
+    def test_metadata_includes_timings(self, kernel):
+        self._run(kernel)
+        timings = self._finish(kernel)["octave_kernel"]["timings"]
+        assert timings["total_seconds"] >= timings["execute_seconds"] >= 0
+        assert timings["eval_calls"] == 2
+        assert timings["execute_bytes_received"] == len("x = 1\n") + len(
+            f"{FIGURE_COUNT}0"
+        )
+        assert timings["execute_bytes_sent"] == len(f"x = 1\n{FIGURE_COUNT_CMD}")
+
+    def test_timings_are_attached_once(self, kernel):
+        self._run(kernel)
+        self._finish(kernel)
+        assert "octave_kernel" not in self._finish(kernel)
+
+    def test_other_replies_are_untouched(self, kernel):
+        self._run(kernel)
+        assert "octave_kernel" not in self._finish(kernel, "inspect_request")
+
+    def test_timings_are_logged(self, kernel, caplog):
+        with caplog.at_level(logging.DEBUG):
+            self._run(kernel)
+        assert "Octave cell timings" in caplog.text
+
+    def test_quit_still_records_total(self, kernel):
+        kernel.do_execute_direct("quit")
+        timings = self._finish(kernel)["octave_kernel"]["timings"]
+        assert "total_seconds" in timings
+        assert "execute_seconds" not in timings
+
+    def test_output_outside_a_cell_is_not_counted(self, kernel):
+        with patch.object(ProcessMetaKernel, "Write"):
+            kernel.Write("late output")
+        assert kernel._timings is None
+
+
+# ---------------------------------------------------------------------------
+# Figure count marker
+# ---------------------------------------------------------------------------
+
+
+class TestFigureCount:
+    """Tests for skipping the figure round trip when there are no figures."""
+
+    def _execute(self, kernel, code, silent=False, count=None):
+        """Run do_execute_direct, emitting a figure count like Octave would."""
+        sent: list[str] = []
+
+        def fake_execute(self, code, silent=False):
+            sent.append(code)
+            if count is not None:
+                self.Write(f"{FIGURE_COUNT}{count}")
+
+        kernel._octave_engine._has_startup = True
+        kernel._octave_engine.plot_settings = _DEFAULT_PLOT_SETTINGS.copy()
+        kernel._octave_engine.make_figures.return_value = None
+        with (
+            patch.object(ProcessMetaKernel, "do_execute_direct", fake_execute),
+            patch.object(ProcessMetaKernel, "Write"),
+        ):
+            kernel.do_execute_direct(code, silent=silent)
+        return sent[0]
+
+    def test_appends_figure_count_command(self, kernel):
+        sent = self._execute(kernel, "x = 1")
+        assert sent == f"x = 1\n{FIGURE_COUNT_CMD}"
+
+    def test_silent_does_not_append_command(self, kernel):
+        assert self._execute(kernel, "x = 1", silent=True) == "x = 1"
+
+    def test_non_inline_backend_does_not_append_command(self, kernel):
+        kernel._octave_engine._has_startup = True
+        kernel._octave_engine.plot_settings = {"backend": "qt"}
+        with patch.object(
+            ProcessMetaKernel, "do_execute_direct", return_value=None
+        ) as mock_exec:
+            kernel.do_execute_direct("x = 1")
+        assert mock_exec.call_args[0][1] == "x = 1"
+
+    def test_no_figures_skips_make_figures(self, kernel):
+        self._execute(kernel, "x = 1", count=0)
+        kernel._octave_engine.make_figures.assert_not_called()
+
+    def test_figures_call_make_figures(self, kernel):
+        self._execute(kernel, "plot(1)", count=2)
+        kernel._octave_engine.make_figures.assert_called_once()
+
+    def test_unknown_count_calls_make_figures(self, kernel):
+        self._execute(kernel, "plot(1)")
+        kernel._octave_engine.make_figures.assert_called_once()
+
+    def test_write_strips_marker(self, kernel):
+        with patch.object(ProcessMetaKernel, "Write") as mock_write:
+            kernel.Write(f"ans = 1\r\n{FIGURE_COUNT}3")
+        mock_write.assert_called_once_with("ans = 1\r\n")
+        assert kernel._figure_count == 3
+
+    def test_write_drops_bare_marker(self, kernel):
+        with patch.object(ProcessMetaKernel, "Write") as mock_write:
+            kernel.Write(f"{FIGURE_COUNT}0")
+        mock_write.assert_not_called()
+        assert kernel._figure_count == 0
+
+
 # ---------------------------------------------------------------------------
 # get_kernel_help_on
 # ---------------------------------------------------------------------------
@@ -315,7 +620,113 @@ class TestGetKernelHelpOn:
     def test_valid_obj_calls_eval_with_help_command(self, kernel):
         kernel._octave_engine.eval.return_value = ""
         kernel.get_kernel_help_on({"help_obj": "zeros"})
-        kernel._octave_engine.eval.assert_called_once_with("help zeros", silent=True)
+        kernel._octave_engine.eval.assert_called_once()
+        assert "help zeros" in kernel._octave_engine.eval.call_args[0][0]
+
+    def test_repeated_builtin_help_is_cached(self, kernel):
+        kernel._octave_engine.eval.return_value = f"{HELP_PATH}\nzeros help"
+        assert kernel.get_kernel_help_on({"help_obj": "zeros"}) == "zeros help"
+        assert kernel.get_kernel_help_on({"help_obj": "zeros"}) == "zeros help"
+        kernel._octave_engine.eval.assert_called_once()
+        assert kernel.help_cache_info().hits == 1
+
+    def test_path_change_clears_cache(self, kernel):
+        kernel._octave_engine.plot_settings = {"backend": "disabled"}
+        kernel._octave_engine.eval.return_value = f"{HELP_PATH}\nzeros help"
+        kernel.get_kernel_help_on({"help_obj": "zeros"})
+        with patch.object(ProcessMetaKernel, "do_execute_direct"):
+            kernel.do_execute_direct("addpath('mydir');")
+        kernel.get_kernel_help_on({"help_obj": "zeros"})
+        assert kernel._octave_engine.eval.call_count == 2
+
+    def test_other_cells_keep_cache(self, kernel):
+        kernel._octave_engine.plot_settings = {"backend": "disabled"}
+        kernel._octave_engine.eval.return_value = f"{HELP_PATH}\nzeros help"
+        kernel.get_kernel_help_on({"help_obj": "zeros"})
+        with patch.object(ProcessMetaKernel, "do_execute_direct"):
+            kernel.do_execute_direct("x = 1;")
+        kernel.get_kernel_help_on({"help_obj": "zeros"})
+        assert kernel._octave_engine.eval.call_count == 1
+
+
+class TestLRUCache:
+    """Tests for LRUCache."""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_counts_hits_and_misses(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("z")
+        assert cache.cache_info() == CacheInfo(hits=1, misses=1, maxsize=2, currsize=1)
+
+    def test_zero_maxsize_stores_nothing(self):
+        cache = LRUCache(0)
+        cache.put("a", 1)
+        assert len(cache) == 0
+
+
+class TestHelpCache:
+    """Tests for HelpCache."""
+
+    def _engine(self, resp):
+        engine = MagicMock()
+        engine.eval.return_value = resp
+        return engine
+
+    def test_strips_path_marker_from_help(self):
+        engine = self._engine(f"{HELP_PATH}\nsome help")
+        assert HelpCache().get_help(engine, "sin") == "some help"
+
+    def test_asks_which_and_help_in_one_call(self):
+        engine = self._engine(f"{HELP_PATH}\nsome help")
+        HelpCache().get_help(engine, "sin")
+        cmd = engine.eval.call_args[0][0]
+        assert 'which("sin")' in cmd
+        assert "help sin" in cmd
+
+    def test_file_entry_reused_while_unchanged(self, tmp_path):
+        mfile = tmp_path / "myfunc.m"
+        mfile.write_text("function myfunc\nend\n")
+        engine = self._engine(f"{HELP_PATH}{mfile}\nmy help")
+        cache = HelpCache()
+        cache.get_help(engine, "myfunc")
+        assert cache.get_help(engine, "myfunc") == "my help"
+        assert engine.eval.call_count == 1
+
+    def test_file_entry_refreshed_when_modified(self, tmp_path):
+        mfile = tmp_path / "myfunc.m"
+        mfile.write_text("function myfunc\nend\n")
+        engine = self._engine(f"{HELP_PATH}{mfile}\nmy help")
+        cache = HelpCache()
+        cache.get_help(engine, "myfunc")
+        stat = mfile.stat()
+        os.utime(mfile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        cache.get_help(engine, "myfunc")
+        assert engine.eval.call_count == 2
+
+    def test_errors_are_not_cached(self):
+        engine = self._engine(f"{HELP_PATH}\nerror: help: 'nope' not found")
+        cache = HelpCache()
+        cache.get_help(engine, "nope")
+        cache.get_help(engine, "nope")
+        assert engine.eval.call_count == 2
+
+    def test_non_identifier_is_not_cached(self):
+        engine = self._engine("help text")
+        cache = HelpCache()
+        cache.get_help(engine, "+")
+        engine.eval.assert_called_once_with("help +", silent=True)
+        assert cache.cache_info().currsize == 0
 
 
 # ---------------------------------------------------------------------------
@@ -452,6 +863,170 @@ class TestRawInput:
         assert any("1" in str(s) for s in printed)
 
 
+# ---------------------------------------------------------------------------
+# Coalesced output
+# ---------------------------------------------------------------------------
+
+
+class TestOutputCoalescer:
+    """Tests for batching stream output."""
+
+    def test_chunks_are_sent_together(self):
+        sent: list[str] = []
+        output = OutputCoalescer(sent.append, interval=60)
+        for i in range(3):
+            output.write(f"{i}\n")
+        assert sent == []
+        output.flush()
+        assert sent == ["0\n1\n2\n"]
+        assert output.messages == 1
+
+    def test_full_buffer_is_sent_at_once(self):
+        sent: list[str] = []
+        output = OutputCoalescer(sent.append, interval=60, max_bytes=4)
+        output.write("ab")
+        output.write("cd")
+        output.write("e")
+        assert sent == ["abcd"]
+        output.flush()
+        assert sent == ["abcd", "e"]
+
+    def test_output_is_sent_after_interval(self):
+        sent = threading.Event()
+        output = OutputCoalescer(lambda text: sent.set(), interval=0.01)
+        output.write("x")
+        assert sent.wait(5)
+        assert output.messages == 1
+
+    def test_empty_flush_sends_nothing(self):
+        sink = MagicMock()
+        output = OutputCoalescer(sink)
+        output.write("")
+        output.flush()
+        sink.assert_not_called()
+        assert output.messages == 0
+
+
+class TestOutputLimit:
+    """Tests for capping the output of a cell."""
+
+    def test_output_within_limit_is_kept(self, tmp_path):
+        limit = OutputLimit(str(tmp_path), max_bytes=10, max_lines=2)
+        assert limit.write("a\n") == "a\n"
+        assert limit.write("b\n") == "b\n"
+        assert limit.close() is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_bytes_over_limit_are_written_to_file(self, tmp_path):
+        limit = OutputLimit(str(tmp_path), max_bytes=5)
+        assert limit.write("abc") == "abc"
+        assert limit.write("defg") == "de"
+        assert limit.write("hi") == ""
+        note = limit.close()
+        assert note is not None
+        (path,) = tmp_path.iterdir()
+        assert str(path) in note
+        assert "4 bytes" in note
+        assert path.read_text() == "fghi"
+
+    def test_lines_over_limit_are_written_to_file(self, tmp_path):
+        limit = OutputLimit(str(tmp_path), max_lines=2)
+        assert limit.write("a\nb\nc\n") == "a\nb\n"
+        limit.close()
+        (path,) = tmp_path.iterdir()
+        assert path.read_text() == "c\n"
+
+    def test_multibyte_characters_are_not_split(self, tmp_path):
+        limit = OutputLimit(str(tmp_path), max_bytes=2)
+        assert limit.write("d\u00e9f") == "d"
+        limit.close()
+        (path,) = tmp_path.iterdir()
+        assert path.read_text(encoding="utf-8") == "\u00e9f"
+
+
+class TestCoalescedOutput:
+    """Tests for coalescing the output of a cell."""
+
+    def _run(self, kernel, lines, **traits):
+        kernel._trait_values.update(traits)
+        kernel._octave_engine._has_startup = True
+        kernel._octave_engine.plot_settings = {"backend": "qt"}
+        kernel._octave_engine.reset_timings.return_value = {}
+
+        def fake_execute(self, code, silent=False):
+            for line in lines:
+                self.Write(line)
+
+        with (
+            patch.object(ProcessMetaKernel, "do_execute_direct", fake_execute),
+            patch.object(ProcessMetaKernel, "Write") as mock_write,
+        ):
+            kernel.do_execute_direct("x")
+        return mock_write
+
+    def test_cell_output_is_coalesced(self, kernel):
+        lines = [f"{i}\n" for i in range(1000)]
+        mock_write = self._run(kernel, lines, output_interval=60.0)
+        mock_write.assert_called_once_with("".join(lines))
+        assert kernel._cell_timings["output_messages"] == 1
+        assert kernel._output is None
+
+    def test_zero_interval_disables_coalescing(self, kernel):
+        mock_write = self._run(kernel, ["a\n", "b\n"], output_interval=0.0)
+        assert mock_write.call_args_list == [call("a\n"), call("b\n")]
+
+    def test_output_over_limit_is_summarized(self, kernel, tmp_path):
+        kernel._octave_engine.tmp_dir = str(tmp_path)
+        lines = [f"{i}\n" for i in range(10)]
+        mock_write = self._run(kernel, lines, output_interval=0.0, output_limit_lines=3)
+        written = [c.args[0] for c in mock_write.call_args_list]
+        assert written[:3] == lines[:3]
+        assert "Output limit reached" in written[-1]
+        (path,) = tmp_path.iterdir()
+        assert path.read_text() == "".join(lines[3:])
+        assert kernel._output_limit is None
+
+    def test_output_is_not_limited_by_default(self, kernel, tmp_path):
+        kernel._octave_engine.tmp_dir = str(tmp_path)
+        lines = ["x" * 100_000 + "\n"] * 20
+        mock_write = self._run(kernel, lines, output_interval=0.0)
+        assert [c.args[0] for c in mock_write.call_args_list] == lines
+        assert list(tmp_path.iterdir()) == []
+
+    def test_other_messages_are_sent_after_output(self, kernel):
+        sent: list[str] = []
+        kernel._output = OutputCoalescer(sent.append, interval=60)
+        kernel.Write("before\n")
+
+        def capture(self, stream, msg_type, *args, **kwargs):
+            sent.append(msg_type)
+
+        with patch.object(ProcessMetaKernel, "send_response", capture):
+            kernel.send_response(None, "display_data", {})
+        assert sent == ["before\n", "display_data"]
+
+    def test_print_is_coalesced_with_write(self, kernel):
+        sent: list[str] = []
+        kernel._output = OutputCoalescer(sent.append, interval=60)
+        kernel.Write("a\n")
+        kernel.Print("b", "c")
+        kernel._output.flush()
+        assert sent == ["a\nb c\n"]
+
+    def test_output_is_sent_before_input_request(self, kernel):
+        sent: list[str] = []
+        kernel._output = OutputCoalescer(sent.append, interval=60)
+        kernel.Write("1\n")
+
+        def capture(self, text):
+            sent.append(f"input:{text}")
+            return "x"
+
+        with patch.object(ProcessMetaKernel, "raw_input", capture):
+            kernel.raw_input("Enter: ")
+        assert sent == ["1\n", "input:Enter: "]
+
+
 # ---------------------------------------------------------------------------
 # get_completions
 # ---------------------------------------------------------------------------
@@ -460,6 +1035,11 @@ class TestRawInput:
 class TestGetCompletions:
     """Tests for OctaveKernel.get_completions()."""
 
+    @pytest.fixture(autouse=True)
+    def _clear_names(self):
+        with patch.dict(_completion._names_by_version, clear=True):
+            yield
+
     def test_returns_list(self, kernel):
         kernel._octave_engine.eval.return_value = "foo\nbar"
         assert isinstance(kernel.get_completions({"obj": "f"}), list)
@@ -472,13 +1052,148 @@ class TestGetCompletions:
         kernel._octave_engine.eval.return_value = ""
         assert kernel.get_completions({"obj": "zzz_no_match"}) == []
 
-    def test_calls_completion_matches(self, kernel):
+    def test_calls_completion_matches_on_miss(self, kernel):
         kernel._octave_engine.eval.return_value = ""
         kernel.get_completions({"obj": "sin"})
-        kernel._octave_engine.eval.assert_called_once_with(
+        kernel._octave_engine.eval.assert_called_with(
             'completion_matches("sin")', silent=True
         )
 
+    def test_serves_repeated_completions_from_index(self, kernel):
+        kernel._octave_engine.eval.side_effect = ["sin\nsinh\ncos", "x"]
+        assert kernel.get_completions({"obj": "sin"}) == ["sin", "sinh"]
+        assert kernel.get_completions({"obj": "si"}) == ["sin", "sinh"]
+        assert kernel._octave_engine.eval.call_count == 2
+
+    def test_execute_refreshes_workspace_names(self, kernel):
+        kernel._octave_engine.plot_settings = {"backend": "disabled"}
+        kernel._octave_engine.eval.side_effect = ["sin", "", "sin_result"]
+        assert kernel.get_completions({"obj": "sin"}) == ["sin"]
+        with patch.object(ProcessMetaKernel, "do_execute_direct"):
+            kernel.do_execute_direct("sin_result = 1;")
+        assert kernel.get_completions({"obj": "sin"}) == ["sin", "sin_result"]
+
+    def test_path_change_reloads_names(self, kernel):
+        kernel._octave_engine.plot_settings = {"backend": "disabled"}
+        kernel._octave_engine.eval.side_effect = ["sin", "", "sin\nsinc", ""]
+        assert kernel.get_completions({"obj": "sin"}) == ["sin"]
+        with patch.object(ProcessMetaKernel, "do_execute_direct"):
+            kernel.do_execute_direct("pkg load signal")
+        assert kernel.get_completions({"obj": "sin"}) == ["sin", "sinc"]
+        assert (
+            "sinc" not in _completion._names_by_version[kernel._octave_engine.version]
+        )
+
+    def test_names_are_loaded_once_per_version(self, kernel):
+        kernel._octave_engine.eval.side_effect = ["sin", "", "", "cos"]
+        kernel.get_completions({"obj": "s"})
+        kernel._completion_index = None
+        assert kernel.get_completions({"obj": "s"}) == ["sin"]
+        kernel._octave_engine.version = "10.1.0"
+        assert kernel.get_completions({"obj": "c"}) == ["cos"]
+
+
+class TestPrefixTrie:
+    """Tests for the completion PrefixTrie."""
+
+    def test_matches_prefix(self):
+        trie = PrefixTrie(["sin", "sinh", "size", "cos"])
+        assert trie.matches("sin") == ["sin", "sinh"]
+
+    def test_matches_empty_prefix_returns_all_sorted(self):
+        trie = PrefixTrie(["b", "a", "c"])
+        assert trie.matches("") == ["a", "b", "c"]
+
+    def test_no_match_returns_empty_list(self):
+        assert PrefixTrie(["sin"]).matches("x") == []
+
+    def test_duplicates_are_counted_once(self):
+        trie = PrefixTrie(["sin", "sin"])
+        assert len(trie) == 1
+        assert "sin" in trie
+        assert "si" not in trie
+
+
+class TestCompletionIndex:
+    """Tests for CompletionIndex."""
+
+    @pytest.fixture(autouse=True)
+    def _clear_names(self):
+        with patch.dict(_completion._names_by_version, clear=True):
+            yield
+
+    def _engine(self, *responses):
+        engine = MagicMock()
+        engine.version = "9.1.0"
+        engine.eval.side_effect = list(responses)
+        _eval_each(engine)
+        return engine
+
+    def test_merges_names_and_workspace(self):
+        engine = self._engine("abs\nacos", "a\nalpha")
+        assert CompletionIndex().complete(engine, "a") == [
+            "a",
+            "abs",
+            "acos",
+            "alpha",
+        ]
+
+    def test_non_identifier_goes_to_octave(self):
+        engine = self._engine("s.field")
+        assert CompletionIndex().complete(engine, "s.f") == ["s.field"]
+        engine.eval.assert_called_once_with('completion_matches("s.f")', silent=True)
+
+    def test_ignores_non_identifier_lines(self):
+        engine = self._engine("abs\nerror: oops", "")
+        assert CompletionIndex().complete(engine, "a") == ["abs"]
+
+    def test_loads_names_and_workspace_in_one_round_trip(self):
+        engine = self._engine("abs", "a")
+        CompletionIndex().complete(engine, "a")
+        engine.eval_many.assert_called_once_with([NAMES_CMD, WORKSPACE_CMD])
+
+    def test_invalidate_reloads_workspace_only(self):
+        engine = self._engine("abs", "a", "b")
+        index = CompletionIndex()
+        index.complete(engine, "a")
+        index.invalidate()
+        index.complete(engine, "a")
+        assert engine.eval.call_args_list[2] == call(WORKSPACE_CMD, silent=True)
+        assert engine.eval.call_count == 3
+
+    def test_path_change_keeps_shared_names(self):
+        engine = self._engine("abs", "a", "abs\naddpath_fn", "", "", "")
+        index = CompletionIndex()
+        index.complete(engine, "a")
+        index.invalidate(path_changed=True)
+        assert index.complete(engine, "ad") == ["addpath_fn"]
+        assert CompletionIndex().complete(engine, "ab") == ["abs"]
+        assert _completion._names_by_version["9.1.0"].matches("ad") == []
+
+
+# ---------------------------------------------------------------------------
+# get_variable
+# ---------------------------------------------------------------------------
+
+
+class TestGetVariable:
+    """Tests for OctaveKernel.get_variable()."""
+
+    def test_get_variable_reads_value_from_engine(self, kernel):
+        kernel._octave_engine.eval_value.return_value = "array"
+        assert kernel.get_variable("x") == "array"
+        kernel._octave_engine.eval_value.assert_called_once_with("x")
+
+    def test_unreadable_variable_is_none(self, kernel):
+        kernel._octave_engine.eval_value.side_effect = RuntimeError(
+            "error: 'x' undefined"
+        )
+        assert kernel.get_variable("x") is None
+
+    def test_invalid_name_is_none(self, kernel):
+        assert kernel.get_variable("x; exit") is None
+        kernel._octave_engine.eval_value.assert_not_called()
+
 
 # ---------------------------------------------------------------------------
 # handle_plot_settings
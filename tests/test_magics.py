@@ -0,0 +1,63 @@
+"""Tests for the Octave kernel magics."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from octave_kernel.magics.transfer_magic import TransferMagic
+
+
+@pytest.fixture
+def magic():
+    """TransferMagic bound to a mocked kernel with a %python environment."""
+    kernel = MagicMock()
+    kernel.line_magics = {"python": MagicMock(env={})}
+    return TransferMagic(kernel)
+
+
+# ---------------------------------------------------------------------------
+# %put / %pull
+# ---------------------------------------------------------------------------
+
+
+class TestTransferMagic:
+    """Tests for the %put and %pull magics."""
+
+    def test_put_pushes_python_variable(self, magic):
+        magic.kernel.line_magics["python"].env["x"] = [1, 2]
+        magic.line_put("x")
+        magic.kernel.octave_engine.push.assert_called_once_with("x", [1, 2])
+
+    def test_put_renames(self, magic):
+        magic.kernel.line_magics["python"].env["x"] = [1, 2]
+        magic.line_put("x", "y")
+        magic.kernel.octave_engine.push.assert_called_once_with("y", [1, 2])
+
+    def test_put_unknown_variable_reports_error(self, magic):
+        magic.line_put("missing")
+        magic.kernel.Error.assert_called_once()
+        magic.kernel.octave_engine.push.assert_not_called()
+
+    def test_put_reports_push_errors(self, magic):
+        magic.kernel.line_magics["python"].env["x"] = "text"
+        magic.kernel.octave_engine.push.side_effect = ValueError("bad dtype")
+        magic.line_put("x")
+        magic.kernel.Error.assert_called_once_with("bad dtype")
+
+    def test_pull_stores_in_python_env(self, magic):
+        magic.kernel.octave_engine.pull.return_value = [[1.0]]
+        magic.line_pull("x")
+        assert magic.kernel.line_magics["python"].env["x"] == [[1.0]]
+
+    def test_pull_renames(self, magic):
+        magic.kernel.octave_engine.pull.return_value = [[1.0]]
+        magic.line_pull("x", "y")
+        assert magic.kernel.line_magics["python"].env == {"y": [[1.0]]}
+
+    def test_pull_reports_errors(self, magic):
+        magic.kernel.octave_engine.pull.side_effect = RuntimeError("undefined")
+        magic.line_pull("x")
+        magic.kernel.Error.assert_called_once_with("undefined")
+        assert magic.kernel.line_magics["python"].env == {}